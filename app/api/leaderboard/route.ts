@@ -0,0 +1,47 @@
+import { NextResponse } from "next/server";
+import { PrismaClient } from "@prisma/client";
+
+const prisma = new PrismaClient();
+
+// Reads the per-miner rollups maintained by app/lib/rollups.py
+export async function GET(request: Request) {
+  try {
+    const { searchParams } = new URL(request.url);
+    const hours = Number(searchParams.get("hours") ?? 24);
+    const bucketSeconds = Number(searchParams.get("bucket_seconds") ?? 3600);
+    const since = new Date(Date.now() - hours * 3600 * 1000);
+
+    const rollups = await prisma.miner_score_rollups.groupBy({
+      by: ["miner_uid"],
+      where: {
+        bucket_seconds: bucketSeconds,
+        bucket_start: { gte: since },
+      },
+      _sum: { num_scores: true, num_invalid: true, sum_score: true },
+      _min: { min_score: true },
+      _max: { max_score: true },
+    });
+
+    const leaderboard = rollups
+      .map((row: any) => ({
+        miner_uid: row.miner_uid,
+        num_scores: row._sum.num_scores ?? 0,
+        num_invalid: row._sum.num_invalid ?? 0,
+        mean_score: row._sum.num_scores ? row._sum.sum_score / row._sum.num_scores : null,
+        min_score: row._min.min_score,
+        max_score: row._max.max_score,
+      }))
+      .sort((a: any, b: any) => (a.mean_score ?? Infinity) - (b.mean_score ?? Infinity))
+      .map((row: any, index: number) => ({ rank: index + 1, ...row }));
+
+    return NextResponse.json(leaderboard);
+  } catch (error) {
+    console.error("Error reading score rollups:", error);
+    return NextResponse.json(
+      { error: "Internal server error" },
+      { status: 500 }
+    );
+  } finally {
+    await prisma.$disconnect();
+  }
+}
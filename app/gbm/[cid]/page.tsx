@@ -5,6 +5,7 @@ import SimulationChart from "@/app/ui/dashboard/simulation";
 import axios, { AxiosResponse } from "axios";
 import { Price, ScoreData, SimulationData } from "@/app/types";
 import ScoreChart from "@/app/ui/dashboard/score";
+import { fetchSimulation } from "@/app/lib/helpers";
 
 export default function Page({ params }: { params: { cid: string } }) {
   const [data, setData] = useState<SimulationData | null>(null);
@@ -12,15 +13,13 @@ export default function Page({ params }: { params: { cid: string } }) {
 
   const fetchSimulationData = async () => {
     try {
-      const simulation: AxiosResponse<SimulationData> = await axios.get(
-        `/gbm/${params.cid}/simulation.json`
-      );
+      const simulation = await fetchSimulation("gbm", params.cid);
       const real: AxiosResponse<Price[]> = await axios.get(
         `/real/${params.cid}/real.json`
       );
       const combinedData = {
-        variable: simulation.data.variable,
-        prediction: [real.data, ...simulation.data.prediction],
+        ...simulation,
+        real: real.data,
       };
       setData(combinedData);
 
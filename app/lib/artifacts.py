@@ -0,0 +1,275 @@
+"""
+Manifest of the artifacts under public/<model>/<timestamp>/.
+
+Each model has an index, public/manifest/<model>.json, with one entry per request
+timestamp: the model parameters ("variable" of simulation.json, or "metadata"
+for the models that write that), the total CRPS,
+the per-interval CRPS totals and the size, format and modification time of every
+file in the directory. Listing a model's requests or comparing models' scores is
+then one small JSON read instead of a directory walk and a JSON parse per request.
+
+The index lives outside public/<model>/ because the dashboard's /api/<model>
+routes list those directories and expect only timestamps in them. Every update
+is a read-modify-write under a per-model lock and replaces the index atomically
+(temporary file + rename), so a dashboard read never sees a half-written index.
+write_artifact writes the artifact itself the same way.
+
+Directories written before the index existed are picked up by rebuild.
+
+Usage:
+    python artifacts.py rebuild [model ...]
+    python artifacts.py show gbm
+"""
+import fcntl
+import json
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from helpers import ASSETS
+
+PUBLIC_DIR = "../../public"
+
+MANIFEST_DIR = "manifest"
+
+# public/ directories that are not model outputs
+NON_MODEL_DIRS = {MANIFEST_DIR, "archive", "ensemble", "real", "simulations", "prediction_score"}
+
+
+def asset_model(model: str, asset="BTC") -> str:
+    """public/ directory of a model's predictions for an asset: <model> for BTC, <model>-<asset> otherwise."""
+    return model if asset == "BTC" else f"{model}-{asset.lower()}"
+
+
+def model_asset(model: str, params: dict | None = None) -> str:
+    """
+    The asset a model directory's predictions are for: the "asset" parameter if
+    the simulation recorded one, else the <asset> suffix asset_model gave the directory.
+    """
+    if params and params.get("asset"):
+        return params["asset"].upper()
+    suffix = model.rsplit("-", 1)[-1].upper()
+    return suffix if suffix in ASSETS else "BTC"
+
+
+def manifest_path(model: str, public_dir=PUBLIC_DIR) -> str:
+    return os.path.join(public_dir, MANIFEST_DIR, f"{model}.json")
+
+
+def write_json_atomic(path: str, data, indent=2):
+    """Write JSON to a temporary file next to path and rename it over path."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Per-process temporary name: concurrent writers must not share one
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def _locked(model: str, public_dir=PUBLIC_DIR):
+    lock_path = os.path.join(public_dir, MANIFEST_DIR, f".{model}.lock")
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_manifest(model: str, public_dir=PUBLIC_DIR) -> dict:
+    """The index of a model: {"model", "updated_at", "entries": {timestamp: entry}}."""
+    path = manifest_path(model, public_dir)
+    if not os.path.exists(path):
+        return {"model": model, "updated_at": None, "entries": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def describe_file(path: str) -> dict:
+    stat = os.stat(path)
+    return {
+        "size": stat.st_size,
+        "format": os.path.splitext(path)[1].lstrip(".") or "unknown",
+        "modified_at": stat.st_mtime,
+    }
+
+
+def interval_totals(detailed_scores: list[dict]) -> dict[str, float]:
+    """CRPS total of each interval, from the "Total" rows of calculate_crps_for_miner's details."""
+    return {row["Interval"]: row["CRPS"] for row in detailed_scores if row.get("Increment") == "Total"}
+
+
+def simulation_params(data: dict) -> dict:
+    """
+    The model parameters of a simulation.json.
+
+    Most models write them under "variable"; garch, manual and monte-trend write "metadata".
+    """
+    return data.get("variable") or data.get("metadata") or {}
+
+
+def _entry_fields(name: str, data) -> dict:
+    # The parts of an artifact worth keeping in the index
+    if name == "simulation.json" and isinstance(data, dict):
+        return {"params": simulation_params(data)}
+    if name == "score.json" and isinstance(data, dict):
+        return {
+            "total_score": data.get("total_score"),
+            "interval_totals": interval_totals(data.get("detailed_scores", [])),
+        }
+    return {}
+
+
+def _merge(entry: dict, timestamp: int, name: str, path: str, data) -> dict:
+    entry = {**entry, "timestamp": timestamp, **_entry_fields(name, data)}
+    entry["files"] = {**entry.get("files", {}), name: describe_file(path)}
+    return entry
+
+
+def _save_manifest(model: str, manifest: dict, public_dir=PUBLIC_DIR):
+    manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+    write_json_atomic(manifest_path(model, public_dir), manifest)
+
+
+def record_artifact(model: str, timestamp: int, name: str, data=None, public_dir=PUBLIC_DIR):
+    """
+    Add a file already written to public/<model>/<timestamp>/ to the model's index.
+
+    data is the file's content if the caller still has it; simulation.json and
+    score.json are read back otherwise.
+    """
+    path = os.path.join(public_dir, model, str(timestamp), name)
+    if data is None and name in ("simulation.json", "score.json"):
+        with open(path, "r") as f:
+            data = json.load(f)
+    with _locked(model, public_dir):
+        manifest = load_manifest(model, public_dir)
+        key = str(timestamp)
+        manifest["entries"][key] = _merge(manifest["entries"].get(key, {}), int(timestamp), name, path, data)
+        _save_manifest(model, manifest, public_dir)
+
+
+def update_entry(model: str, timestamp: int, public_dir=PUBLIC_DIR, drop_files=(), **fields):
+    """Set fields of a model's index entry and forget files that were removed from its directory."""
+    with _locked(model, public_dir):
+        manifest = load_manifest(model, public_dir)
+        entry = manifest["entries"].setdefault(str(timestamp), {"timestamp": int(timestamp)})
+        entry.update(fields)
+        entry["files"] = {name: info for name, info in entry.get("files", {}).items() if name not in drop_files}
+        _save_manifest(model, manifest, public_dir)
+
+
+def record_file(path: str):
+    """record_artifact for a path of the form <public dir>/<model>/<timestamp>/<name>."""
+    timestamp_dir, name = os.path.split(os.path.normpath(path))
+    model_dir, timestamp = os.path.split(timestamp_dir)
+    public_dir, model = os.path.split(model_dir)
+    record_artifact(model, int(timestamp), name, public_dir=public_dir)
+
+
+def write_artifact(model: str, timestamp: int, name: str, data, public_dir=PUBLIC_DIR, indent=2) -> str:
+    """Atomically write a JSON artifact to public/<model>/<timestamp>/<name> and index it."""
+    path = os.path.join(public_dir, model, str(timestamp), name)
+    write_json_atomic(path, data, indent)
+    record_artifact(model, timestamp, name, data, public_dir)
+    return path
+
+
+def scan_model(model: str, public_dir=PUBLIC_DIR) -> dict[str, dict]:
+    """Index entries of every timestamp directory of a model, read from disk."""
+    model_dir = os.path.join(public_dir, model)
+    entries = {}
+    for directory in sorted(os.listdir(model_dir)):
+        if not directory.isdigit():
+            continue
+        entry = {}
+        for name in sorted(os.listdir(os.path.join(model_dir, directory))):
+            path = os.path.join(model_dir, directory, name)
+            if name.endswith(".tmp") or not os.path.isfile(path):
+                continue
+            data = None
+            if name in ("simulation.json", "score.json"):
+                try:
+                    with open(path, "r") as f:
+                        data = json.load(f)
+                except ValueError:
+                    print(f"Skipping unreadable {path}")
+                    continue
+            entry = _merge(entry, int(directory), name, path, data)
+        if entry:
+            entries[directory] = entry
+    return entries
+
+
+def list_models(public_dir=PUBLIC_DIR) -> list[str]:
+    """Model directories under public/, i.e. the ones holding <timestamp>/ subdirectories."""
+    models = []
+    for name in sorted(os.listdir(public_dir)):
+        path = os.path.join(public_dir, name)
+        if name in NON_MODEL_DIRS or not os.path.isdir(path):
+            continue
+        if any(entry.isdigit() for entry in os.listdir(path)):
+            models.append(name)
+    return models
+
+
+def default_models(public_dir=PUBLIC_DIR) -> list[str]:
+    """The BTC model directories under public/; the <model>-<asset> ones hold other assets' paths."""
+    return [model for model in list_models(public_dir) if model_asset(model) == "BTC"]
+
+
+def rebuild_manifest(model: str, public_dir=PUBLIC_DIR) -> dict:
+    """Rebuild a model's index from its directories, keeping what it knew about archived requests."""
+    with _locked(model, public_dir):
+        manifest = load_manifest(model, public_dir)
+        entries = scan_model(model, public_dir)
+        for key, entry in manifest["entries"].items():
+            if entry.get("archive"):
+                # The parameters came from the simulation.json that was archived
+                entries[key] = {**entry, **entries.get(key, {"files": {}})}
+        manifest["entries"] = dict(sorted(entries.items()))
+        _save_manifest(model, manifest, public_dir)
+    return manifest
+
+
+def get_manifest(model: str, public_dir=PUBLIC_DIR) -> dict:
+    """The index of a model, built from its directories on first use."""
+    if not os.path.exists(manifest_path(model, public_dir)) and os.path.isdir(os.path.join(public_dir, model)):
+        return rebuild_manifest(model, public_dir)
+    return load_manifest(model, public_dir)
+
+
+def list_entries(model: str, scored=None, before=None, public_dir=PUBLIC_DIR) -> list[dict]:
+    """
+    Index entries of a model, oldest first.
+
+    Args:
+        scored: True for entries with a total score only, False for entries without one.
+        before: Only timestamps strictly before this one.
+    """
+    entries = sorted(get_manifest(model, public_dir)["entries"].values(), key=lambda entry: entry["timestamp"])
+    if before is not None:
+        entries = [entry for entry in entries if entry["timestamp"] < before]
+    if scored is not None:
+        entries = [entry for entry in entries if (entry.get("total_score") is not None) == scored]
+    return entries
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "rebuild"
+    if command == "rebuild":
+        for model in sys.argv[2:] or list_models():
+            manifest = rebuild_manifest(model)
+            print(f"😊😊😊 {model}: {len(manifest['entries'])} entries indexed")
+    elif command == "show":
+        for entry in list_entries(sys.argv[2]):
+            files = ", ".join(f"{name} ({info['size']:,} B)" for name, info in entry.get("files", {}).items())
+            print(f"{entry['timestamp']}  CRPS {entry.get('total_score')}  {files}")
+    else:
+        raise SystemExit(f"Unknown command: {command}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Score every stored simulation that has no score.json yet, or an outdated one.
+
+Scoring normally happens inline in each model script's main, and only if the real
+path could be fetched at that moment. This job finds the pending requests in the
+artifacts index: a simulation.json without a score, or one written after its
+score. Each request window that has closed gets its real path loaded once per asset
+through helpers.load_real_price_path, so every model scored for that window shares
+one fetch and the public/real cache. A request's asset is the one its parameters
+record, or the <asset> suffix of its model directory (artifacts.model_asset). The requests are then scored in a process pool
+with calculate_crps_for_miner. score.json and summary.json are written
+atomically through the index.
+
+Usage:
+    python backfill.py                    # every BTC model
+    python backfill.py gbm base --workers 8 --limit 500
+    python backfill.py --rescan --dry-run
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from artifacts import PUBLIC_DIR
+from artifacts import default_models
+from artifacts import list_entries
+from artifacts import model_asset
+from artifacts import rebuild_manifest
+from artifacts import simulation_params
+from artifacts import write_artifact
+from bulk_score import align_real_prices
+from bulk_score import prediction_to_matrix
+from helpers import calculate_crps_for_miner
+from helpers import from_iso_to_unix_time
+from helpers import load_real_price_path
+from summary import write_summary
+
+# Real path fetches in flight at once
+FETCH_THREADS = 4
+
+# A score is outdated when its simulation was rewritten this much later. The slack
+# covers pipeline.py, which may finish a score before the simulation file, and
+# checkouts or copies that write both files in arbitrary order.
+STALE_AFTER_SECONDS = 60
+
+
+def is_pending(entry: dict) -> bool:
+    """A simulation without a score, or with a score older than the simulation."""
+    files = entry.get("files", {})
+    if "simulation.json" not in files:
+        return False
+    if "score.json" not in files or entry.get("total_score") is None:
+        return True
+    return files["simulation.json"]["modified_at"] - files["score.json"]["modified_at"] > STALE_AFTER_SECONDS
+
+
+def pending_entries(models: list[str], now: int, public_dir=PUBLIC_DIR) -> list[tuple[str, dict]]:
+    """(model, index entry) of every pending request whose window has closed by now, oldest first."""
+    pending = []
+    for model in models:
+        for entry in list_entries(model, public_dir=public_dir):
+            time_length = entry.get("params", {}).get("time_length", 86400)
+            if is_pending(entry) and entry["timestamp"] + time_length <= now:
+                pending.append((model, entry))
+    pending.sort(key=lambda item: item[1]["timestamp"])
+    return pending
+
+
+def score_entry(model: str, timestamp: int, real_prices: list[dict], public_dir=PUBLIC_DIR) -> float | None:
+    """
+    Score one stored simulation against its real path and write score.json and summary.json. Runs in a worker process.
+
+    Returns None if the simulation is not a complete path matrix or has no point on the real path.
+    """
+    with open(os.path.join(public_dir, model, str(timestamp), "simulation.json"), "r") as f:
+        data = json.load(f)
+    prediction = data["prediction"]
+    if not prediction or not prediction[0]:
+        return None
+    start_time = prediction[0][0]["time"]
+    start_timestamp = from_iso_to_unix_time(start_time)
+    paths = prediction_to_matrix(prediction, start_timestamp, len(prediction), len(prediction[0]))
+    if paths is None:
+        return None
+    time_increment = simulation_params(data).get("time_increment", 300)
+
+    columns, real_price_path, _ = align_real_prices(real_prices, start_timestamp, time_increment, paths.shape[1])
+    if len(columns) == 0:
+        return None
+    crps_score, detailed_crps_data = calculate_crps_for_miner(paths[:, columns], real_price_path, time_increment)
+
+    score_data = {"total_score": float(crps_score), "detailed_scores": detailed_crps_data}
+    write_artifact(model, timestamp, "score.json", score_data, public_dir)
+    write_summary(model, paths, start_time, time_increment, score_data, public_dir, simulation_params(data))
+    return float(crps_score)
+
+
+def _load_real_prices(asset: str, timestamp: int, public_dir=PUBLIC_DIR) -> list[dict] | None:
+    start_time = datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+    try:
+        return load_real_price_path(start_time, public_dir, asset=asset)
+    except Exception as e:
+        # A window the price feed cannot serve yet is retried on the next run
+        print(f"Could not load the {asset} real price path of {start_time}: {e}")
+        return None
+
+
+def backfill(models: list[str] | None = None, workers=None, limit=None, rescan=False, dry_run=False, public_dir=PUBLIC_DIR) -> dict:
+    """
+    Score the pending requests of the given models (the BTC models by default).
+
+    Returns:
+        dict: (model, timestamp) -> total CRPS, or None where the request could not be scored.
+    """
+    models = models or default_models(public_dir)
+    if rescan:
+        for model in models:
+            rebuild_manifest(model, public_dir)
+
+    pending = pending_entries(models, int(datetime.now(timezone.utc).timestamp()), public_dir)
+    if limit is not None:
+        pending = pending[:limit]
+    print(f"😊😊😊 {len(pending)} pending scores across {len({model for model, _ in pending})} models")
+    if dry_run or not pending:
+        for model, entry in pending:
+            print(f"{model} {entry['timestamp']}")
+        return {}
+
+    # One real path per asset and request window, shared by every model scored for it. Windows
+    # are keyed by their unix start time, which the models' start_time strings may spell differently
+    windows = {(model, entry["timestamp"]): (model_asset(model, entry.get("params")), entry["timestamp"]) for model, entry in pending}
+    keys = sorted(set(windows.values()))
+    with ThreadPoolExecutor(max_workers=FETCH_THREADS) as fetcher:
+        real_paths = dict(zip(keys, fetcher.map(lambda key: _load_real_prices(*key, public_dir), keys)))
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            key: executor.submit(score_entry, *key, real_paths[window], public_dir)
+            for key, window in windows.items()
+            if real_paths[window] is not None
+        }
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                # One bad file must not lose the scores of the rest of the batch
+                print(f"Could not score {key[0]} {key[1]}: {e}")
+                results[key] = None
+
+    scored = [score for score in results.values() if score is not None]
+    print(f"😊😊😊 Scored {len(scored)} of {len(results)}, mean CRPS {np.mean(scored) if scored else None}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score stored simulations that have no up-to-date score.json.")
+    parser.add_argument("models", nargs="*", help="Models to backfill (default: every BTC model under public/)")
+    parser.add_argument("--workers", type=int, help="Scoring processes (default: CPU count)")
+    parser.add_argument("--limit", type=int, help="Score at most this many requests, oldest first")
+    parser.add_argument("--rescan", action="store_true", help="Rebuild the indexes from the directories first")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the pending requests")
+    args = parser.parse_args()
+    backfill(args.models or None, args.workers, args.limit, args.rescan, args.dry_run)
+
+if __name__ == "__main__":
+    main()
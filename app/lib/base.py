@@ -1,16 +1,20 @@
 import numpy as np
 from datetime import datetime, timedelta
+from artifacts import record_file
+from summary import summarize_file
 from helpers import convert_prices_to_time_format
 from helpers import from_iso_to_unix_time
 from helpers import get_real_price_path
 from helpers import align_prediction_and_real_prices
 from helpers import calculate_crps_for_miner
+from helpers import get_prices
+from sampling import standard_normal_draws
 
 import os
 import json
 
 def simulate_single_price_path_based_on_volatility(
-    current_price, time_increment, time_length, sigma, volatility_type="hourly"
+    current_price, time_increment, time_length, sigma, volatility_type="hourly", dtype=np.float64, sampling="pseudo"
 ):
     """
     Simulate a single crypto asset price path.
@@ -20,35 +24,38 @@ def simulate_single_price_path_based_on_volatility(
     time_length: the time length in seconds
     sigma: the daily or hourly volatility of the asset
     volatility_type: the type of volatility to use
+    dtype: the float precision of the simulation
+    sampling: how the normal innovations are drawn, see sampling.SAMPLING_MODES
     """
-    one_hour = 3600
-    one_day = 86400
-
-    dt = time_increment / one_hour if volatility_type == "hourly" else time_increment / one_day if volatility_type == "daily" else 1
-
-    num_steps = int(time_length / time_increment)
-    std_dev = sigma * np.sqrt(dt)
-    price_change_pcts = np.random.normal(0, std_dev, size=num_steps)
-    cumulative_returns = np.cumprod(1 + price_change_pcts)
-    cumulative_returns = np.insert(cumulative_returns, 0, 1.0)
-    price_path = current_price * cumulative_returns
-    return price_path
+    return simulate_crypto_price_paths(
+        current_price, time_increment, time_length, 1, sigma, volatility_type, dtype, sampling
+    )[0]
   
 def simulate_crypto_price_paths(
-    current_price, time_increment, time_length, num_simulations, sigma, volatility_type="hourly"
+    current_price, time_increment, time_length, num_simulations, sigma, volatility_type="hourly", dtype=np.float64, sampling="pseudo"
 ):
     """
     Simulate multiple crypto asset price paths.
+
+    All paths are drawn in one (num_simulations, num_steps) block; in "pseudo"
+    sampling mode row i uses the same random draws the per-path loop used to
+    consume for path i.
     """
+    one_hour = 3600
+    one_day = 86400
 
-    price_paths = []
-    for _ in range(num_simulations):
-        price_path = simulate_single_price_path_based_on_volatility(
-            current_price, time_increment, time_length, sigma, volatility_type
-        )
-        price_paths.append(price_path)
+    dt = time_increment / one_hour if volatility_type == "hourly" else time_increment / one_day if volatility_type == "daily" else 1
 
-    return np.array(price_paths)
+    num_steps = int(time_length / time_increment)
+    # Scalar of the simulation dtype: a float64 NumPy scalar would promote float32 draws to float64
+    std_dev = np.dtype(dtype).type(sigma * np.sqrt(dt))
+    price_change_pcts = std_dev * standard_normal_draws(num_simulations, num_steps, sampling, dtype)
+
+    price_paths = np.empty((num_simulations, num_steps + 1), dtype=dtype)
+    price_paths[:, 0] = 1.0
+    np.cumprod(1 + price_change_pcts, axis=1, out=price_paths[:, 1:])
+    price_paths *= price_paths.dtype.type(current_price)
+    return price_paths
   
 def generate_simulations(
     asset="BTC",
@@ -58,7 +65,9 @@ def generate_simulations(
     num_simulations=1,
     sigma=0.01,
     volatility_type="hourly",
-    current_price=None
+    current_price=None,
+    dtype=np.float64,
+    sampling="pseudo"
 ):
 
 
@@ -71,6 +80,8 @@ def generate_simulations(
         time_increment (int): Time increment in seconds.
         time_length (int): Total time length in seconds.
         num_simulations (int): Number of simulation runs.
+        dtype (numpy.dtype): Float precision of the simulation, np.float64 or np.float32.
+        sampling (str): How the normal innovations are drawn, see sampling.SAMPLING_MODES.
 
     Returns:
         numpy.ndarray: Simulated price paths.
@@ -91,7 +102,9 @@ def generate_simulations(
         time_length=time_length,
         num_simulations=num_simulations,
         sigma=sigma,
-        volatility_type=volatility_type
+        volatility_type=volatility_type,
+        dtype=dtype,
+        sampling=sampling
     )
 
     predictions = convert_prices_to_time_format(
@@ -100,18 +113,19 @@ def generate_simulations(
 
     return predictions
 
-def _calc_params(history_data: list[dict], volatility_type="hourly"):
+def _calc_params(history_data, volatility_type="hourly"):
     """
     Calculate the hourly volatility of the asset price path.
 
     Args:
-        history_data: List of dictionaries containing price history for 24 hours with 5-minute intervals
+        history_data: Price history for 24 hours with 5-minute intervals, as a list of
+            {"time","price"} dictionaries or a columnar (times, prices) pair
         
     Returns:
         float: hourly or daily volatility (sigma) for use in GBM simulation
     """
     # Extract prices and convert to numpy array
-    prices = np.array([price['price'] for price in history_data])
+    prices = get_prices(history_data)
     
     # Calculate log returns
     log_returns = np.log(prices[1:] / prices[:-1])
@@ -168,6 +182,8 @@ def main():
 
         }, f, indent=2)
     print(f"Predictions saved to: {predictions_file}")
+    record_file(predictions_file)
+    summarize_file(predictions_file)
     
     # Generate real price if not exists
     real_path_file = os.path.join("../../public/real", str(from_iso_to_unix_time(start_time)), "real.json")
@@ -204,6 +220,8 @@ def main():
         json.dump(score_data, f, indent=2)
 
     print(f"Score data saved to: {score_path}")
+    record_file(score_path)
+    summarize_file(score_path)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,253 @@
+"""
+Score every miner's prediction for one validator request (or a time range) in bulk.
+
+miner_predictions rows are streamed with db.iter_miner_predictions' server-side
+cursor, grouped into shards and scored in a process pool. Each worker parses the JSONB predictions
+straight into a (miners, paths, points) array and scores the whole shard against
+the request's real price path with one calculate_crps_for_miners call. Scores are
+written back to miner_scores with bulk_write's multi-row inserts, each row
+referencing the request window's real path stored once in real_price_paths.
+
+Predictions that already have a miner_scores row are skipped, so running a range
+again only scores what is new (e.g. requests whose real path was not complete
+yet) and never stores a prediction's score twice. A unique index on
+miner_scores.miner_predictions_id cannot enforce this: a miner_scores table
+partitioned by scored_time (migrate.py --partition) only allows unique indexes
+that include scored_time.
+
+Usage:
+    python bulk_score.py --request-id 12345
+    python bulk_score.py --from 2025-03-01T00:00:00+00:00 --to 2025-03-02T00:00:00+00:00
+"""
+import argparse
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from bulk_write import write_miner_scores
+from bulk_write import write_real_price_path
+from db import get_engine
+from db import iter_miner_predictions
+from helpers import calculate_crps_for_miners
+from helpers import from_iso_to_unix_time
+from helpers import is_complete_real_price_path
+from helpers import load_real_price_path
+
+
+def align_real_prices(real_prices: list[dict], start_timestamp: int, time_increment: int, num_points: int):
+    """
+    Place the real price path on a request's time grid.
+
+    Returns:
+        tuple: (grid columns that have a real price, real prices at those columns,
+                the matching {"time","price"} entries)
+    """
+    columns = []
+    aligned = []
+    for entry in real_prices:
+        offset = from_iso_to_unix_time(entry["time"]) - start_timestamp
+        if offset % time_increment == 0 and 0 <= offset // time_increment < num_points:
+            columns.append(offset // time_increment)
+            aligned.append(entry)
+    return np.array(columns, dtype=np.intp), np.array([entry["price"] for entry in aligned]), aligned
+
+
+def prediction_to_matrix(prediction, start_timestamp: int, num_simulations: int, num_points: int) -> np.ndarray | None:
+    """
+    Parse a JSONB prediction into a (num_simulations, num_points) price matrix.
+
+    Returns None if the prediction is not on the request's grid.
+    """
+    try:
+        if len(prediction) != num_simulations or from_iso_to_unix_time(prediction[0][0]["time"]) != start_timestamp:
+            return None
+        matrix = np.array([[point["price"] for point in path] for path in prediction], dtype=np.float64)
+    except (TypeError, ValueError, KeyError, IndexError):
+        return None
+    if matrix.shape != (num_simulations, num_points):
+        return None
+    return matrix
+
+
+def score_shard(shard: dict) -> list[dict]:
+    """
+    Parse and score one shard of a request's predictions. Runs in a worker process.
+
+    Invalid predictions get prompt_score -1, the value compute_softmax masks out.
+    """
+    rows = shard["rows"]
+    matrices = [
+        prediction_to_matrix(row["prediction"], shard["start_timestamp"], shard["num_simulations"], shard["num_points"])
+        if row["format_validation"] == "CORRECT" else None
+        for row in rows
+    ]
+    valid = [i for i, matrix in enumerate(matrices) if matrix is not None]
+
+    results = [
+        {"miner_predictions_id": row["id"], "miner_uid": row["miner_uid"], "prompt_score": -1.0, "score_details": []}
+        for row in rows
+    ]
+    if valid:
+        simulation_runs = np.stack([matrices[i][:, shard["columns"]] for i in valid])
+        scores, detailed_crps_data = calculate_crps_for_miners(
+            simulation_runs, shard["real_price_path"], shard["time_increment"], shard["dtype"]
+        )
+        for i, score, details in zip(valid, scores.tolist(), detailed_crps_data):
+            results[i]["prompt_score"] = score
+            results[i]["score_details"] = details
+
+    return results
+
+
+def iter_shards(rows, shard_size: int, dtype):
+    """Group streamed rows into per-request shards carrying the request's aligned real path."""
+    current_request = None
+    request_info = None
+    buffer = []
+
+    for row in rows:
+        if row.validator_requests_id != current_request:
+            if buffer:
+                yield {**request_info, "rows": buffer}
+                buffer = []
+            current_request = row.validator_requests_id
+            start_time = row.start_time.astimezone(timezone.utc).isoformat()
+            num_points = row.time_length // row.time_increment + 1
+            start_timestamp = from_iso_to_unix_time(start_time)
+            real_prices = load_real_price_path(start_time, duration=row.time_length)
+            if not is_complete_real_price_path(real_prices, start_time, row.time_length):
+                # Scores against a partial path would be stored for good; leave the request for later
+                print(f"Skipping request {current_request}: its real price path is not complete yet")
+                request_info = None
+                continue
+            columns, real_price_path, real_prices = align_real_prices(
+                real_prices, start_timestamp, row.time_increment, num_points
+            )
+            request_info = {
+                "validator_requests_id": current_request,
+                "start_time": row.start_time,
+                "start_timestamp": start_timestamp,
+                "time_increment": row.time_increment,
+                "num_simulations": row.num_simulations,
+                "num_points": num_points,
+                "columns": columns,
+                "real_price_path": real_price_path,
+                "real_prices": real_prices,
+                "dtype": dtype,
+            }
+
+        if request_info is None:
+            continue
+        buffer.append({
+            "id": row.id,
+            "miner_uid": row.miner_uid,
+            "prediction": row.prediction,
+            "format_validation": row.format_validation,
+        })
+        if len(buffer) >= shard_size:
+            yield {**request_info, "rows": buffer}
+            buffer = []
+
+    if buffer:
+        yield {**request_info, "rows": buffer}
+
+
+def bulk_score(
+    validator_requests_id=None,
+    start_time=None,
+    end_time=None,
+    workers=None,
+    shard_size=32,
+    dtype=np.float64,
+    dry_run=False,
+):
+    """
+    Score all miner predictions for a request or time range and bulk insert them into miner_scores.
+
+    Returns:
+        list[dict]: The scored rows (miner_predictions_id, miner_uid, prompt_score, score_details).
+    """
+    engine = get_engine()
+    scored = []
+    requests_by_id = {}
+
+    with engine.connect() as connection, ProcessPoolExecutor(max_workers=workers) as executor:
+        # Raw rows: the JSON is decoded in the workers, in parallel
+        rows = iter_miner_predictions(
+            connection, validator_requests_id, start_time=start_time, end_time=end_time, unscored=True, decode=False,
+            yield_per=shard_size,
+        )
+        # Only a bounded number of shards is in flight, so the stream is not read
+        # ahead of the workers and at most that many payloads are held at once
+        max_in_flight = 2 * (workers or os.cpu_count() or 1)
+        futures = deque()
+
+        def collect(request_id, future):
+            for result in future.result():
+                scored.append({**result, "validator_requests_id": request_id})
+
+        for shard in iter_shards(rows, shard_size, dtype):
+            requests_by_id[shard["validator_requests_id"]] = {
+                key: shard[key] for key in ("start_time", "time_increment", "num_points", "real_prices")
+            }
+            # Workers only need the arrays; the {"time","price"} entries stay in this process
+            shard = {key: value for key, value in shard.items() if key != "real_prices"}
+            futures.append((shard["validator_requests_id"], executor.submit(score_shard, shard)))
+            if len(futures) >= max_in_flight:
+                collect(*futures.popleft())
+
+        while futures:
+            collect(*futures.popleft())
+
+    print(f"😊😊😊 Scored {len(scored)} predictions across {len(requests_by_id)} requests")
+    if dry_run or not scored:
+        return scored
+
+    scored_time = datetime.now(timezone.utc)
+    rows_by_request = {}
+    for row in scored:
+        rows_by_request.setdefault(row["validator_requests_id"], []).append(row)
+    with engine.begin() as connection:
+        for request_id, rows in rows_by_request.items():
+            request = requests_by_id[request_id]
+            real_price_path_id = write_real_price_path(
+                connection, request["start_time"], request["time_increment"], request["num_points"], request["real_prices"]
+            )
+            write_miner_scores(connection, rows, real_price_path_id, scored_time)
+    print(f"Scores saved to miner_scores")
+
+    return scored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk score miner_predictions against the real price path.")
+    parser.add_argument("--request-id", type=int, help="validator_requests.id to score")
+    parser.add_argument("--from", dest="start_time", help="Score requests starting at or after this ISO time")
+    parser.add_argument("--to", dest="end_time", help="Score requests starting before this ISO time")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (defaults to CPU count)")
+    parser.add_argument("--shard-size", type=int, default=32, help="Predictions per worker task")
+    parser.add_argument("--float32", action="store_true", help="Score in float32")
+    parser.add_argument("--dry-run", action="store_true", help="Score without writing to miner_scores")
+    args = parser.parse_args()
+
+    if args.request_id is None and args.start_time is None:
+        parser.error("either --request-id or --from is required")
+
+    scored = bulk_score(
+        validator_requests_id=args.request_id,
+        start_time=datetime.fromisoformat(args.start_time) if args.start_time else None,
+        end_time=datetime.fromisoformat(args.end_time) if args.end_time else None,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        dtype=np.float32 if args.float32 else np.float64,
+        dry_run=args.dry_run,
+    )
+    valid_scores = [row["prompt_score"] for row in scored if row["prompt_score"] != -1]
+    if valid_scores:
+        print(f"😊😊😊 Best CRPS: {min(valid_scores)}, median CRPS: {float(np.median(valid_scores))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Batched writers for predictions, scores and real price paths.
+
+Rows go out through executemany, which SQLAlchemy turns into multi-row
+INSERT ... VALUES statements (RETURNING ids in parameter order where needed), so
+thousands of rows cost a handful of round-trips. Path matrices are stored as raw
+array bytes in prediction_matrices instead of expanded {"time","price"} JSON, and
+the real price path of a request window is written once to real_price_paths and
+referenced from every miner_scores row.
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+
+from db import miner_scores
+from db import my_predictions
+from db import prediction_matrices
+from db import real_price_paths
+from helpers import from_iso_to_unix_time
+
+# Rows per multi-row INSERT statement
+BATCH_SIZE = 500
+
+
+def encode_array(values: np.ndarray, dtype=np.float64) -> bytes:
+    """Raw little-endian bytes of an array, in row-major order."""
+    return np.ascontiguousarray(values, dtype=np.dtype(dtype).newbyteorder("<")).tobytes()
+
+
+def decode_array(data: bytes, dtype=np.float64, shape=None) -> np.ndarray:
+    values = np.frombuffer(data, dtype=np.dtype(dtype).newbyteorder("<"))
+    return values.reshape(shape) if shape is not None else values
+
+
+def bulk_insert(connection, table, rows: list[dict], return_ids=False, batch_size=BATCH_SIZE) -> list[int] | None:
+    """
+    Insert rows in multi-row batches.
+
+    Returns:
+        list[int] | None: The new ids in the order of rows when return_ids is set.
+    """
+    if not rows:
+        return [] if return_ids else None
+    connection = connection.execution_options(insertmanyvalues_page_size=batch_size)
+    if return_ids:
+        statement = table.insert().returning(table.c.id, sort_by_parameter_order=True)
+        return [row.id for row in connection.execute(statement, rows)]
+    connection.execute(table.insert(), rows)
+    return None
+
+
+def write_real_price_path(connection, start_time: datetime, time_increment: int, num_points: int, real_prices: list[dict]) -> int:
+    """
+    Store the real price path of a request window once and return its id.
+
+    The insert skips a row that already exists for the same (start_time,
+    time_increment), so concurrent scorers of one window agree on a single row;
+    the id of that row is then read back.
+    """
+    times = np.array([from_iso_to_unix_time(entry["time"]) for entry in real_prices], dtype=np.int64)
+    prices = np.array([entry["price"] for entry in real_prices], dtype=np.float64)
+    insert = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    statement = insert(real_price_paths).values(
+        start_time=start_time,
+        time_increment=time_increment,
+        num_points=num_points,
+        times=encode_array(times, np.int64),
+        prices=encode_array(prices),
+    ).on_conflict_do_nothing(index_elements=["start_time", "time_increment"]).returning(real_price_paths.c.id)
+    inserted = connection.execute(statement).first()
+    if inserted is not None:
+        return inserted.id
+    return connection.execute(
+        select(real_price_paths.c.id)
+        .where(real_price_paths.c.start_time == start_time)
+        .where(real_price_paths.c.time_increment == time_increment)
+    ).one().id
+
+
+def load_real_price_path_row(connection, real_price_path_id: int) -> list[dict]:
+    """Read a stored real price path back as {"time","price"} entries."""
+    row = connection.execute(select(real_price_paths).where(real_price_paths.c.id == real_price_path_id)).one()
+    times = decode_array(row.times, np.int64)
+    prices = decode_array(row.prices)
+    return [
+        {"time": datetime.fromtimestamp(int(t), timezone.utc).isoformat(), "price": float(p)}
+        for t, p in zip(times, prices)
+    ]
+
+
+def write_prediction_matrices(connection, matrices: list[np.ndarray], start_time: datetime, time_increment: int, dtype=np.float64) -> list[int]:
+    """Store (num_simulations, num_points) path matrices as raw bytes and return their ids in order."""
+    return bulk_insert(connection, prediction_matrices, [
+        {
+            "start_time": start_time,
+            "time_increment": time_increment,
+            "num_simulations": matrix.shape[0],
+            "num_points": matrix.shape[1],
+            "dtype": np.dtype(dtype).name,
+            "data": encode_array(matrix, dtype),
+        }
+        for matrix in matrices
+    ], return_ids=True)
+
+
+def load_prediction_matrix(connection, prediction_matrix_id: int) -> np.ndarray:
+    row = connection.execute(select(prediction_matrices).where(prediction_matrices.c.id == prediction_matrix_id)).one()
+    return decode_array(row.data, row.dtype, (row.num_simulations, row.num_points))
+
+
+def write_my_predictions(connection, rows: list[dict], compact=False, dtype=np.float64) -> list[int]:
+    """
+    Insert my_predictions rows in batches.
+
+    Each row has miner_uid, request_time, variable, type and either prediction
+    ({"time","price"} JSON) or paths (a (num_simulations, num_points) array) plus
+    start_time and time_increment. With compact=True the paths are stored in
+    prediction_matrices and the row's prediction is left empty; otherwise the
+    dashboard-readable JSON is written as before.
+    """
+    matrix_ids = [None] * len(rows)
+    if compact:
+        for (start_time, time_increment), indices in _group_by_grid(rows).items():
+            ids = write_prediction_matrices(
+                connection, [np.asarray(rows[i]["paths"]) for i in indices], start_time, time_increment, dtype
+            )
+            for i, matrix_id in zip(indices, ids):
+                matrix_ids[i] = matrix_id
+
+    return bulk_insert(connection, my_predictions, [
+        {
+            "miner_uid": row["miner_uid"],
+            "request_time": row["request_time"],
+            "variable": row["variable"],
+            "prediction": [] if compact else row["prediction"],
+            "type": row["type"],
+            "prediction_matrix_id": matrix_id,
+        }
+        for row, matrix_id in zip(rows, matrix_ids)
+    ], return_ids=True)
+
+
+def _group_by_grid(rows: list[dict]) -> dict:
+    groups = {}
+    for i, row in enumerate(rows):
+        groups.setdefault((row["start_time"], row["time_increment"]), []).append(i)
+    return groups
+
+
+def write_miner_scores(connection, rows: list[dict], real_price_path_id: int, scored_time: datetime | None = None):
+    """
+    Insert scored predictions of one request window, all referencing its stored real price path.
+
+    Each row has miner_uid, miner_predictions_id, prompt_score and score_details.
+    """
+    scored_time = scored_time or datetime.now(timezone.utc)
+    bulk_insert(connection, miner_scores, [
+        {
+            "miner_uid": row["miner_uid"],
+            "scored_time": scored_time,
+            "miner_predictions_id": row["miner_predictions_id"],
+            "prompt_score": row["prompt_score"],
+            "score_details": row["score_details"],
+            "real_price_path_id": real_price_path_id,
+        }
+        for row in rows
+    ])
@@ -0,0 +1,252 @@
+"""
+Retention and compaction of old simulation.json artifacts into monthly array archives.
+
+Every run adds a ~2.8 MB simulation.json to public/<model>/<timestamp>/. Once a
+request is older than the retention threshold (and scored, so backfill no longer
+needs the file), compact moves its path matrix into
+public/archive/<model>/<YYYY-MM>.npz: one compressed float64 array per timestamp,
+plus a JSON metadata member with each request's start time, time increment and
+the other fields of its simulation.json. The JSON file is then removed; score.json
+and summary.json (rewritten from the archived paths first) stay, and the
+dashboard's request pages chart summary.json, so the request is still listed
+and charted. Each month's archive is rewritten under a per-model, per-month lock.
+
+An .npz is a zip of independent members, so load_archived reads and decompresses
+the one timestamp it is asked for. load_simulation serves a request from its
+directory or from the archive, so backtests do not care which one holds it.
+
+The archives live outside public/<model>/ because the /api/<model> routes list
+those directories. The artifacts index records each archived request.
+
+Usage:
+    python compaction.py --older-than 30            # every BTC model, dry run
+    python compaction.py base gbm --older-than 30 --apply
+    python compaction.py --load base 1738962780
+"""
+import argparse
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from artifacts import PUBLIC_DIR
+from artifacts import get_manifest
+from artifacts import default_models
+from artifacts import simulation_params
+from artifacts import update_entry
+from backfill import is_pending
+from bulk_score import prediction_to_matrix
+from helpers import convert_prices_to_time_format
+from helpers import from_iso_to_unix_time
+from summary import write_summary
+
+ARCHIVE_DIR = "archive"
+
+METADATA_KEY = "metadata"
+
+
+def archive_path(model: str, month: str, public_dir=PUBLIC_DIR) -> str:
+    return os.path.join(public_dir, ARCHIVE_DIR, model, f"{month}.npz")
+
+
+def month_of(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m")
+
+
+def _array_key(timestamp: int) -> str:
+    return f"t{timestamp}"
+
+
+def read_metadata(path: str) -> dict[str, dict]:
+    """Metadata of every request in an archive, keyed by timestamp."""
+    with np.load(path, allow_pickle=False) as archive:
+        return json.loads(str(archive[METADATA_KEY]))
+
+
+def load_archived(model: str, timestamp: int, public_dir=PUBLIC_DIR) -> tuple[np.ndarray, dict] | None:
+    """
+    The (num_simulations, num_points) paths and metadata of one archived request, or None.
+
+    Only that request's member of the archive is read and decompressed.
+    """
+    path = archive_path(model, month_of(timestamp), public_dir)
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as archive:
+        key = _array_key(timestamp)
+        if key not in archive.files:
+            return None
+        metadata = json.loads(str(archive[METADATA_KEY]))[str(timestamp)]
+        return archive[key], metadata
+
+
+def load_simulation(model: str, timestamp: int, public_dir=PUBLIC_DIR) -> dict | None:
+    """
+    simulation.json of a request, from its directory or rebuilt from the archive.
+    """
+    path = os.path.join(public_dir, model, str(timestamp), "simulation.json")
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    archived = load_archived(model, timestamp, public_dir)
+    if archived is None:
+        return None
+    paths, metadata = archived
+    predictions = convert_prices_to_time_format(paths.tolist(), metadata["start_time"], metadata["time_increment"])
+    return {**metadata["fields"], "prediction": predictions}
+
+
+def _to_archive_entry(data: dict) -> tuple[np.ndarray, dict] | None:
+    # A regular grid is all that is needed to rebuild the times; anything else stays JSON
+    prediction = data.get("prediction")
+    if not prediction or len(prediction[0]) < 2:
+        return None
+    start_time = prediction[0][0]["time"]
+    start_timestamp = from_iso_to_unix_time(start_time)
+    time_increment = from_iso_to_unix_time(prediction[0][1]["time"]) - start_timestamp
+    matrix = prediction_to_matrix(prediction, start_timestamp, len(prediction), len(prediction[0]))
+    if matrix is None or time_increment <= 0:
+        return None
+    last_time = from_iso_to_unix_time(prediction[0][-1]["time"])
+    if last_time != start_timestamp + (matrix.shape[1] - 1) * time_increment:
+        return None
+    metadata = {
+        "start_time": start_time,
+        "time_increment": time_increment,
+        "fields": {key: value for key, value in data.items() if key != "prediction"},
+    }
+    return matrix, metadata
+
+
+@contextmanager
+def _locked(model: str, month: str, public_dir=PUBLIC_DIR):
+    lock_path = os.path.join(public_dir, ARCHIVE_DIR, model, f".{month}.lock")
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with open(lock_path, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _write_archive(path: str, arrays: dict[str, np.ndarray], metadata: dict[str, dict]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # np.savez_compressed appends .npz to names without it
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(tmp_path, **arrays, **{METADATA_KEY: np.array(json.dumps(metadata))})
+    os.replace(tmp_path, path)
+
+
+def compact_month(model: str, month: str, timestamps: list[int], public_dir=PUBLIC_DIR) -> list[int]:
+    """
+    Move the simulation.json files of the given timestamps of one month into the month's archive.
+
+    Returns:
+        list[int]: The timestamps archived; files that are not a regular path matrix are left alone.
+    """
+    path = archive_path(model, month, public_dir)
+    with _locked(model, month, public_dir):
+        arrays, metadata = {}, {}
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as archive:
+                arrays = {key: archive[key] for key in archive.files if key != METADATA_KEY}
+                metadata = json.loads(str(archive[METADATA_KEY]))
+
+        archived = []
+        for timestamp in timestamps:
+            simulation_path = os.path.join(public_dir, model, str(timestamp), "simulation.json")
+            if not os.path.exists(simulation_path):
+                # Archived by another run since the index was read
+                continue
+            with open(simulation_path, "r") as f:
+                entry = _to_archive_entry(json.load(f))
+            if entry is None:
+                print(f"Keeping {model}/{timestamp}/simulation.json: not a regular path matrix")
+                continue
+            arrays[_array_key(timestamp)], metadata[str(timestamp)] = entry
+            archived.append(timestamp)
+        if not archived:
+            return []
+
+        # The archive is complete on disk before any JSON file goes away
+        _write_archive(path, arrays, metadata)
+        archive_name = os.path.relpath(path, public_dir)
+        for timestamp in archived:
+            sim_dir = os.path.join(public_dir, model, str(timestamp))
+            # The request pages chart the summary once simulation.json is gone
+            score_data = None
+            if os.path.exists(os.path.join(sim_dir, "score.json")):
+                with open(os.path.join(sim_dir, "score.json"), "r") as f:
+                    score_data = json.load(f)
+            meta = metadata[str(timestamp)]
+            write_summary(
+                model, arrays[_array_key(timestamp)], meta["start_time"], meta["time_increment"], score_data, public_dir,
+                simulation_params(meta["fields"]),
+            )
+            update_entry(model, timestamp, public_dir, archive=archive_name, drop_files=["simulation.json"])
+            os.remove(os.path.join(sim_dir, "simulation.json"))
+    return archived
+
+
+def compactable(model: str, older_than: datetime, public_dir=PUBLIC_DIR) -> dict[str, list[int]]:
+    """Timestamps per month whose simulation.json is past retention and not waiting for a score."""
+    months = {}
+    for entry in get_manifest(model, public_dir)["entries"].values():
+        timestamp = entry["timestamp"]
+        if timestamp >= older_than.timestamp() or "simulation.json" not in entry.get("files", {}):
+            continue
+        if is_pending(entry):
+            continue
+        months.setdefault(month_of(timestamp), []).append(timestamp)
+    return {month: sorted(timestamps) for month, timestamps in sorted(months.items())}
+
+
+def compact(models: list[str] | None = None, older_than_days=30, apply=False, public_dir=PUBLIC_DIR) -> dict:
+    """
+    Archive the simulations of the given models (the BTC models by default) older than older_than_days.
+
+    Without apply, only reports what would be archived.
+
+    Returns:
+        dict: model -> archived (or archivable) timestamps.
+    """
+    older_than = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    results = {}
+    for model in models or default_models(public_dir):
+        months = compactable(model, older_than, public_dir)
+        results[model] = []
+        for month, timestamps in months.items():
+            if not apply:
+                print(f"{model} {month}: {len(timestamps)} simulations to archive")
+                results[model].extend(timestamps)
+                continue
+            archived = compact_month(model, month, timestamps, public_dir)
+            results[model].extend(archived)
+            size = os.path.getsize(archive_path(model, month, public_dir))
+            print(f"😊😊😊 {model} {month}: archived {len(archived)} simulations, archive is {size:,} bytes")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old simulation.json files into monthly compressed archives.")
+    parser.add_argument("models", nargs="*", help="Models to compact (default: every BTC model under public/)")
+    parser.add_argument("--older-than", type=float, default=30, help="Retention threshold in days")
+    parser.add_argument("--apply", action="store_true", help="Archive and delete the JSON files (default: dry run)")
+    parser.add_argument("--load", nargs=2, metavar=("MODEL", "TIMESTAMP"), help="Print one archived request")
+    args = parser.parse_args()
+
+    if args.load:
+        archived = load_archived(args.load[0], int(args.load[1]))
+        if archived is None:
+            raise SystemExit("Not archived")
+        paths, metadata = archived
+        print(f"{paths.shape[0]} paths x {paths.shape[1]} points from {metadata['start_time']}, step {metadata['time_increment']}s")
+        return
+    compact(args.models or None, args.older_than, args.apply)
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from artifacts import record_file
+from summary import summarize_file
 from helpers import get_real_price_path, convert_prices_to_time_format, calculate_crps_for_miner, align_prediction_and_real_prices, from_iso_to_unix_time
 from datetime import datetime, timedelta
 import numpy as np
@@ -68,6 +70,8 @@ def main():
       }, f, indent=2)
 
   print(f"Results saved to: {filepath}")
+  record_file(filepath)
+  summarize_file(filepath)
 
   real_path_file = os.path.join("../../public/real", str(from_iso_to_unix_time(start_time)), "real.json")
   if not os.path.exists(real_path_file):
@@ -103,6 +107,8 @@ def main():
   os.makedirs(os.path.dirname(score_path), exist_ok=True)
   with open(score_path, 'w') as f:
       json.dump(score_data, f, indent=2)
+  record_file(score_path)
+  summarize_file(score_path)
 
   print(f"😊😊😊 Total score: {crps_score}")
 
@@ -0,0 +1,123 @@
+"""
+Query benchmark for the miner_scores indexes against the local SQLite stand-in.
+
+For each table size, a fresh stand-in database is filled with synthetic scores
+(every prompt scores all miners at one scored_time, like the validator does),
+and the dashboard lookups are timed without and then with the indexes from db.py.
+
+Usage:
+    python db_benchmark.py                    # 10k, 100k and 1M rows
+    python db_benchmark.py 100000 5000000
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy import func
+
+import db
+
+NUM_MINERS = 256
+PROMPT_SECONDS = 600
+
+QUERIES = {
+    "latest score of a miner": lambda uid, since: (
+        select(db.miner_scores.c.prompt_score, db.miner_scores.c.scored_time)
+        .where(db.miner_scores.c.miner_uid == uid)
+        .order_by(db.miner_scores.c.scored_time.desc())
+        .limit(1)
+    ),
+    "24h history of a miner": lambda uid, since: (
+        select(db.miner_scores.c.prompt_score, db.miner_scores.c.scored_time)
+        .where(db.miner_scores.c.miner_uid == uid)
+        .where(db.miner_scores.c.scored_time >= since)
+        .order_by(db.miner_scores.c.scored_time)
+    ),
+    "latest scores of all miners": lambda uid, since: (
+        select(db.miner_scores.c.miner_uid, db.miner_scores.c.prompt_score)
+        .where(db.miner_scores.c.scored_time == select(func.max(db.miner_scores.c.scored_time)).scalar_subquery())
+    ),
+}
+
+
+def fill_scores(engine, num_rows: int, start: datetime):
+    """Insert num_rows synthetic scores, NUM_MINERS per prompt."""
+    rng = np.random.default_rng(0)
+    batch = []
+    with engine.begin() as connection:
+        for i in range(num_rows):
+            prompt, uid = divmod(i, NUM_MINERS)
+            batch.append((
+                uid,
+                # The text format SQLAlchemy uses for DateTime on SQLite, so range filters compare correctly
+                (start + timedelta(seconds=prompt * PROMPT_SECONDS)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+                i,
+                float(rng.gamma(2.0, 1000.0)),
+                "[]",
+            ))
+            if len(batch) == 50000:
+                connection.exec_driver_sql(
+                    "INSERT INTO miner_scores (miner_uid, scored_time, miner_predictions_id, prompt_score, score_details) "
+                    "VALUES (?, ?, ?, ?, ?)", batch
+                )
+                batch = []
+        if batch:
+            connection.exec_driver_sql(
+                "INSERT INTO miner_scores (miner_uid, scored_time, miner_predictions_id, prompt_score, score_details) "
+                "VALUES (?, ?, ?, ?, ?)", batch
+            )
+
+
+def time_queries(engine, end: datetime, repeats=20) -> dict[str, float]:
+    """Median milliseconds per query, over random miners."""
+    rng = np.random.default_rng(1)
+    timings = {}
+    with engine.connect() as connection:
+        for name, build in QUERIES.items():
+            samples = []
+            for _ in range(repeats):
+                query = build(int(rng.integers(NUM_MINERS)), end - timedelta(days=1))
+                started = time.perf_counter()
+                connection.execute(query).fetchall()
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[name] = float(np.median(samples))
+    return timings
+
+
+def run(num_rows: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    engine = db.create_database_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine, tables=[db.miner_scores])
+    for index in db.miner_scores.indexes:
+        index.drop(engine)
+
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    end = start + timedelta(seconds=(num_rows // NUM_MINERS) * PROMPT_SECONDS)
+    fill_scores(engine, num_rows, start)
+
+    without_indexes = time_queries(engine, end)
+    started = time.perf_counter()
+    for index in db.miner_scores.indexes:
+        index.create(engine)
+    build_seconds = time.perf_counter() - started
+    with_indexes = time_queries(engine, end)
+
+    engine.dispose()
+    os.remove(path)
+    return {"without": without_indexes, "with": with_indexes, "build_seconds": build_seconds}
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for num_rows in sizes:
+        result = run(num_rows)
+        print(f"\n😊😊😊 {num_rows:,} miner_scores rows (indexes built in {result['build_seconds']:.2f}s)")
+        for name in QUERIES:
+            print(f"{name:30s} no index {result['without'][name]:9.3f} ms   indexed {result['with'][name]:7.3f} ms")
+
+if __name__ == "__main__":
+    main()
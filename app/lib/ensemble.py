@@ -0,0 +1,179 @@
+"""
+Ensemble model that mixes the paths other models already simulated for a request.
+
+Mixture weights are a softmax over each model's recent mean CRPS (lower is
+better, as in helpers.compute_softmax), taken only from requests that started
+before this one. The submission is assembled by sampling paths from each
+model's matrix in proportion to the weights, so a run costs a few JSON reads and
+one fancy-indexing gather. Recent scores come from the artifacts index.
+
+Usage:
+    python ensemble.py 2025-02-26T07:38:00+00:00
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+from artifacts import default_models
+from artifacts import list_entries
+from artifacts import simulation_params
+from artifacts import write_artifact
+from bulk_score import prediction_to_matrix
+from helpers import convert_prices_to_time_format
+from helpers import from_iso_to_unix_time
+from summary import write_summary
+
+PUBLIC_DIR = "../../public"
+
+def recent_model_scores(models: list[str], before: int, lookback=10, public_dir=PUBLIC_DIR) -> dict[str, float]:
+    """
+    Mean total CRPS of each model over the last `lookback` requests before `before` that every model scored.
+
+    Averaging over the same requests keeps one model's calm days from being
+    compared with another's volatile ones. Models without any scored request
+    before `before` are left out; if the others share no request, no scores are returned.
+    """
+    totals = {}
+    for model in models:
+        # One index read per model instead of a score.json read per request
+        entries = list_entries(model, scored=True, before=before, public_dir=public_dir)
+        if entries:
+            totals[model] = {entry["timestamp"]: entry["total_score"] for entry in entries}
+    if not totals:
+        return {}
+    common = sorted(set.intersection(*(set(scores) for scores in totals.values())))[-lookback:]
+    if not common:
+        return {}
+    return {model: float(np.mean([scores[timestamp] for timestamp in common])) for model, scores in totals.items()}
+
+
+def mixture_weights(model_scores: dict[str, float], temperature=1000.0) -> dict[str, float]:
+    """
+    Softmax over negative recent CRPS, with the same 1/1000 scale as helpers.compute_softmax by default.
+    """
+    models = list(model_scores)
+    values = np.array([model_scores[model] for model in models], dtype=np.float64)
+    # Shifting by the best score leaves the softmax unchanged and keeps exp from underflowing
+    exp_scores = np.exp(-(values - values.min()) / temperature)
+    weights = exp_scores / exp_scores.sum()
+    return dict(zip(models, weights.tolist()))
+
+
+def load_model_paths(model: str, start_timestamp: int, public_dir=PUBLIC_DIR) -> tuple[np.ndarray, dict] | None:
+    """The (num_simulations, num_points) matrix and variables a model saved for a request, or None."""
+    path = os.path.join(public_dir, model, str(start_timestamp), "simulation.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        data = json.load(f)
+    prediction = data["prediction"]
+    if not prediction:
+        return None
+    matrix = prediction_to_matrix(prediction, start_timestamp, len(prediction), len(prediction[0]))
+    if matrix is None:
+        return None
+    return matrix, simulation_params(data)
+
+
+def sample_mixture(matrices: list[np.ndarray], weights: np.ndarray, num_simulations: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw num_simulations paths from the model matrices in proportion to weights.
+
+    Each model contributes a multinomial count of paths, taken without replacement
+    while it has enough of them.
+    """
+    counts = rng.multinomial(num_simulations, weights)
+    # Gathered per model: the matrices may hold different numbers of paths
+    return np.concatenate([
+        matrix[rng.choice(len(matrix), size=count, replace=count > len(matrix))]
+        for matrix, count in zip(matrices, counts)
+    ])
+
+
+def build_ensemble(
+    start_time: str,
+    models: list[str] | None = None,
+    num_simulations=100,
+    lookback=10,
+    temperature=1000.0,
+    seed=None,
+    public_dir=PUBLIC_DIR,
+) -> tuple[np.ndarray, dict]:
+    """
+    Mix the paths already simulated for start_time.
+
+    Only models whose matrices share the request grid and have recent scores take part.
+
+    Returns:
+        tuple: ((num_simulations, num_points) ensemble paths, variables for simulation.json)
+    """
+    start_timestamp = from_iso_to_unix_time(start_time)
+    models = models or default_models(public_dir)
+
+    loaded = {}
+    for model in models:
+        result = load_model_paths(model, start_timestamp, public_dir)
+        if result is not None:
+            loaded[model] = result
+    if not loaded:
+        raise ValueError(f"No model simulations found for {start_time}")
+
+    # Models must share the grid of the majority shape to be mixed
+    shapes = [matrix.shape[1] for matrix, _ in loaded.values()]
+    num_points = max(set(shapes), key=shapes.count)
+    loaded = {model: result for model, result in loaded.items() if result[0].shape[1] == num_points}
+
+    model_scores = recent_model_scores(list(loaded), start_timestamp, lookback, public_dir)
+    if model_scores:
+        weights = mixture_weights(model_scores, temperature)
+    else:
+        # No history yet: mix uniformly
+        weights = {model: 1 / len(loaded) for model in loaded}
+    mixed_models = list(weights)
+
+    rng = np.random.default_rng(seed)
+    paths = sample_mixture(
+        [loaded[model][0] for model in mixed_models],
+        np.array([weights[model] for model in mixed_models]),
+        num_simulations,
+        rng,
+    )
+
+    first_variable = loaded[mixed_models[0]][1]
+    variable = {
+        "current_price": float(paths[0, 0]),
+        "time_increment": first_variable.get("time_increment", 300),
+        "time_length": first_variable.get("time_length", 86400),
+        "num_simulations": num_simulations,
+        "start_time": start_time,
+        "weights": weights,
+        "recent_scores": model_scores,
+        "lookback": lookback,
+        "temperature": temperature,
+        "model": "ensemble",
+    }
+    print(f"😊😊😊 Ensemble weights: {weights}")
+    return paths, variable
+
+
+def generate_simulations(start_time: str, save=True, **kwargs) -> list[list[dict]]:
+    paths, variable = build_ensemble(start_time, **kwargs)
+    predictions = convert_prices_to_time_format(paths.tolist(), start_time, variable["time_increment"])
+    if save:
+        filepath = write_artifact(
+            "ensemble", from_iso_to_unix_time(start_time), "simulation.json",
+            {"variable": variable, "prediction": predictions}, kwargs.get("public_dir", PUBLIC_DIR),
+        )
+        write_summary("ensemble", paths, start_time, variable["time_increment"], public_dir=kwargs.get("public_dir", PUBLIC_DIR), variable=variable)
+        print(f"Results saved to: {filepath}")
+    return predictions
+
+
+def main():
+    start_time = sys.argv[1] if len(sys.argv) > 1 else "2025-02-26T07:38:00+00:00"
+    generate_simulations(start_time)
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,14 @@ from arch import arch_model
 
 import os
 import json
+from artifacts import record_file
+from summary import summarize_file
 from helpers import get_published_asset_price
 from helpers import convert_prices_to_time_format
 from helpers import get_real_price_path
 from helpers import calculate_crps_for_miner
 from helpers import align_prediction_and_real_prices
+import indicators
 
 import pandas as pd
 import numpy as np
@@ -19,44 +22,8 @@ import yfinance as yf
 import warnings
 from arch import arch_model
 
-def analyze_trend(df, lookback_window=24):
-    """Analyze recent price trend and momentum"""
-    # Calculate various trend indicators
-    df['returns'] = df['Close'].pct_change()
-    df['sma'] = df['Close'].rolling(window=lookback_window).mean()
-    df['momentum'] = df['Close'] / df['Close'].shift(lookback_window) - 1
-    
-    # Get latest values - use .iloc[-1] to get scalar values
-    current_price = float(df['Close'].iloc[-1])  # Convert to float
-    sma = float(df['sma'].iloc[-1]) if pd.notna(df['sma'].iloc[-1]) else None  # Convert to float or None
-    momentum = float(df['momentum'].iloc[-1])  # Convert to float
-    recent_returns = df['returns'].tail(lookback_window)
-    
-    # Calculate trend strength
-    trend_strength = 0
-    
-    # Price vs SMA
-    if sma is not None and current_price > sma:  # Compare scalar values
-        trend_strength += 1
-    else:
-        trend_strength -= 1
-        
-    # Momentum
-    if momentum > 0:
-        trend_strength += 1
-    else:
-        trend_strength -= 1
-        
-    # Recent returns
-    if recent_returns.mean() > 0:
-        trend_strength += 1
-    else:
-        trend_strength -= 1
-        
-    return trend_strength, momentum
-
 def simulate_garch_price_paths(initial_price: float, start_time: str, time_increment: int, 
-                             time_length: int, num_simulations: int):
+                             time_length: int, num_simulations: int, dtype=np.float64):
     warnings.filterwarnings('ignore')
 
     # Download historical data with a longer lookback period and shorter interval
@@ -80,7 +47,8 @@ def simulate_garch_price_paths(initial_price: float, start_time: str, time_incre
         raise ValueError(f"Unable to obtain sufficient historical data for any interval")
 
     # Analyze trend
-    trend_strength, momentum = analyze_trend(df)
+    close = np.asarray(df['Close'], dtype=float).reshape(-1)
+    trend_strength, momentum = indicators.trend_strength(("BTC-USD", interval), close, start_time)
     print(f"\nTrend Analysis:")
     print(f"Trend Strength: {trend_strength} (-3 to +3 scale)")
     print(f"Momentum: {momentum:.2%}")
@@ -95,7 +63,7 @@ def simulate_garch_price_paths(initial_price: float, start_time: str, time_incre
     # Additional check after data cleaning
     if len(df) < 24:
         print("Warning: Using simplified model due to insufficient clean data")
-        return simulate_simplified_paths(initial_price, num_simulations, time_length)
+        return simulate_simplified_paths(initial_price, num_simulations, time_length, dtype)
 
     # Fit ARCH model with error handling
     try:
@@ -107,7 +75,7 @@ def simulate_garch_price_paths(initial_price: float, start_time: str, time_incre
         results = model.fit(disp='off', update_freq=0)
     except Exception as e:
         print(f"Error fitting GARCH model: {e}")
-        return simulate_simplified_paths(initial_price, num_simulations, time_length)
+        return simulate_simplified_paths(initial_price, num_simulations, time_length, dtype)
 
     # Get the last variance forecast
     last_variance = results.forecast().variance.iloc[-1] ** 0.5
@@ -185,7 +153,7 @@ def simulate_garch_price_paths(initial_price: float, start_time: str, time_incre
         return prices
 
     # Simulate multiple paths with improved error handling
-    S = np.zeros((M + 1, I))
+    S = np.zeros((M + 1, I), dtype=dtype)
     valid_paths = 0
     max_attempts = I * 2  # Allow some retry attempts
     attempt = 0
@@ -204,7 +172,7 @@ def simulate_garch_price_paths(initial_price: float, start_time: str, time_incre
 
     if valid_paths == 0:
         print("Warning: No valid paths generated. Falling back to simplified model.")
-        return simulate_simplified_paths(initial_price, num_simulations, time_length)
+        return simulate_simplified_paths(initial_price, num_simulations, time_length, dtype)
 
     # Analysis of results
     closing_prices = S[-1]
@@ -222,10 +190,10 @@ def simulate_garch_price_paths(initial_price: float, start_time: str, time_incre
     
     return S.T
 
-def simulate_simplified_paths(initial_price, num_simulations, time_length):
+def simulate_simplified_paths(initial_price, num_simulations, time_length, dtype=np.float64):
     """Fallback method using a simple geometric Brownian motion model"""
     M = time_length // 300  # Number of 5-min intervals
-    paths = np.zeros((num_simulations, M + 1))
+    paths = np.zeros((num_simulations, M + 1), dtype=dtype)
     paths[:, 0] = initial_price
     
     # Use historical volatility estimate
@@ -241,7 +209,7 @@ def simulate_simplified_paths(initial_price, num_simulations, time_length):
     return paths
 
 def simulate_crypto_price_paths(
-    current_price, time_increment, time_length, num_simulations, start_time: str | None = None
+    current_price, time_increment, time_length, num_simulations, start_time: str | None = None, dtype=np.float64
 ):
     """
     Simulate multiple crypto asset price paths.
@@ -250,7 +218,7 @@ def simulate_crypto_price_paths(
     if start_time is None:
         start_time = datetime.now().isoformat()
     
-    simulations = simulate_garch_price_paths(current_price, start_time,time_increment, time_length, num_simulations)
+    simulations = simulate_garch_price_paths(current_price, start_time,time_increment, time_length, num_simulations, dtype)
 
     print(simulations)
 
@@ -270,12 +238,15 @@ def simulate_crypto_price_paths(
                 "time_increment": time_increment,
                 "time_length": time_length,
                 "num_simulations": num_simulations,
-                "start_time": start_time
+                "start_time": start_time,
+                "dtype": np.dtype(dtype).name
 
             },
             "prediction": predictions
         }, f, indent=2)
     print(f"Results saved to: {filepath}")
+    record_file(filepath)
+    summarize_file(filepath)
     
     return predictions
 
@@ -336,6 +307,8 @@ def main():
         json.dump(score_data, f, indent=2)
 
     print(f"Score data saved to: {score_path}")
+    record_file(score_path)
+    summarize_file(score_path)
 
 if __name__ == "__main__":
     main()
@@ -3,15 +3,21 @@ import pandas as pd
 from datetime import datetime, timezone, timedelta
 import os
 import json
+from artifacts import record_file
+from summary import summarize_file
 from helpers import from_iso_to_unix_time
 from helpers import get_published_asset_price
 from helpers import convert_prices_to_time_format
 from helpers import get_real_price_path
 from helpers import calculate_crps_for_miner
 from helpers import align_prediction_and_real_prices
+from helpers import get_prices
+from helpers import to_price_records
+from innovation_bank import get_bank
+from sampling import standard_normal_draws
 
 def simulate_crypto_price_paths(
-    current_price, time_increment, time_length, num_simulations, sigma, start_time: str | None = None, volatility_type="hourly"
+    current_price, time_increment, time_length, num_simulations, sigma, start_time: str | None = None, volatility_type="hourly", dtype=np.float64, sampling="pseudo", bank=None
 ):
     """
     Simulate multiple crypto asset price paths.
@@ -20,7 +26,7 @@ def simulate_crypto_price_paths(
     if start_time is None:
         start_time = datetime.now().isoformat()
     
-    simulations = simulate_gbm_price_paths(current_price=current_price, time_increment=time_increment, time_length=time_length, num_simulations=num_simulations, sigma=sigma, volatility_type=volatility_type)
+    simulations = simulate_gbm_price_paths(current_price=current_price, time_increment=time_increment, time_length=time_length, num_simulations=num_simulations, sigma=sigma, volatility_type=volatility_type, dtype=dtype, sampling=sampling, bank=bank)
 
     predictions = convert_prices_to_time_format(
         simulations.tolist(), str(start_time), time_increment
@@ -41,16 +47,21 @@ def simulate_crypto_price_paths(
                 "sigma": sigma,
                 "start_time": start_time,
                 "volatility_type": volatility_type,
+                "dtype": np.dtype(dtype).name,
+                "sampling": sampling,
+                "innovation_bank": bank is not None,
                 "model": "gbm"
             },
             "prediction": predictions
         }, f, indent=2)
 
     print(f"Results saved to: {filepath}")
+    record_file(filepath)
+    summarize_file(filepath)
     
     return predictions
 
-def simulate_gbm_price_paths(current_price, time_increment, time_length, num_simulations, sigma, volatility_type="hourly"):
+def simulate_gbm_price_paths(current_price, time_increment, time_length, num_simulations, sigma, volatility_type="hourly", dtype=np.float64, sampling="pseudo", bank=None):
     """
     Simulates num_simulations prices paths using a GBM model.
     Args:
@@ -60,6 +71,10 @@ def simulate_gbm_price_paths(current_price, time_increment, time_length, num_sim
     num_simulations: The number of paths to simulate.
     sigma: The hourly or daily volatility parameter of the GBM model.
     volatility_type: The type of volatility to use.
+    dtype: The float precision of the simulation (np.float64 or np.float32).
+    sampling: How the normal innovations are drawn, see sampling.SAMPLING_MODES.
+    bank: Optional innovation_bank.InnovationBank of matching shape and sampling; the paths are
+        then a scale-and-exp over one unused slice of its cumulative sums instead of fresh draws.
     Returns:
     np.array: A numpy array where each row corresponds to a simulated path.
     """
@@ -67,28 +82,44 @@ def simulate_gbm_price_paths(current_price, time_increment, time_length, num_sim
     one_hour = 3600
     one_day = 86400
     dt = time_increment / one_hour if volatility_type == "hourly" else time_increment / one_day
-    simulated_prices = np.zeros((num_simulations, num_steps + 1))
+    simulated_prices = np.empty((num_simulations, num_steps + 1), dtype=dtype)
     simulated_prices[:,0] = current_price
-
-    dW = np.random.normal(0, 1, (num_simulations, num_steps))
-    dS = np.exp(((-0.5 * sigma**2) * dt) + (sigma * np.sqrt(dt) * dW))
-    for t in range(1, num_steps + 1):
-        simulated_prices[:,t] = simulated_prices[:,t-1] * dS[:,t-1]
+    # Scalars of the simulation dtype: float64 NumPy scalars would promote float32 arrays to float64
+    drift = simulated_prices.dtype.type((-0.5 * sigma**2) * dt)
+    diffusion = simulated_prices.dtype.type(sigma * np.sqrt(dt))
+
+    if bank is not None:
+        if (bank.num_simulations, bank.num_steps) != (num_simulations, num_steps):
+            raise ValueError(f"Innovation bank shape {(bank.num_simulations, bank.num_steps)} does not match {(num_simulations, num_steps)}")
+        if bank.sampling != sampling:
+            raise ValueError(f"Innovation bank sampling {bank.sampling} does not match {sampling}")
+        _, cumulative = bank.take()
+        cumulative = cumulative.astype(dtype, copy=False)
+        steps = np.arange(1, num_steps + 1, dtype=dtype)
+        simulated_prices[:,1:] = np.exp(drift * steps + diffusion * cumulative)
+        simulated_prices[:,1:] *= simulated_prices[:,:1]
+        return simulated_prices
+
+    dW = standard_normal_draws(num_simulations, num_steps, sampling, dtype)
+    dS = np.exp(drift + diffusion * dW)
+    np.cumprod(dS, axis=1, out=simulated_prices[:,1:])
+    simulated_prices[:,1:] *= simulated_prices[:,:1]
         
     return simulated_prices
 
-def _calc_params(history_data: list[dict], volatility_type="hourly"):
+def _calc_params(history_data, volatility_type="hourly"):
     """
     Calculate the hourly volatility of the asset price path.
 
     Args:
-        history_data: List of dictionaries containing price history for 24 hours with 5-minute intervals
+        history_data: Price history for 24 hours with 5-minute intervals, as a list of
+            {"time","price"} dictionaries or a columnar (times, prices) pair
         
     Returns:
         float: hourly or daily volatility (sigma) for use in GBM simulation
     """
     # Extract prices and convert to numpy array
-    prices = np.array([price['price'] for price in history_data])
+    prices = get_prices(history_data)
     
     # Calculate log returns
     log_returns = np.log(prices[1:] / prices[:-1])
@@ -119,13 +150,14 @@ def main():
     # Get the real price path for the past 7 days
     duration = 86400 * 7
     start_time_history = start_time_parsed - timedelta(days=7)
-    history_data = get_real_price_path(duration=duration, time_increment=1, resolution=5, start_time=start_time_history.isoformat())
+    history_data = get_real_price_path(duration=duration, time_increment=1, resolution=5, start_time=start_time_history.isoformat(), columnar=True)
 
     with open("history_data.json", "w") as f:
-        json.dump(history_data, f, indent=2)
+        json.dump(to_price_records(*history_data), f, indent=2)
     
     volatility_type = "hourly"
     sigma = _calc_params(history_data, volatility_type)
+    bank = get_bank(100, 288)
 
     predictions = simulate_crypto_price_paths(
         current_price=current_price,
@@ -134,7 +166,8 @@ def main():
         num_simulations=100,
         sigma=56.68 / 10000,
         start_time=start_time,
-        volatility_type=volatility_type
+        volatility_type=volatility_type,
+        bank=bank if bank.exists() else None
     )
     
     real_path_file = os.path.join("../../public/real", str(from_iso_to_unix_time(start_time)), "real.json")
@@ -172,6 +205,8 @@ def main():
         json.dump(score_data, f, indent=2)
 
     print(f"Score data saved to: {score_path}")
+    record_file(score_path)
+    summarize_file(score_path)
 
 if __name__ == "__main__":
     main()
@@ -4,8 +4,8 @@ import pandas as pd
 import requests
 import json
 import os
-from properscoring import crps_ensemble
 import typing
+from concurrent.futures import ThreadPoolExecutor
 
 def from_iso_to_unix_time(iso_time: str) -> int:
     # Convert to a datetime object
@@ -59,85 +59,140 @@ def compute_softmax(score_values: np.ndarray) -> np.ndarray:
 
     return softmax_scores
 
+# Pyth benchmark symbols and Hermes price feed IDs per asset code
+ASSETS = {
+    "BTC": {
+        "symbol": "Crypto.BTC/USD",
+        "price_id": "e62df6c8b4a85fe1a67db44dc12de5db330f7ac66b72dc658afedf0f4a415b43",
+    },
+    "ETH": {
+        "symbol": "Crypto.ETH/USD",
+        "price_id": "ff61491a931112ddf1bd8147cd1b641375f79f5825126d665480874634fd0ace",
+    },
+    "SOL": {
+        "symbol": "Crypto.SOL/USD",
+        "price_id": "ef0d8b6fda2ceba41da15d4095d1da392a0d2f8ed0c6c7bc0f4cfac8c280b56d",
+    },
+    "XAU": {
+        "symbol": "Metal.XAU/USD",
+        "price_id": "765d2ba906dbc32ca17cc11f5310a89e9ee1f6420508c63861f2f8ba4ee34bb2",
+    },
+}
+
+HERMES_URL = "https://hermes.pyth.network/v2/updates/price"
+BENCHMARKS_URL = "https://benchmarks.pyth.network/v1/shims/tradingview/history"
+
+def get_asset(asset: str) -> dict:
+    """Returns the registry entry (Pyth symbol and price feed ID) for an asset code."""
+    if asset not in ASSETS:
+        raise ValueError(f"Unsupported asset: {asset}. Expected one of {list(ASSETS)}")
+    return ASSETS[asset]
+
+def _fetch_hermes_prices(endpoint: str, assets: list[str]) -> dict[str, float | None]:
+    """
+    Fetch the prices of several assets with one Hermes request.
+
+    Returns:
+        dict: Asset code to price, or None for assets missing from the response or on error.
+    """
+    prices = {asset: None for asset in assets}
+    try:
+        ids = {get_asset(asset)["price_id"]: asset for asset in assets}
+        response = requests.get(endpoint, params=[("ids[]", price_id) for price_id in ids])
+        response.raise_for_status()
+        data = response.json()
+        if not data:
+            raise ValueError("No price data received")
+        for price_feed in data["parsed"]:
+            asset = ids.get(price_feed["id"].removeprefix("0x"))
+            if asset is not None:
+                price = price_feed["price"]
+                prices[asset] = float(price["price"]) * 10 ** int(price["expo"])
+    except Exception as e:
+        print(f"Error fetching {', '.join(assets)} prices: {e}")
+
+    return prices
+
+def get_latest_asset_prices(assets: list[str]) -> dict[str, float | None]:
+    """
+    Retrieves the current prices of several assets in one Hermes request.
+
+    Returns:
+        dict: Asset code to current price (None if unavailable).
+    """
+    return _fetch_hermes_prices(f"{HERMES_URL}/latest", assets)
+
+def get_published_asset_prices(assets: list[str], publish_time: int | None = None) -> dict[str, float | None]:
+    """
+    Retrieves the prices of several assets published at publish_time in one Hermes request.
+    """
+    if publish_time is None:
+        publish_time = int(datetime.now().timestamp())
+    return _fetch_hermes_prices(f"{HERMES_URL}/{publish_time}", assets)
+
 def get_latest_asset_price(asset="BTC") -> float | None:
     """
     Retrieves the current price of the specified asset.
-    Currently, supports BTC via Pyth Network.
+    Supports every asset in ASSETS via Pyth Network.
 
     Returns:
         float: Current asset price.
     """
-    if asset == "BTC":
-        btc_price_id = (
-            "e62df6c8b4a85fe1a67db44dc12de5db330f7ac66b72dc658afedf0f4a415b43"
-        )
-        
-        endpoint = f"https://hermes.pyth.network/v2/updates/price/latest?ids[]={btc_price_id}"
-        try:
-            response = requests.get(endpoint)
-            response.raise_for_status()
-            data = response.json()
-            print(data)
-            if not data :
-                raise ValueError("No price data received")
-            price_feed = data["parsed"][0]
-            price = float(price_feed["price"]["price"]) / (10**8)
-            return price
-        except Exception as e:
-            
-            print(f"Error fetching {asset} price: {e}")
-            return None
+    return get_latest_asset_prices([asset])[asset]
         
 def get_published_asset_price(asset="BTC", publish_time: int | None = None) -> float | None:
     """
     Retrieves the published price of the specified asset.
     """
-    if publish_time is None:
-        publish_time = int(datetime.now().timestamp())
-    
-    if asset == "BTC":
-        btc_price_id = (
-            "e62df6c8b4a85fe1a67db44dc12de5db330f7ac66b72dc658afedf0f4a415b43"
-        )
+    return get_published_asset_prices([asset], publish_time)[asset]
         
-        endpoint = f"https://hermes.pyth.network/v2/updates/price/{publish_time}?ids[]={btc_price_id}"
-        try:
-            response = requests.get(endpoint)
-            response.raise_for_status()
-            data = response.json()
-            if not data:
-                raise ValueError("No price data received")
-            price_feed = data["parsed"][0]
-            price = float(price_feed["price"]["price"]) / (10**8)
-            return price
-        except Exception as e:
-            print(f"Error fetching {asset} price: {e}")
-            return None
-        
-def transform_data(data, time_increment=5):
-    if data is None or len(data) == 0:
-        return []
-
-    timestamps = data["t"]
-    close_prices = data["c"]
-    print(datetime.fromtimestamp(
-                timestamps[0], timezone.utc
-            ).isoformat())
-    transformed_data = [
-        {
-            "time": datetime.fromtimestamp(
-                timestamps[i], timezone.utc
-            ).isoformat(),
-            "price": float(close_prices[i]),
-        }
-        for i in range(len(timestamps) - 1, -1, -time_increment)
-    ][::-1]
+def transform_data(data, time_increment=5) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Keep every time_increment-th bar of a Pyth history response, counting back from the last bar.
+
+    Args:
+        data: Pyth TradingView history response with "t" (timestamps) and "c" (close prices).
+        time_increment: Keep one bar out of every time_increment.
 
-    return transformed_data
+    Returns:
+        tuple: (epoch seconds as an int64 array, close prices as a float64 array),
+               in chronological order. Use to_price_records to get {"time","price"} entries.
+    """
+    if data is None or len(data) == 0 or len(data["t"]) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    timestamps = np.asarray(data["t"], dtype=np.int64)
+    close_prices = np.asarray(data["c"], dtype=np.float64)
+
+    # Same bars as range(len - 1, -1, -time_increment) reversed: the last bar
+    # and every time_increment-th bar before it
+    first = (len(timestamps) - 1) % time_increment
+    return timestamps[first::time_increment], close_prices[first::time_increment]
+
+def to_price_records(times: np.ndarray, prices: np.ndarray) -> list[dict]:
+    """
+    Convert a columnar (epoch seconds, prices) pair to {"time","price"} entries with UTC ISO times.
+    """
+    iso_times = np.datetime_as_string(np.asarray(times, dtype="datetime64[s]"), unit="s")
+    return [
+        {"time": f"{time}+00:00", "price": price}
+        for time, price in zip(iso_times.tolist(), np.asarray(prices, dtype=np.float64).tolist())
+    ]
+
+def get_prices(history_data) -> np.ndarray:
+    """
+    Price array from either a list of {"time","price"} entries or a columnar (times, prices) pair.
+    """
+    if isinstance(history_data, tuple):
+        return np.asarray(history_data[1], dtype=np.float64)
+    return np.array([entry["price"] for entry in history_data], dtype=np.float64)
 
-def get_real_price_path(asset="BTC", duration=86400, resolution=1, time_increment=5, start_time=None):
+def get_real_price_path(asset="BTC", duration=86400, resolution=1, time_increment=5, start_time=None, columnar=False):
     """
     Retrieves the past price path of the specified asset.
+
+    Returns a list of {"time","price"} entries, or the (times, prices) arrays
+    from transform_data when columnar=True.
     """
     try:
         if start_time is None:
@@ -148,25 +203,83 @@ def get_real_price_path(asset="BTC", duration=86400, resolution=1, time_incremen
             start_time = from_iso_to_unix_time(str(start_time))
             end_time = start_time + duration
         params = {
-            "symbol": "Crypto.BTC/USD",
+            "symbol": get_asset(asset)["symbol"],
             "resolution": resolution,
             "from": start_time,
             "to": end_time,
         }
-        BASE_URL = "https://benchmarks.pyth.network/v1/shims/tradingview/history"
         
-        response = requests.get(BASE_URL, params=params)
+        response = requests.get(BENCHMARKS_URL, params=params)
         response.raise_for_status()
         
         data = response.json()
-        transformed_data = transform_data(data, time_increment=time_increment)
-        return transformed_data
+        times, prices = transform_data(data, time_increment=time_increment)
+        if columnar:
+            return times, prices
+        return to_price_records(times, prices)
             
     except Exception as e:
         print(f"Error fetching {asset} price: {e}")
         raise e
 
 
+def get_real_price_paths(assets: list[str], duration=86400, resolution=1, time_increment=5, start_time=None, columnar=False) -> dict:
+    """
+    Retrieves the past price paths of several assets, one concurrent request per asset.
+
+    Takes the same arguments as get_real_price_path, applied to every asset.
+
+    Returns:
+        dict: Asset code to price path.
+    """
+    with ThreadPoolExecutor(max_workers=max(len(assets), 1)) as executor:
+        futures = {
+            asset: executor.submit(get_real_price_path, asset, duration, resolution, time_increment, start_time, columnar)
+            for asset in assets
+        }
+        return {asset: future.result() for asset, future in futures.items()}
+
+def is_complete_real_price_path(real_prices: list[dict], start_time: str, duration=86400) -> bool:
+    """Whether a real price path covers its whole window, up to and including the last point."""
+    if not real_prices:
+        return False
+    start_timestamp = from_iso_to_unix_time(start_time)
+    return (
+        from_iso_to_unix_time(real_prices[0]["time"]) <= start_timestamp
+        and from_iso_to_unix_time(real_prices[-1]["time"]) == start_timestamp + duration
+    )
+
+def real_price_path_file(start_time: str, public_dir="../../public", asset="BTC") -> str:
+    """public/real/<ts>/real.json for BTC, public/real/<ts>/real-<asset>.json for other assets."""
+    name = "real.json" if asset == "BTC" else f"real-{asset.lower()}.json"
+    return os.path.join(public_dir, "real", str(from_iso_to_unix_time(start_time)), name)
+
+def load_real_price_path(start_time: str, public_dir="../../public", duration=86400, asset="BTC") -> list[dict]:
+    """
+    Load the 24h real price path of an asset saved at real_price_path_file.
+
+    The path is fetched from Pyth first if the file does not exist yet or holds an
+    incomplete path, so every caller scoring the same start_time shares one fetch.
+    Only a complete path (the window has closed and its last point is there) is
+    saved; a partial one is returned but fetched again next time.
+    """
+    real_path_file = real_price_path_file(start_time, public_dir, asset)
+    if os.path.exists(real_path_file):
+        with open(real_path_file, 'r') as f:
+            real_prices = json.load(f)
+        if is_complete_real_price_path(real_prices, start_time, duration):
+            return real_prices
+
+    real_prices = get_real_price_path(asset=asset, duration=duration, start_time=start_time)
+    if is_complete_real_price_path(real_prices, start_time, duration):
+        os.makedirs(os.path.dirname(real_path_file), exist_ok=True)
+        with open(real_path_file, 'w') as f:
+            json.dump(real_prices, f, indent=2)
+        print(f"Real price path saved to: {real_path_file}")
+    else:
+        print(f"Real {asset} price path of {start_time} is not complete yet, not caching it")
+    return real_prices
+
 def convert_prices_to_time_format(prices: list[float], start_time: str, time_increment: int) -> list[list[dict]]:
     """
     Convert an array of float numbers (prices) into an array of dictionaries with 'time' and 'price'.
@@ -192,7 +305,41 @@ def convert_prices_to_time_format(prices: list[float], start_time: str, time_inc
 
     return result
 
-def calculate_crps_for_miner(simulation_runs: list[list[dict]], real_price_path: list[dict], time_increment) -> tuple[float, list[dict]]:
+def crps_ensemble_vectorized(observations: np.ndarray, forecasts: np.ndarray) -> np.ndarray:
+    """
+    Ensemble CRPS for many observations at once.
+
+    Matches properscoring.crps_ensemble (CRPS = E|X - y| - 0.5 * E|X - X'|) but
+    uses the sorted-ensemble identity for the spread term, so it runs as a few
+    array operations and keeps the dtype of its inputs (float32 stays float32).
+
+    Args:
+        observations (numpy.ndarray): Observed values, shape (...).
+        forecasts (numpy.ndarray): Ensemble members along the last axis, shape (..., m).
+
+    Returns:
+        numpy.ndarray: CRPS per observation, shape (...).
+    """
+    forecasts = np.sort(forecasts, axis=-1)
+    num_members = forecasts.shape[-1]
+    observations = np.asarray(observations, dtype=forecasts.dtype)
+
+    abs_error = np.mean(np.abs(forecasts - observations[..., None]), axis=-1)
+    # sum_i (2i - m - 1) * x_(i) / m^2 equals half the mean pairwise distance
+    weights = (2 * np.arange(1, num_members + 1) - num_members - 1).astype(forecasts.dtype)
+    spread = (forecasts @ weights) / forecasts.dtype.type(num_members**2)
+
+    return abs_error - spread
+
+# Scoring intervals in seconds
+SCORING_INTERVALS = {
+    "5min": 300,    # 5 minutes
+    "30min": 1800,  # 30 minutes
+    "3hour": 10800, # 3 hours
+    "24hour": 86400 # 24 hours
+}
+
+def calculate_crps_for_miner(simulation_runs: np.ndarray, real_price_path: np.ndarray, time_increment, dtype=None) -> tuple[float, list[dict]]:
     """
     Calculate the total CRPS score for a miner's simulations over specified intervals.
     
@@ -200,57 +347,72 @@ def calculate_crps_for_miner(simulation_runs: list[list[dict]], real_price_path:
         simulation_runs (numpy.ndarray): Simulated price paths.
         real_price_path (numpy.ndarray): The real price path.
         time_increment (int): Time increment in seconds.
-        timestamp (str): Simulation timestamp for file path.
+        dtype (numpy.dtype, optional): Precision to score in, e.g. np.float32.
+            Defaults to the dtype of the inputs.
         
     Returns:
         tuple: (sum_all_scores, detailed_crps_data)
     """
-    # Define scoring intervals in seconds
-    scoring_intervals = {
-        "5min": 300,    # 5 minutes
-        "30min": 1800,  # 30 minutes
-        "3hour": 10800, # 3 hours
-        "24hour": 86400 # 24 hours
-    }
+    simulation_runs = np.asarray(simulation_runs, dtype=dtype)
+    scores, detailed_crps_data = calculate_crps_for_miners(
+        simulation_runs[None], real_price_path, time_increment, dtype
+    )
+    return float(scores[0]), detailed_crps_data[0]
 
-    detailed_crps_data = []
-    sum_all_scores = 0.0
+def calculate_crps_for_miners(simulation_runs: np.ndarray, real_price_path: np.ndarray, time_increment, dtype=None) -> tuple[np.ndarray, list[list[dict]]]:
+    """
+    Calculate the CRPS scores of many miners against the same real price path in one pass.
+    
+    Args:
+        simulation_runs (numpy.ndarray): Simulated price paths, shape (num_miners, num_paths, num_points).
+        real_price_path (numpy.ndarray): The real price path, shape (num_points,).
+        time_increment (int): Time increment in seconds.
+        dtype (numpy.dtype, optional): Precision to score in, e.g. np.float32.
+        
+    Returns:
+        tuple: (total score per miner as a (num_miners,) array, detailed_crps_data per miner)
+    """
+    simulation_runs = np.asarray(simulation_runs, dtype=dtype)
+    real_price_path = np.asarray(real_price_path, dtype=simulation_runs.dtype)
+    num_miners = simulation_runs.shape[0]
+
+    detailed_crps_data = [[] for _ in range(num_miners)]
+    sum_all_scores = np.zeros(num_miners)
 
-    for interval_name, interval_seconds in scoring_intervals.items():
+    for interval_name, interval_seconds in SCORING_INTERVALS.items():
         interval_steps = int(interval_seconds / time_increment)
 
         # Calculate price changes over intervals
-        simulated_changes = calculate_price_changes_over_intervals(
-            simulation_runs, interval_steps
-        )
+        simulated_changes = np.diff(simulation_runs[:, :, ::interval_steps], axis=2)
         real_changes = calculate_price_changes_over_intervals(
             real_price_path.reshape(1, -1), interval_steps
         )[0]
 
         # Calculate CRPS over intervals, but only up to the valid length
-        num_intervals = min(simulated_changes.shape[1], len(real_changes))
-        crps_values = np.zeros(num_intervals)
-        
-        for t in range(num_intervals):
-            forecasts = simulated_changes[:, t]
-            observation = real_changes[t]
-            crps_values[t] = crps_ensemble(observation, forecasts)
-
-            detailed_crps_data.append({
-                "Interval": interval_name,
-                "Increment": t + 1,
-                "CRPS": float(crps_values[t])  # Convert numpy float to Python float
-            })
+        num_intervals = min(simulated_changes.shape[2], len(real_changes))
+        crps_values = crps_ensemble_vectorized(
+            real_changes[:num_intervals],
+            simulated_changes[:, :, :num_intervals].transpose(0, 2, 1)
+        )
 
-        # Total CRPS for this interval
-        total_crps_interval = float(np.sum(crps_values))  # Convert numpy float to Python float
+        # Total CRPS for this interval, accumulated in float64 regardless of dtype
+        total_crps_interval = np.sum(crps_values, axis=1, dtype=np.float64)
         sum_all_scores += total_crps_interval
 
-        detailed_crps_data.append({
-            "Interval": interval_name,
-            "Increment": "Total",
-            "CRPS": total_crps_interval
-        })
+        for miner_crps, miner_values, miner_total in zip(detailed_crps_data, crps_values.tolist(), total_crps_interval.tolist()):
+            miner_crps.extend(
+                {
+                    "Interval": interval_name,
+                    "Increment": t + 1,
+                    "CRPS": crps  # Already a Python float via tolist()
+                }
+                for t, crps in enumerate(miner_values)
+            )
+            miner_crps.append({
+                "Interval": interval_name,
+                "Increment": "Total",
+                "CRPS": miner_total
+            })
 
     return sum_all_scores, detailed_crps_data
 
@@ -271,7 +433,13 @@ def calculate_price_changes_over_intervals(price_paths, interval_steps):
     price_changes = np.diff(interval_prices, axis=1)
     return price_changes
 
-def align_prediction_and_real_prices(predictions: list[list[dict]], real_prices: list[dict]):    
+def align_prediction_and_real_prices(predictions: list[list[dict]], real_prices: list[dict], dtype=None):    
+    """
+    Keep only the time points shared by every prediction path and the real path.
+
+    With dtype=None the aligned prices are returned as plain lists; pass a numpy
+    dtype (e.g. np.float32) to get (num_paths, num_points) and (num_points,) arrays.
+    """
     # in case some of the time points is not overlapped
     intersecting_predictions = []
     intersecting_real_price = real_prices
@@ -287,6 +455,9 @@ def align_prediction_and_real_prices(predictions: list[list[dict]], real_prices:
         for sublist in intersecting_predictions
     ]
     real_price_path = [entry["price"] for entry in intersecting_real_price]
+
+    if dtype is not None:
+        return np.array(predictions_path, dtype=dtype), np.array(real_price_path, dtype=dtype)
     
     return predictions_path, real_price_path
 
@@ -302,10 +473,10 @@ def calculate_volatility(price_path: list[dict]) -> float:
         float: Annualized volatility as a decimal (e.g., 0.65 for 65% volatility)
     """
     # Extract prices
-    prices = [entry['price'] for entry in price_path]
+    prices = get_prices(price_path)
     
     # Calculate log returns
-    log_returns = np.log(np.array(prices[1:]) / np.array(prices[:-1]))
+    log_returns = np.log(prices[1:] / prices[:-1])
     
     # Calculate standard deviation of log returns
     std_dev = np.std(log_returns, ddof=1)
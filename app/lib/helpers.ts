@@ -1,3 +1,6 @@
+import axios, { AxiosResponse } from "axios";
+import { SimulationData, SummaryData } from "@/app/types";
+
 interface PricePath {
   time: string;
   price: number;
@@ -17,6 +20,40 @@ export function checkIfOneDayAgo(date: string) {
   return new Date(date).getTime() / 1000 + 86400 < Date.now() / 1000;
 }
 
+// A summary for SimulationChart: the representative paths as the prediction,
+// the percentile bands from the summary itself
+export function summaryToSimulationData(summary: SummaryData): SimulationData {
+  return {
+    variable: { ...summary.variable, start_time: summary.start_time },
+    prediction: summary.representative_paths.map((path) =>
+      path.prices.map((price, i) => ({ time: summary.times[i], price }))
+    ),
+    summary,
+  };
+}
+
+// Requests are charted from summary.json; simulation.json is only read for
+// requests stored before summaries were written, and may be archived for old ones
+export async function fetchSimulation(
+  model: string,
+  cid: string
+): Promise<SimulationData> {
+  try {
+    const summary: AxiosResponse<SummaryData> = await axios.get(
+      `/${model}/${cid}/summary.json`
+    );
+    return summaryToSimulationData(summary.data);
+  } catch (error) {
+    if (!axios.isAxiosError(error) || error.response?.status !== 404) {
+      throw error;
+    }
+  }
+  const simulation: AxiosResponse<SimulationData> = await axios.get(
+    `/${model}/${cid}/simulation.json`
+  );
+  return simulation.data;
+}
+
 export function calculateCRPSForMiner(
   simulationRuns: PricePath[][],
   realPricePath: PricePath[],
@@ -0,0 +1,100 @@
+"""
+Local price history store.
+
+Keeps one columnar cache file per (asset, resolution) under history_cache/ with
+the bar times (epoch seconds) and close prices fetched from Pyth so far, plus
+the time range they cover. load_history only fetches the parts of a requested
+range that fall outside the cached coverage, so repeated model runs over
+overlapping windows hit the network once.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from helpers import get_real_price_path
+
+HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history_cache")
+
+
+def _cache_path(asset: str, resolution: int) -> str:
+    return os.path.join(HISTORY_DIR, f"{asset}_{resolution}.npz")
+
+
+def _read_cache(asset: str, resolution: int):
+    path = _cache_path(asset, resolution)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as cache:
+        return {key: cache[key] for key in ("times", "prices", "coverage")}
+
+
+def _write_cache(asset: str, resolution: int, times: np.ndarray, prices: np.ndarray, coverage: tuple[int, int]):
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    path = _cache_path(asset, resolution)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, times=times, prices=prices, coverage=np.array(coverage, dtype=np.int64))
+    os.replace(tmp_path, path)
+
+
+def _fetch(asset: str, start: int, end: int, resolution: int):
+    start_iso = datetime.fromtimestamp(start, timezone.utc).isoformat()
+    return get_real_price_path(
+        asset=asset, duration=end - start, resolution=resolution, time_increment=1,
+        start_time=start_iso, columnar=True
+    )
+
+
+def load_history(asset: str, start: int, end: int, resolution=1) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the cached (times, prices) bars of an asset in [start, end], fetching missing edges.
+
+    Args:
+        asset: Asset code from helpers.ASSETS.
+        start: Range start in epoch seconds.
+        end: Range end in epoch seconds.
+        resolution: Bar resolution in minutes, as accepted by the Pyth history endpoint.
+
+    Returns:
+        tuple: (epoch seconds as int64, close prices as float64), chronological.
+    """
+    # Never record coverage past the present, otherwise future bars would never be fetched
+    end = min(end, int(datetime.now(timezone.utc).timestamp()))
+    cache = _read_cache(asset, resolution)
+
+    if cache is None:
+        times, prices = _fetch(asset, start, end, resolution)
+        coverage = (start, end)
+        _write_cache(asset, resolution, times, prices, coverage)
+    else:
+        times, prices = cache["times"], cache["prices"]
+        covered_from, covered_to = (int(x) for x in cache["coverage"])
+        pieces = []
+        if start < covered_from:
+            pieces.append(_fetch(asset, start, covered_from, resolution))
+        if end > covered_to:
+            pieces.append(_fetch(asset, covered_to, end, resolution))
+        if pieces:
+            times = np.concatenate([times] + [piece[0] for piece in pieces])
+            prices = np.concatenate([prices] + [piece[1] for piece in pieces])
+            times, unique = np.unique(times, return_index=True)
+            prices = prices[unique]
+            coverage = (min(start, covered_from), max(end, covered_to))
+            _write_cache(asset, resolution, times, prices, coverage)
+
+    lo = np.searchsorted(times, start, side="left")
+    hi = np.searchsorted(times, end, side="right")
+    return times[lo:hi], prices[lo:hi]
+
+
+def load_histories(assets: list[str], start: int, end: int, resolution=1) -> dict:
+    """
+    load_history for several assets, with cache misses fetched concurrently.
+
+    Returns:
+        dict: Asset code to (times, prices).
+    """
+    with ThreadPoolExecutor(max_workers=max(len(assets), 1)) as executor:
+        futures = {asset: executor.submit(load_history, asset, start, end, resolution) for asset in assets}
+        return {asset: future.result() for asset, future in futures.items()}
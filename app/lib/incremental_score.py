@@ -0,0 +1,187 @@
+"""
+Incremental CRPS scoring as real prices arrive.
+
+IncrementalCRPSScorer keeps, per scoring interval, the sorted simulated price
+changes and their ensemble spread term (computed once up front). Every new
+real price on the prediction's time grid then completes at most one increment
+per interval, and each completed increment costs O(num_paths): a single mean
+absolute error against the already-known spread. Once the whole 24h window has
+arrived the totals equal calculate_crps_for_miner on the full path.
+
+Usage:
+    python incremental_score.py base 1740555480 --feed replay
+    python incremental_score.py base 1740555480 --feed pyth
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from helpers import SCORING_INTERVALS
+from helpers import from_iso_to_unix_time
+from helpers import get_published_asset_price
+from helpers import load_real_price_path
+
+
+class IncrementalCRPSScorer:
+    def __init__(self, simulation_runs: np.ndarray, start_time: str, time_increment: int, dtype=np.float64):
+        """
+        Args:
+            simulation_runs: (num_paths, num_points) simulated prices on the
+                start_time + k * time_increment grid.
+            start_time: ISO start time of the prediction.
+            time_increment: Grid step in seconds.
+        """
+        simulation_runs = np.asarray(simulation_runs, dtype=dtype)
+        self.start_timestamp = from_iso_to_unix_time(start_time)
+        self.time_increment = time_increment
+        self.num_points = simulation_runs.shape[1]
+        self.real_prices = {}
+
+        num_paths = simulation_runs.shape[0]
+        weights = (2 * np.arange(1, num_paths + 1) - num_paths - 1).astype(simulation_runs.dtype)
+        self.intervals = {}
+        for interval_name, interval_seconds in SCORING_INTERVALS.items():
+            interval_steps = int(interval_seconds / time_increment)
+            # (num_increments, num_paths), sorted along paths, row-contiguous for O(paths) lookups
+            changes = np.ascontiguousarray(np.sort(np.diff(simulation_runs[:, ::interval_steps], axis=1).T, axis=1))
+            self.intervals[interval_name] = {
+                "steps": interval_steps,
+                "changes": changes,
+                "spread": changes @ weights / simulation_runs.dtype.type(num_paths**2),
+                "crps": {},
+            }
+
+    def update(self, timestamp: int, price: float) -> list[dict]:
+        """
+        Add one real price and score every increment it completes.
+
+        Args:
+            timestamp: Unix time of the price; prices off the grid are ignored.
+            price: Real price at that time.
+
+        Returns:
+            list[dict]: The newly scored increments ({"Interval","Increment","CRPS"}).
+        """
+        offset = timestamp - self.start_timestamp
+        if offset % self.time_increment != 0:
+            return []
+        index = offset // self.time_increment
+        if not 0 <= index < self.num_points or index in self.real_prices:
+            return []
+        self.real_prices[index] = float(price)
+
+        scored = []
+        for interval_name, state in self.intervals.items():
+            steps = state["steps"]
+            if index % steps != 0:
+                continue
+            # The new point can close the increment ending here and, if prices
+            # arrived out of order, the one starting here
+            for end in (index, index + steps):
+                increment = end // steps
+                if not 0 < increment <= len(state["changes"]) or increment in state["crps"]:
+                    continue
+                if end - steps not in self.real_prices or end not in self.real_prices:
+                    continue
+                observation = self.real_prices[end] - self.real_prices[end - steps]
+                forecasts = state["changes"][increment - 1]
+                crps = float(np.mean(np.abs(forecasts - forecasts.dtype.type(observation))) - state["spread"][increment - 1])
+                state["crps"][increment] = crps
+                scored.append({"Interval": interval_name, "Increment": increment, "CRPS": crps})
+
+        return scored
+
+    def partial_scores(self) -> dict:
+        """
+        Current partial scores in the score.json layout, plus per-interval progress.
+        """
+        detailed_crps_data = []
+        intervals = {}
+        total_score = 0.0
+        for interval_name, state in self.intervals.items():
+            increments = sorted(state["crps"])
+            detailed_crps_data.extend(
+                {"Interval": interval_name, "Increment": increment, "CRPS": state["crps"][increment]}
+                for increment in increments
+            )
+            interval_total = float(sum(state["crps"][increment] for increment in increments))
+            detailed_crps_data.append({"Interval": interval_name, "Increment": "Total", "CRPS": interval_total})
+            intervals[interval_name] = {
+                "total": interval_total,
+                "scored_increments": len(increments),
+                "expected_increments": len(state["changes"]),
+            }
+            total_score += interval_total
+
+        return {
+            "total_score": total_score,
+            "complete": all(i["scored_increments"] == i["expected_increments"] for i in intervals.values()),
+            "real_points": len(self.real_prices),
+            "intervals": intervals,
+            "detailed_scores": detailed_crps_data,
+        }
+
+
+def replay_feed(real_prices: list[dict]):
+    """Local stand-in feed: yield (timestamp, price) from a stored real.json path."""
+    for entry in real_prices:
+        yield from_iso_to_unix_time(entry["time"]), entry["price"]
+
+
+def pyth_feed(start_timestamp: int, num_points: int, time_increment: int, asset="BTC", poll_interval=5):
+    """
+    Poll Pyth for the published price at each grid point once it is in the past.
+
+    Points already in the past are fetched immediately, so a scorer started late catches up.
+    """
+    for index in range(num_points):
+        publish_time = start_timestamp + index * time_increment
+        while True:
+            now = int(datetime.now(timezone.utc).timestamp())
+            if now >= publish_time:
+                price = get_published_asset_price(asset=asset, publish_time=publish_time)
+                if price is not None:
+                    yield publish_time, price
+                    break
+            time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live CRPS scoring of a stored simulation as real prices arrive.")
+    parser.add_argument("model", help="Model directory under public/, e.g. base")
+    parser.add_argument("timestamp", help="Simulation timestamp directory")
+    parser.add_argument("--feed", choices=["replay", "pyth"], default="pyth")
+    parser.add_argument("--time-increment", type=int, default=300)
+    args = parser.parse_args()
+
+    sim_dir = os.path.join("../../public", args.model, args.timestamp)
+    with open(os.path.join(sim_dir, "simulation.json"), "r") as f:
+        predictions = json.load(f)["prediction"]
+    start_time = predictions[0][0]["time"]
+    simulation_runs = np.array([[entry["price"] for entry in path] for path in predictions])
+
+    scorer = IncrementalCRPSScorer(simulation_runs, start_time, args.time_increment)
+    if args.feed == "replay":
+        feed = replay_feed(load_real_price_path(start_time))
+    else:
+        feed = pyth_feed(scorer.start_timestamp, scorer.num_points, args.time_increment)
+
+    live_score_path = os.path.join(sim_dir, "live_score.json")
+    for timestamp, price in feed:
+        if not scorer.update(timestamp, price):
+            continue
+        scores = scorer.partial_scores()
+        # Write to a temp file first so the dashboard never reads a half-written file
+        with open(live_score_path + ".tmp", "w") as f:
+            json.dump(scores, f, indent=2)
+        os.replace(live_score_path + ".tmp", live_score_path)
+        print(f"😊😊😊 {datetime.fromtimestamp(timestamp, timezone.utc).isoformat()} partial score: {scores['total_score']}")
+
+    print(f"Live scores saved to: {live_score_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Trend indicators shared by the trend-following models.
+
+Each series (e.g. ("BTC-USD", "1h")) keeps running cumulative sums of its prices
+and simple returns, so SMA, momentum and mean return over any lookback are O(1)
+lookups and a series that grew by a few bars only extends the sums. Trend
+strength is memoized per (series, as-of time, lookback, bar count, last close),
+so repeated calls on the same data within a process compute it once, while a
+different download for the same as-of time (another interval, more bars) is
+computed afresh. The caches live in the process: every model script runs in its
+own process and computes its own. Nothing is written back to the caller's
+DataFrame.
+"""
+import numpy as np
+
+
+class IndicatorSeries:
+    def __init__(self):
+        self.values = np.empty(0)
+        self.price_csum = np.zeros(1)
+        self.return_csum = np.zeros(1)
+
+    def __len__(self):
+        return len(self.values)
+
+    def extend(self, values: np.ndarray):
+        """
+        Bring the series up to date with values, only summing the new bars when the
+        cached series is a prefix of values.
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        n = len(self.values)
+        if n == 0 or len(values) < n or not np.array_equal(values[:n], self.values):
+            n = 0
+            self.price_csum = np.zeros(1)
+            self.return_csum = np.zeros(1)
+        if len(values) == n:
+            self.values = values
+            return
+
+        new_prices = values[n:]
+        prev = values[max(n - 1, 0):-1]
+        new_returns = values[max(n, 1):] / prev - 1
+        self.price_csum = np.concatenate([self.price_csum, self.price_csum[-1] + np.cumsum(new_prices)])
+        self.return_csum = np.concatenate([self.return_csum, self.return_csum[-1] + np.cumsum(new_returns)])
+        self.values = values
+
+    def sma(self, lookback: int) -> float | None:
+        """Mean of the last lookback prices, None while the series is shorter than lookback."""
+        if len(self.values) < lookback:
+            return None
+        return float((self.price_csum[-1] - self.price_csum[-1 - lookback]) / lookback)
+
+    def momentum(self, lookback: int) -> float:
+        """Relative change over the last lookback bars, NaN while the series is too short."""
+        if len(self.values) <= lookback:
+            return float("nan")
+        return float(self.values[-1] / self.values[-1 - lookback] - 1)
+
+    def mean_return(self, lookback: int) -> float:
+        """Mean simple return of the last lookback bars (fewer if the series is shorter)."""
+        count = min(lookback, len(self.return_csum) - 1)
+        if count <= 0:
+            return float("nan")
+        return float((self.return_csum[-1] - self.return_csum[-1 - count]) / count)
+
+
+_series: dict = {}
+_memo: dict = {}
+
+
+def get_series(series_key, values: np.ndarray) -> IndicatorSeries:
+    """Return the cached indicator series for series_key, extended to values."""
+    series = _series.setdefault(series_key, IndicatorSeries())
+    series.extend(values)
+    return series
+
+
+def trend_strength(series_key, values: np.ndarray, as_of, lookback_window=24) -> tuple[int, float]:
+    """
+    Analyze recent price trend and momentum.
+
+    Args:
+        series_key: Hashable name of the series, e.g. ("BTC-USD", "1h").
+        values: Close prices up to as_of, chronological.
+        as_of: Time the series ends at; with the number of bars and the last close,
+            the memoization key.
+        lookback_window: Number of bars for the SMA, momentum and mean return.
+
+    Returns:
+        tuple: (trend strength from -3 to +3, momentum over the lookback)
+    """
+    values = np.asarray(values, dtype=np.float64).reshape(-1)
+    key = (series_key, as_of, lookback_window, len(values), float(values[-1]))
+    if key in _memo:
+        return _memo[key]
+
+    series = get_series(series_key, values)
+    current_price = float(series.values[-1])
+    sma = series.sma(lookback_window)
+    momentum = series.momentum(lookback_window)
+
+    # Calculate trend strength
+    strength = 0
+
+    # Price vs SMA
+    strength += 1 if sma is not None and current_price > sma else -1
+
+    # Momentum
+    strength += 1 if momentum > 0 else -1
+
+    # Recent returns
+    strength += 1 if series.mean_return(lookback_window) > 0 else -1
+
+    _memo[key] = (strength, momentum)
+    return strength, momentum
@@ -0,0 +1,199 @@
+"""
+Pre-generated banks of standard normal innovations for the GBM-style engines.
+
+Everything in a GBM simulation except current_price and sigma can be prepared
+ahead of a request: for each common (num_simulations, num_steps) shape a bank
+holds `size` independent innovation matrices Z and their cumulative sums along
+the time axis, stored as .npy files under innovation_bank/ and memory-mapped at
+request time. Answering a request is then a scale-and-exp over one slice:
+
+    S[:, k] = S0 * exp(-0.5 * sigma^2 * dt * k + sigma * sqrt(dt) * cumsum(Z)[:, k-1])
+
+A JSON ledger next to each bank records which slices have been handed out (under
+a file lock, so concurrent processes never get the same slice) and rotates the
+bank with fresh draws, written to new files, once every slice has been used.
+Slices are copied out of the maps under the lock.
+
+Usage:
+    python innovation_bank.py            # build the banks for COMMON_SHAPES
+    python innovation_bank.py 100 288    # build one shape
+"""
+import fcntl
+import json
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+from sampling import standard_normal_draws
+
+BANK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "innovation_bank")
+
+# (num_simulations, num_steps) of the usual validator requests: 100 paths over 24h of 5-minute steps
+COMMON_SHAPES = [(100, 288)]
+
+
+class InnovationBank:
+    def __init__(self, num_simulations: int, num_steps: int, size=256, sampling="pseudo", dtype=np.float64, bank_dir=BANK_DIR):
+        """
+        Args:
+            num_simulations: Paths per slice.
+            num_steps: Time steps per slice.
+            size: Number of slices in the bank.
+            sampling: How each slice is drawn, see sampling.SAMPLING_MODES.
+            dtype: Float precision of the stored matrices.
+            bank_dir: Directory holding the bank files.
+        """
+        self.num_simulations = num_simulations
+        self.num_steps = num_steps
+        self.size = size
+        self.sampling = sampling
+        self.dtype = np.dtype(dtype)
+        self.name = f"{sampling}_{num_simulations}x{num_steps}_{self.dtype.name}"
+        self.bank_dir = bank_dir
+        self.ledger_path = os.path.join(bank_dir, f"{self.name}_ledger.json")
+        self.lock_path = os.path.join(bank_dir, f"{self.name}.lock")
+        self._generation = None
+        self._z = None
+        self._cumsum = None
+
+    def _paths(self, generation: int) -> tuple[str, str]:
+        prefix = os.path.join(self.bank_dir, f"{self.name}_g{generation}")
+        return f"{prefix}_z.npy", f"{prefix}_cumsum.npy"
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        with open(self.lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_ledger(self) -> dict | None:
+        if not os.path.exists(self.ledger_path):
+            return None
+        with open(self.ledger_path, "r") as f:
+            return json.load(f)
+
+    def _write_ledger(self, ledger: dict):
+        with open(self.ledger_path + ".tmp", "w") as f:
+            json.dump(ledger, f, indent=2)
+        os.replace(self.ledger_path + ".tmp", self.ledger_path)
+
+    def _generate(self, generation: int):
+        # Every generation gets new files, so slices mapped by other processes are
+        # never rewritten or truncated; the previous generation is unlinked, which
+        # leaves existing maps of it valid until they are closed
+        shape = (self.size, self.num_simulations, self.num_steps)
+        z_path, cumsum_path = self._paths(generation)
+        z = np.lib.format.open_memmap(z_path + ".tmp", mode="w+", dtype=self.dtype, shape=shape)
+        cumsum = np.lib.format.open_memmap(cumsum_path + ".tmp", mode="w+", dtype=self.dtype, shape=shape)
+        for i in range(self.size):
+            draws = standard_normal_draws(self.num_simulations, self.num_steps, self.sampling, np.float64)
+            z[i] = draws
+            cumsum[i] = np.cumsum(draws, axis=1)
+        z.flush()
+        cumsum.flush()
+        del z, cumsum
+        os.replace(z_path + ".tmp", z_path)
+        os.replace(cumsum_path + ".tmp", cumsum_path)
+
+        previous = self._read_ledger()
+        self._write_ledger({
+            "num_simulations": self.num_simulations,
+            "num_steps": self.num_steps,
+            "size": self.size,
+            "sampling": self.sampling,
+            "dtype": self.dtype.name,
+            "generation": generation,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "next": 0,
+            "used": [],
+        })
+        if previous is not None and previous["generation"] != generation:
+            for path in self._paths(previous["generation"]):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def build(self):
+        """Generate the bank (or rotate it with fresh draws if it exists)."""
+        with self._locked():
+            ledger = self._read_ledger()
+            generation = 0 if ledger is None else ledger["generation"] + 1
+            self._generate(generation)
+        print(f"😊😊😊 Innovation bank built: {self._paths(generation)[1]}")
+
+    def exists(self) -> bool:
+        """Whether the bank has been built."""
+        return self._read_ledger() is not None
+
+    def remaining(self) -> int:
+        """Slices not handed out yet in the current generation."""
+        ledger = self._read_ledger()
+        return 0 if ledger is None else ledger["size"] - ledger["next"]
+
+    def _open(self, generation: int):
+        # The maps are reopened only when another process has rotated the bank
+        if self._generation != generation:
+            z_path, cumsum_path = self._paths(generation)
+            self._z = np.load(z_path, mmap_mode="r")
+            self._cumsum = np.load(cumsum_path, mmap_mode="r")
+            self._generation = generation
+
+    def take(self, tag: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Hand out the next unused slice.
+
+        Args:
+            tag: Optional label recorded in the ledger (e.g. "gbm:<start_time>").
+
+        Returns:
+            tuple: (num_simulations, num_steps) copies of Z and of its cumulative sums.
+        """
+        with self._locked():
+            ledger = self._read_ledger()
+            if ledger is None or ledger["size"] != self.size:
+                self._generate(0 if ledger is None else ledger["generation"] + 1)
+                ledger = self._read_ledger()
+            elif ledger["next"] >= ledger["size"]:
+                print(f"Innovation bank {self.name} exhausted, rotating")
+                self._generate(ledger["generation"] + 1)
+                ledger = self._read_ledger()
+
+            index = ledger["next"]
+            ledger["next"] = index + 1
+            ledger["used"].append({
+                "slice": index,
+                "tag": tag,
+                "pid": os.getpid(),
+                "time": datetime.now(timezone.utc).isoformat(),
+            })
+            self._write_ledger(ledger)
+
+            # Copied while the lock is held, before any rotation can replace the files
+            self._open(ledger["generation"])
+            return np.array(self._z[index]), np.array(self._cumsum[index])
+
+
+_banks: dict = {}
+
+
+def get_bank(num_simulations: int, num_steps: int, sampling="pseudo", dtype=np.float64, **kwargs) -> InnovationBank:
+    """Return the per-process bank for a shape, so its memory maps are opened once."""
+    key = (num_simulations, num_steps, sampling, np.dtype(dtype).name)
+    if key not in _banks:
+        _banks[key] = InnovationBank(num_simulations, num_steps, sampling=sampling, dtype=dtype, **kwargs)
+    return _banks[key]
+
+
+def main():
+    shapes = [(int(sys.argv[1]), int(sys.argv[2]))] if len(sys.argv) > 2 else COMMON_SHAPES
+    for num_simulations, num_steps in shapes:
+        InnovationBank(num_simulations, num_steps).build()
+
+if __name__ == "__main__":
+    main()
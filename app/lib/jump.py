@@ -0,0 +1,201 @@
+import numpy as np
+from datetime import datetime, timezone
+import os
+import json
+from artifacts import record_file
+from summary import summarize_file
+from helpers import from_iso_to_unix_time
+from helpers import convert_prices_to_time_format
+from helpers import calculate_crps_for_miner
+from helpers import align_prediction_and_real_prices
+from helpers import load_real_price_path
+from history_store import load_history
+from param_cache import load_params
+from param_cache import save_params
+from sampling import standard_normal_draws
+
+# A 5-minute return is flagged as a jump when it is further than this many
+# robust standard deviations from the median
+JUMP_THRESHOLD = 4.0
+
+def estimate_jump_params(prices: np.ndarray, step_seconds=300, threshold=JUMP_THRESHOLD) -> dict:
+    """
+    Estimate Merton jump-diffusion parameters from a price series by threshold detection.
+
+    Returns whose distance from the median exceeds threshold times the MAD-based
+    standard deviation are treated as jumps; the rest give the diffusion volatility.
+
+    Args:
+        prices: Close prices spaced step_seconds apart.
+        step_seconds: Spacing of the prices.
+        threshold: Jump detection threshold in robust standard deviations.
+
+    Returns:
+        dict: Per-step parameters: sigma (diffusion volatility), lam (expected jumps
+            per step), jump_mean and jump_std (of the log jump sizes), and step_seconds.
+    """
+    log_returns = np.diff(np.log(np.asarray(prices, dtype=np.float64)))
+    if len(log_returns) < 2:
+        raise ValueError("Not enough history to estimate jump parameters")
+
+    median = np.median(log_returns)
+    robust_std = 1.4826 * np.median(np.abs(log_returns - median))
+    is_jump = np.abs(log_returns - median) > threshold * robust_std
+    jumps = log_returns[is_jump]
+    diffusion = log_returns[~is_jump]
+
+    return {
+        "sigma": float(np.std(diffusion)),
+        "lam": float(is_jump.mean()),
+        "jump_mean": float(jumps.mean()) if len(jumps) else 0.0,
+        "jump_std": float(jumps.std()) if len(jumps) > 1 else 0.0,
+        "step_seconds": step_seconds,
+        "num_returns": int(len(log_returns)),
+        "num_jumps": int(len(jumps)),
+    }
+
+def fit_jump_params(asset: str, as_of: int, history_days=7, step_seconds=300, refit_seconds=3600) -> dict:
+    """
+    Jump parameters of an asset from the cached history ending at as_of.
+
+    The fit is cached with the other model parameters and reused for requests up to
+    refit_seconds after it, so the request path usually only samples.
+    """
+    name = f"jump_{asset}_{history_days}d_{step_seconds}"
+    cached = load_params(name)
+    if cached is not None and 0 <= as_of - cached["as_of"] < refit_seconds:
+        return cached
+
+    times, prices = load_history(asset, as_of - history_days * 86400, as_of)
+    params = estimate_jump_params(prices[times % step_seconds == 0], step_seconds)
+    params["as_of"] = as_of
+    save_params(name, params)
+    return params
+
+def simulate_jump_price_paths(current_price, time_increment, time_length, num_simulations, params: dict, dtype=np.float64, sampling="pseudo"):
+    """
+    Simulates num_simulations price paths using a Merton jump-diffusion model.
+
+    Per step, the log return is a compensated Brownian increment plus a compound
+    Poisson jump: given N jumps, their total log size is Normal(N * jump_mean,
+    N * jump_std^2), so jump counts for every path and step are one array draw
+    and sizes one more draw over the steps that jumped.
+
+    Args:
+    current_price: The latest available price.
+    time_increment: The time increment in seconds.
+    time_length: The time horizon in seconds.
+    num_simulations: The number of paths to simulate.
+    params: Per-step parameters from estimate_jump_params.
+    dtype: The float precision of the simulation (np.float64 or np.float32).
+    sampling: How the diffusion innovations are drawn, see sampling.SAMPLING_MODES.
+    Returns:
+    np.array: A numpy array where each row corresponds to a simulated path.
+    """
+    num_steps = int(time_length / time_increment)
+    # Parameters are per history step; rescale to the simulation step
+    dt = time_increment / params["step_seconds"]
+    sigma, lam = params["sigma"], params["lam"] * dt
+    jump_mean, jump_std = params["jump_mean"], params["jump_std"]
+
+    # Compensator keeps the expected price flat, as in the GBM engines
+    kappa = np.exp(jump_mean + 0.5 * jump_std**2) - 1
+
+    z = standard_normal_draws(num_simulations, num_steps, sampling, np.float64)
+    counts = np.random.poisson(lam, (num_simulations, num_steps))
+    log_returns = (-0.5 * sigma**2 * dt - lam * kappa) + sigma * np.sqrt(dt) * z
+
+    # Jumps are rare, so sizes are only drawn for the steps that have any
+    jumped = np.nonzero(counts)
+    jump_counts = counts[jumped]
+    log_returns[jumped] += jump_counts * jump_mean + np.sqrt(jump_counts) * jump_std * np.random.standard_normal(len(jump_counts))
+
+    simulated_prices = np.empty((num_simulations, num_steps + 1), dtype=dtype)
+    simulated_prices[:,0] = current_price
+    simulated_prices[:,1:] = current_price * np.exp(np.cumsum(log_returns, axis=1))
+    return simulated_prices
+
+def simulate_crypto_price_paths(
+    current_price, time_increment, time_length, num_simulations, params: dict, start_time: str, asset="BTC", dtype=np.float64, sampling="pseudo"
+):
+    """
+    Simulate multiple crypto asset price paths and save them to public/jump/<ts>/simulation.json.
+    """
+    simulations = simulate_jump_price_paths(current_price, time_increment, time_length, num_simulations, params, dtype, sampling)
+
+    predictions = convert_prices_to_time_format(
+        simulations.tolist(), str(start_time), time_increment
+    )
+    sim_dir = os.path.join("../../public/jump", str(from_iso_to_unix_time(start_time)))
+    os.makedirs(sim_dir, exist_ok=True)
+
+    filepath = os.path.join(sim_dir, "simulation.json")
+    with open(filepath, 'w') as f:
+        json.dump({
+            "variable": {
+                "asset": asset,
+                "current_price": float(current_price),
+                "time_increment": time_increment,
+                "time_length": time_length,
+                "num_simulations": num_simulations,
+                "sigma": params["sigma"],
+                "jump_params": params,
+                "start_time": start_time,
+                "volatility_type": "step",
+                "dtype": np.dtype(dtype).name,
+                "sampling": sampling,
+                "model": "jump"
+            },
+            "prediction": predictions
+        }, f, indent=2)
+
+    print(f"Results saved to: {filepath}")
+    record_file(filepath)
+    summarize_file(filepath)
+
+    return predictions
+
+def main():
+
+    start_time = "2025-02-26T07:38:00+00:00"
+    start_timestamp = from_iso_to_unix_time(start_time)
+
+    params = fit_jump_params("BTC", start_timestamp)
+    print(f"😊😊😊 Jump parameters: {params}")
+
+    times, prices = load_history("BTC", start_timestamp - 3600, start_timestamp)
+    current_price = float(prices[-1])
+
+    predictions = simulate_crypto_price_paths(
+        current_price=current_price,
+        time_increment=300,
+        time_length=86400,
+        num_simulations=100,
+        params=params,
+        start_time=start_time,
+    )
+
+    if start_timestamp + 86400 > datetime.now(timezone.utc).timestamp():
+        print("Real price path not complete yet, skipping the score")
+        return
+
+    real_price_path = load_real_price_path(start_time)
+    predictions_path, real_price_path = align_prediction_and_real_prices(predictions, real_price_path)
+
+    crps_score, detailed_crps_data = calculate_crps_for_miner(np.array(predictions_path), np.array(real_price_path), 300)
+
+    score_data = {
+        "total_score": float(crps_score),
+        "detailed_scores": detailed_crps_data
+    }
+    print(f"Total CRPS score: {crps_score}")
+    score_path = os.path.join("../../public/jump", str(start_timestamp), "score.json")
+    with open(score_path, 'w') as f:
+        json.dump(score_data, f, indent=2)
+
+    print(f"Score data saved to: {score_path}")
+    record_file(score_path)
+    summarize_file(score_path)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import numpy as np
 import json
 from datetime import datetime, timedelta
+from artifacts import record_file
+from summary import summarize_file
 from helpers import get_real_price_path, align_prediction_and_real_prices, calculate_crps_for_miner, validate_responses
 import os
 
@@ -171,6 +173,8 @@ def main():
         }, f, indent=2)
 
     print(f"Results saved to: {filepath}")
+    record_file(filepath)
+    summarize_file(filepath)
 
     real_price_path = []
 
@@ -212,6 +216,8 @@ def main():
         json.dump(score_data, f, indent=2)
 
     print(f"Score data saved to: {score_path}")
+    record_file(score_path)
+    summarize_file(score_path)
 
 if __name__ == "__main__":
     main()
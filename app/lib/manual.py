@@ -9,14 +9,18 @@ from scipy import stats
 import os
 import json
 from datetime import datetime, timezone, timedelta
+from artifacts import record_file
+from summary import summarize_file
 from helpers import from_iso_to_unix_time
 from helpers import get_published_asset_price
 from helpers import convert_prices_to_time_format
 from helpers import get_real_price_path
 from helpers import calculate_crps_for_miner
 from helpers import align_prediction_and_real_prices
+from helpers import get_prices
+from volatility import rolling_std
 
-def simulate_manual_price_paths(start_time: str, initial_price: float, time_increment: int, time_length: int, num_simulations: int):
+def simulate_manual_price_paths(start_time: str, initial_price: float, time_increment: int, time_length: int, num_simulations: int, dtype=np.float64):
   warnings.filterwarnings('ignore')
 
   end_date = datetime.fromisoformat(start_time)
@@ -26,14 +30,12 @@ def simulate_manual_price_paths(start_time: str, initial_price: float, time_incr
 
   # Calculation of volatility
   volatility_days = 30
-  df['pct_change'] = df['Close'].pct_change()*100
-  print(df['pct_change'])
-  df['stdev'] = df['pct_change'].rolling(volatility_days).std()
+  close = np.asarray(df['Close'], dtype=float).reshape(-1)
+  pct_change = np.diff(close) / close[:-1] * 100
+  print(pct_change)
+  stdev = rolling_std(pct_change, volatility_days)
 
-  df['vol'] = df['stdev']*(365**0.5)
-  df.dropna(inplace=True)
-
-  sigma = df.vol.mean() / 100
+  sigma = float(np.mean(stdev * (365**0.5))) / 100
   
   print(f"😊😊😊 Sigma: {sigma}")
 
@@ -58,7 +60,8 @@ def simulate_manual_price_paths(start_time: str, initial_price: float, time_incr
   print("M, 5-min intervals: \t", M)
   print("I, paths simulating: \t", num_simulations)
 
-  pct_changes = df['pct_change'].dropna().values
+  # Changes from the first full volatility window on, as the rows left after dropping NaN stdevs
+  pct_changes = pct_change[volatility_days - 1:]
   # Calculate number of steps
   n_steps = int(time_length / time_increment)
 
@@ -67,43 +70,21 @@ def simulate_manual_price_paths(start_time: str, initial_price: float, time_incr
   target_mid = (target_min + target_max) / 2
   required_total_return = (target_mid / initial_price - 1) * 100
   
-  all_prices = []
-  
-  for _ in range(num_simulations):
-    # Initialize path with starting price
-    current_path = [initial_price]
-    current_price = initial_price
-    total_return = 0
-    
-     # Generate each step in the path
-    for i in range(n_steps):
-      # Sample a random historical change
-      pct_change = np.random.choice(pct_changes)
-      
-      # Adjust the change to trend toward target
-      remaining_steps = n_steps - i
-      remaining_target_return = required_total_return - total_return
-      bias = remaining_target_return / remaining_steps
-      # adjusted_change = pct_change + bias
-      adjusted_change = pct_change
-      
-      # Calculate new price
-      current_price = current_price * (1 + adjusted_change/100)
-      total_return += adjusted_change
-      
-      # Add to path
-      current_path.append(float(current_price))
-      
-    all_prices.append(current_path)
-    
-  result = np.array(all_prices)
+  # Bootstrap every path at once: sample historical changes for all
+  # (num_simulations, n_steps) cells and compound them along each row
+  sampled_changes = np.random.choice(pct_changes, size=(num_simulations, n_steps)).astype(dtype, copy=False)
+
+  result = np.empty((num_simulations, n_steps + 1), dtype=dtype)
+  result[:, 0] = 1.0
+  np.cumprod(1 + sampled_changes / 100, axis=1, out=result[:, 1:])
+  result *= result.dtype.type(initial_price)
   # save to csv file
   np.savetxt("manual_paths.csv", result, delimiter=",")
   return result
 
 
 def simulate_crypto_price_paths(
-    current_price, time_increment, time_length, num_simulations, start_time: str | None = None
+    current_price, time_increment, time_length, num_simulations, start_time: str | None = None, dtype=np.float64
 ):
     """
     Simulate multiple crypto asset price paths.
@@ -114,11 +95,11 @@ def simulate_crypto_price_paths(
     
     # Get the real price path for the past 7 days
     duration = 86400 * 7
-    real_price_path = get_real_price_path(duration=duration, time_increment=1, resolution=5, start_time=start_time)
+    real_price_path = get_real_price_path(duration=duration, time_increment=1, resolution=5, start_time=start_time, columnar=True)
     
     # Calculate the volatility of the asset price path
     sigma, mean, stdev = _calc_params(history_data=real_price_path)
-    simulations = simulate_manual_price_paths(start_time, current_price, time_increment, time_length, num_simulations)
+    simulations = simulate_manual_price_paths(start_time, current_price, time_increment, time_length, num_simulations, dtype)
 
     predictions = convert_prices_to_time_format(
         simulations.tolist(), str(start_time), time_increment
@@ -136,20 +117,25 @@ def simulate_crypto_price_paths(
                 "time_increment": time_increment,
                 "time_length": time_length,
                 "num_simulations": num_simulations,
-                "start_time": start_time
+                "start_time": start_time,
+                "dtype": np.dtype(dtype).name
             },
             "prediction": predictions
         }, f, indent=2)
     print(f"Results saved to: {filepath}")
+    record_file(filepath)
+    summarize_file(filepath)
     
     return predictions
 
-def _calc_params(history_data: list[dict]):
+def _calc_params(history_data):
     """
     Calculate the volatility of the asset price path.
+
+    history_data is a list of {"time","price"} dictionaries or a columnar (times, prices) pair.
     """
     
-    prices = np.array([price['price'] for price in history_data])
+    prices = get_prices(history_data)
     
     # Percent changes in prices
     pct_changes = np.diff(prices) / prices[:-1]
@@ -216,6 +202,8 @@ def main():
         json.dump(score_data, f, indent=2)
 
     print(f"Score data saved to: {score_path}")
+    record_file(score_path)
+    summarize_file(score_path)
 
 if __name__ == "__main__":
     main()
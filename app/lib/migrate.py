@@ -0,0 +1,169 @@
+"""
+Bring an existing database up to the tables, columns and indexes defined in db.py.
+
+metadata.create_all only creates missing tables, so columns added to existing
+tables are applied here with idempotent ALTER statements, and indexes on
+existing tables are built with CREATE INDEX CONCURRENTLY on Postgres so the
+dashboards keep reading and the validators keep writing while they build.
+Every step can be re-run safely.
+
+Time-range partitioning of miner_scores is opt-in (--partition): it rewrites the
+table into monthly partitions of scored_time and needs a maintenance window.
+
+Usage:
+    DB_URL=postgresql://... python migrate.py
+    DB_URL=postgresql://... python migrate.py --partition 2025-01 2026-12
+"""
+import argparse
+
+from sqlalchemy import inspect
+from sqlalchemy import text
+
+from db import get_engine
+from db import metadata
+from db import miner_scores
+
+# (table, column, column DDL) added after the table first shipped
+ADDED_COLUMNS = [
+    ("my_predictions", "prediction_matrix_id", "BIGINT"),
+    ("miner_scores", "real_price_path_id", "BIGINT"),
+]
+
+
+def add_missing_columns(connection):
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    for table, column, ddl in ADDED_COLUMNS:
+        if table not in existing_tables:
+            continue
+        if column in {c["name"] for c in inspector.get_columns(table)}:
+            continue
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        print(f"Added {table}.{column}")
+
+
+def create_indexes(engine):
+    """Build every index declared in db.py that the database does not have yet."""
+    indexes = [index for table in metadata.sorted_tables for index in table.indexes]
+
+    if engine.dialect.name != "postgresql":
+        with engine.begin() as connection:
+            for index in indexes:
+                index.create(connection, checkfirst=True)
+        return
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for index in indexes:
+            # An interrupted concurrent build leaves an invalid index behind that IF NOT EXISTS would skip
+            invalid = connection.execute(text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ), {"name": index.name}).first()
+            if invalid is not None:
+                connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+
+            columns = ", ".join(column.name for column in index.columns)
+            partitioned = connection.execute(text(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :name"
+            ), {"name": index.table.name}).first()
+            # Partitioned parents do not support CONCURRENTLY; their indexes are built with the partitions
+            concurrently = "" if partitioned else "CONCURRENTLY "
+            connection.execute(text(f"CREATE INDEX {concurrently}IF NOT EXISTS {index.name} ON {index.table.name} ({columns})"))
+            print(f"Index {index.name} on {index.table.name} ({columns}) is in place")
+
+
+def ensure_partitions(connection, first_month: str, last_month: str, table="miner_scores"):
+    """Create the monthly partitions of a partitioned table between two YYYY-MM months (inclusive)."""
+    year, month = (int(part) for part in first_month.split("-"))
+    last_year, last = (int(part) for part in last_month.split("-"))
+    while (year, month) <= (last_year, last):
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {table}_{year}_{month:02d} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{year}-{month:02d}-01') TO ('{next_year}-{next_month:02d}-01')"
+        ))
+        year, month = next_year, next_month
+
+
+def partition_miner_scores(engine, first_month: str, last_month: str):
+    """
+    Rewrite miner_scores as a table range-partitioned by scored_time, one partition per month.
+
+    Rows outside the months (and rows without a scored_time, stored at the epoch) land in a
+    default partition. The old table is kept as miner_scores_unpartitioned.
+    """
+    if engine.dialect.name != "postgresql":
+        raise ValueError("Partitioning is only supported on Postgres")
+
+    columns = ", ".join(column.name for column in miner_scores.columns)
+    selected = ", ".join(
+        "COALESCE(scored_time, to_timestamp(0))" if column.name == "scored_time" else column.name
+        for column in miner_scores.columns
+    )
+    with engine.begin() as connection:
+        partitioned = connection.execute(text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = 'miner_scores'"
+        )).first()
+        if partitioned is not None:
+            ensure_partitions(connection, first_month, last_month)
+            print("miner_scores is already partitioned, added any missing months")
+            return
+
+        connection.execute(text("LOCK TABLE miner_scores IN EXCLUSIVE MODE"))
+        connection.execute(text(
+            "CREATE TABLE miner_scores_partitioned (LIKE miner_scores INCLUDING DEFAULTS) PARTITION BY RANGE (scored_time)"
+        ))
+        # The partition key has to be part of the primary key
+        connection.execute(text("ALTER TABLE miner_scores_partitioned ALTER COLUMN scored_time SET NOT NULL"))
+        connection.execute(text("ALTER TABLE miner_scores_partitioned ADD PRIMARY KEY (id, scored_time)"))
+        connection.execute(text("CREATE TABLE miner_scores_partitioned_default PARTITION OF miner_scores_partitioned DEFAULT"))
+        ensure_partitions(connection, first_month, last_month, "miner_scores_partitioned")
+        connection.execute(text(f"INSERT INTO miner_scores_partitioned ({columns}) SELECT {selected} FROM miner_scores"))
+
+        connection.execute(text("ALTER TABLE miner_scores RENAME TO miner_scores_unpartitioned"))
+        connection.execute(text("ALTER TABLE miner_scores_partitioned RENAME TO miner_scores"))
+        connection.execute(text("ALTER TABLE miner_scores_partitioned_default RENAME TO miner_scores_default"))
+        # Keep the id sequence alive if the old table is dropped later
+        sequence = connection.execute(text("SELECT pg_get_serial_sequence('miner_scores_unpartitioned', 'id')")).scalar()
+        if sequence is not None:
+            connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY miner_scores.id"))
+        year, month = (int(part) for part in first_month.split("-"))
+        last_year, last = (int(part) for part in last_month.split("-"))
+        while (year, month) <= (last_year, last):
+            connection.execute(text(
+                f"ALTER TABLE miner_scores_partitioned_{year}_{month:02d} RENAME TO miner_scores_{year}_{month:02d}"
+            ))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        # The old indexes keep their names on miner_scores_unpartitioned; rename them out of the way
+        for index in miner_scores.indexes:
+            connection.execute(text(f"ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_unpartitioned"))
+    print("😊😊😊 miner_scores is now partitioned by month of scored_time")
+
+
+def migrate(engine=None):
+    engine = engine or get_engine()
+    with engine.begin() as connection:
+        metadata.create_all(connection)
+        add_missing_columns(connection)
+        if connection.dialect.name == "postgresql":
+            # Rows scored through real_price_paths no longer carry their own copy
+            connection.execute(text("ALTER TABLE miner_scores ALTER COLUMN real_prices DROP NOT NULL"))
+    create_indexes(engine)
+    print("😊😊😊 Database schema is up to date")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply db.py's schema to an existing database.")
+    parser.add_argument("--partition", nargs=2, metavar=("FIRST_MONTH", "LAST_MONTH"),
+                        help="Partition miner_scores by month of scored_time (YYYY-MM YYYY-MM)")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if args.partition:
+        partition_miner_scores(engine, *args.partition)
+    migrate(engine)
+
+if __name__ == "__main__":
+    main()
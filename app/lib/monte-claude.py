@@ -9,14 +9,18 @@ import warnings
 import os
 import json
 from datetime import datetime, timezone, timedelta
+from artifacts import record_file
+from summary import summarize_file
 from helpers import from_iso_to_unix_time
 from helpers import get_published_asset_price
 from helpers import convert_prices_to_time_format
 from helpers import get_real_price_path
 from helpers import calculate_crps_for_miner
 from helpers import align_prediction_and_real_prices
+from sampling import standard_normal_draws
+from volatility import rolling_std
 
-def simulate_monte_claude_price_paths(initial_price: float, time_increment: int, time_length: int, num_simulations: int, sigma: float):
+def simulate_monte_claude_price_paths(initial_price: float, time_increment: int, time_length: int, num_simulations: int, sigma: float, sampling="pseudo"):
   T = 1/3
 
   # Risk-free rate calculation
@@ -30,14 +34,15 @@ def simulate_monte_claude_price_paths(initial_price: float, time_increment: int,
   # Length of time interval (now in 5-min intervals)
   dt = T / M
 
-  # Simulating I paths with M 5-min intervals
-  S = S0 * np.exp(np.cumsum((0 - 0.5 * sigma ** 2) * dt + sigma * math.sqrt(dt) * np.random.standard_normal((M + 1, num_simulations)), axis=0))
+  # Simulating I paths with M 5-min intervals (one row of draws per path, transposed to steps x paths)
+  z = standard_normal_draws(num_simulations, M + 1, sampling).T
+  S = S0 * np.exp(np.cumsum((0 - 0.5 * sigma ** 2) * dt + sigma * math.sqrt(dt) * z, axis=0))
   S[0] = S0
 
   return S.T
 
 def generate_simulations(
-    current_price, time_increment, time_length, num_simulations, start_time: str | None = None
+    current_price, time_increment, time_length, num_simulations, start_time: str | None = None, sampling="pseudo"
 ):
 
     """
@@ -57,24 +62,21 @@ def generate_simulations(
     if len(df['Close']) < 1:
         print(f"Not enough price data. Got {len(df['Close'])} data points. Using Pyth Network instead")
 
-        history = get_real_price_path(duration=86400 * 30, resolution=60, start_time=start_date, time_increment=1)
-        prices = [data["price"] for data in history]
+        _, prices = get_real_price_path(duration=86400 * 30, resolution=60, start_time=start_date, time_increment=1, columnar=True)
         df = pd.DataFrame({"Close": prices})
         
     # Calculation of volatility
-    df['pct_change'] = df['Close'].pct_change()*100
-    print(f"😊😊😊 Percentage changes: {df['pct_change']}")
-    df['stdev'] = df['pct_change'].rolling(volatility_days).std()
+    close = np.asarray(df['Close'], dtype=float).reshape(-1)
+    pct_change = np.diff(close) / close[:-1] * 100
+    print(f"😊😊😊 Percentage changes: {pct_change}")
+    stdev = rolling_std(pct_change, volatility_days)
 
-    df['vol'] = df['stdev']*(365**0.5)
-    df.dropna(inplace=True)
-
-    sigma = df.vol.mean() / 100
+    sigma = float(np.mean(stdev * (365**0.5))) / 100
     print(f"😊😊😊 Sigma: {sigma}")
     # sigma = 0.195
     # Calculate the volatility of the asset price path
     # sigma= _calc_params(history_data=real_price_path)
-    simulations = simulate_monte_claude_price_paths(current_price, time_increment, time_length, num_simulations, sigma)
+    simulations = simulate_monte_claude_price_paths(current_price, time_increment, time_length, num_simulations, sigma, sampling)
     predictions = convert_prices_to_time_format(
         simulations.tolist(), str(start_time), time_increment
     )
@@ -95,12 +97,15 @@ def generate_simulations(
                 "sigma": sigma,
                 "start_time": start_time,
                 "volatility_type": "unknown",
+                "sampling": sampling,
                 "model": "monte-claude"
             },
             "prediction": predictions
         }, f, indent=2)
 
     print(f"Results saved to: {filepath}")
+    record_file(filepath)
+    summarize_file(filepath)
     
     return predictions
 
@@ -160,6 +165,8 @@ def main():
         json.dump(score_data, f, indent=2)
 
     print(f"Score data saved to: {score_path}")
+    record_file(score_path)
+    summarize_file(score_path)
 
 if __name__ == "__main__":
     main()
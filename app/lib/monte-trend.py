@@ -9,48 +9,17 @@ import warnings
 import os
 import json
 from datetime import datetime, timezone, timedelta
+from artifacts import record_file
+from summary import summarize_file
 from helpers import from_iso_to_unix_time
 from helpers import get_published_asset_price
 from helpers import convert_prices_to_time_format
 from helpers import get_real_price_path
 from helpers import calculate_crps_for_miner
 from helpers import align_prediction_and_real_prices
-
-def analyze_trend(df, lookback_window=24):
-    """Analyze recent price trend and momentum"""
-    # Calculate various trend indicators
-    df['returns'] = df['Close'].pct_change()
-    df['sma'] = df['Close'].rolling(window=lookback_window).mean()
-    df['momentum'] = df['Close'] / df['Close'].shift(lookback_window) - 1
-    
-    # Get latest values - use .iloc[-1] to get scalar values
-    current_price = float(df['Close'].iloc[-1])  # Convert to float
-    sma = float(df['sma'].iloc[-1]) if pd.notna(df['sma'].iloc[-1]) else None
-    momentum = float(df['momentum'].iloc[-1])  # Convert to float
-    recent_returns = df['returns'].tail(lookback_window)
-    
-    # Calculate trend strength
-    trend_strength = 0
-    
-    # Price vs SMA
-    if sma is not None and current_price > sma:  # Compare scalar values
-        trend_strength += 1
-    else:
-        trend_strength -= 1
-        
-    # Momentum
-    if momentum > 0:
-        trend_strength += 1
-    else:
-        trend_strength -= 1
-        
-    # Recent returns
-    if recent_returns.mean() > 0:
-        trend_strength += 1
-    else:
-        trend_strength -= 1
-        
-    return trend_strength, momentum
+from helpers import get_prices
+import indicators
+from volatility import rolling_std
 
 def simulate_monte_trend_price_paths(start_time: str, initial_price: float, time_increment: int, time_length: int, num_simulations: int):
   warnings.filterwarnings('ignore')
@@ -61,20 +30,18 @@ def simulate_monte_trend_price_paths(start_time: str, initial_price: float, time
 #   df = yf.download('BTC-USD', start=start_date, end=end_date, interval='15m')[['Close']]
 
   # Analyze trend
-  trend_strength, momentum = analyze_trend(df)
+  close = np.asarray(df['Close'], dtype=float).reshape(-1)
+  trend_strength, momentum = indicators.trend_strength(("BTC-USD", "1h"), close, start_time)
   print(f"\nTrend Analysis:")
   print(f"Trend Strength: {trend_strength} (-3 to +3 scale)")
   print(f"Momentum: {momentum:.2%}")
   
   # Calculation of volatility
   volatility_range = 48
-  df['pct_change'] = df['Close'].pct_change()*100
-  df['stdev'] = df['pct_change'].rolling(volatility_range).std()
+  pct_change = np.diff(close) / close[:-1] * 100
+  stdev = rolling_std(pct_change, volatility_range)
 
-  df['vol'] = df['stdev']*(350**0.5)
-  df.dropna(inplace=True)
-
-  sigma = df.vol.mean() / 100
+  sigma = float(np.mean(stdev * (350**0.5))) / 100
 
   # Maturity remains
   T = 1/24
@@ -117,7 +84,7 @@ def simulate_crypto_price_paths(
     
     # Get the real price path for the past 7 days
     duration = 86400 * 7
-    real_price_path = get_real_price_path(duration=duration, time_increment=1, resolution=5, start_time=start_time)
+    real_price_path = get_real_price_path(duration=duration, time_increment=1, resolution=5, start_time=start_time, columnar=True)
     
     # Calculate the volatility of the asset price path
     sigma, mean, stdev = _calc_params(history_data=real_price_path)
@@ -145,15 +112,19 @@ def simulate_crypto_price_paths(
             "prediction": predictions
         }, f, indent=2)
     print(f"Results saved to: {filepath}")
+    record_file(filepath)
+    summarize_file(filepath)
     
     return predictions
 
-def _calc_params(history_data: list[dict]):
+def _calc_params(history_data):
     """
     Calculate the volatility of the asset price path.
+
+    history_data is a list of {"time","price"} dictionaries or a columnar (times, prices) pair.
     """
     
-    prices = np.array([price['price'] for price in history_data])
+    prices = get_prices(history_data)
     
     # Percent changes in prices
     pct_changes = np.diff(prices) / prices[:-1]
@@ -221,6 +192,8 @@ def main():
         json.dump(score_data, f, indent=2)
     
     print(f"Score data saved to: {score_path}")
+    record_file(score_path)
+    summarize_file(score_path)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,181 @@
+import numpy as np
+from datetime import datetime, timedelta, timezone
+import os
+import json
+from artifacts import asset_model
+from artifacts import record_file
+from summary import summarize_file
+from helpers import convert_prices_to_time_format
+from helpers import from_iso_to_unix_time
+from history_store import load_histories
+from sampling import standard_normal_draws
+
+def model_name(asset: str) -> str:
+    """public/ directory of an asset's predictions: multi-gbm for BTC, multi-gbm-<asset> otherwise."""
+    return asset_model("multi-gbm", asset)
+
+def estimate_covariance(histories: dict, time_increment: int) -> tuple[list[str], np.ndarray]:
+    """
+    Estimate the per-step covariance matrix of log returns across assets.
+
+    Bars are aligned on the timestamps every asset has (markets like XAU close
+    while crypto trades) and sampled every time_increment seconds. Only returns
+    between consecutive grid points are used, so moves across market closures or
+    missing bars are not counted as single-step returns.
+
+    Args:
+        histories: Asset code to (times, prices) from history_store.
+        time_increment: Simulation step in seconds.
+
+    Returns:
+        tuple: (asset order, (num_assets, num_assets) covariance of per-step log returns)
+    """
+    assets = list(histories)
+    common_times = histories[assets[0]][0]
+    for asset in assets[1:]:
+        common_times = np.intersect1d(common_times, histories[asset][0], assume_unique=True)
+    common_times = common_times[common_times % time_increment == 0]
+    one_step = np.diff(common_times) == time_increment
+    if one_step.sum() < 2:
+        raise ValueError(f"Not enough overlapping history to estimate covariance for {assets}")
+
+    log_returns = np.empty((len(assets), int(one_step.sum())))
+    for i, asset in enumerate(assets):
+        times, prices = histories[asset]
+        aligned = prices[np.searchsorted(times, common_times)]
+        log_returns[i] = np.diff(np.log(aligned))[one_step]
+
+    return assets, np.atleast_2d(np.cov(log_returns))
+
+def simulate_correlated_gbm_paths(
+    current_prices: np.ndarray, covariance: np.ndarray, time_increment: int, time_length: int,
+    num_simulations: int, dtype=np.float64, sampling="pseudo"
+) -> np.ndarray:
+    """
+    Simulate correlated GBM paths for several assets in one vectorized draw.
+
+    Args:
+        current_prices: (num_assets,) starting prices.
+        covariance: (num_assets, num_assets) per-step log-return covariance.
+        time_increment: The time increment in seconds.
+        time_length: The time horizon in seconds.
+        num_simulations: The number of paths per asset.
+        dtype: The float precision of the simulation.
+        sampling: How the normal innovations are drawn, see sampling.SAMPLING_MODES.
+
+    Returns:
+        np.ndarray: (num_assets, num_simulations, num_steps + 1) simulated prices.
+    """
+    current_prices = np.asarray(current_prices, dtype=np.float64)
+    num_assets = len(current_prices)
+    num_steps = int(time_length / time_increment)
+
+    # Small jitter keeps the factorization stable when two assets are almost collinear
+    cholesky = np.linalg.cholesky(covariance + np.eye(num_assets) * 1e-14)
+    z = standard_normal_draws(num_simulations, num_steps * num_assets, sampling, np.float64)
+    z = z.reshape(num_simulations, num_steps, num_assets)
+
+    # Correlated log-returns with the GBM drift correction, then cumulative log-prices
+    log_returns = z @ cholesky.T - 0.5 * np.diag(covariance)
+    log_paths = np.zeros((num_assets, num_simulations, num_steps + 1))
+    log_paths[:, :, 1:] = np.cumsum(log_returns, axis=1).transpose(2, 0, 1)
+
+    return (current_prices[:, None, None] * np.exp(log_paths)).astype(dtype, copy=False)
+
+def generate_simulations(
+    assets: list[str],
+    start_time: str,
+    time_increment=300,
+    time_length=86400,
+    num_simulations=100,
+    history_days=1,
+    dtype=np.float64,
+    sampling="pseudo",
+    save=True,
+) -> dict:
+    """
+    Simulate correlated paths for all requested assets and split them into per-asset predictions.
+
+    The covariance and the current prices come from the cached history ending at start_time.
+
+    Returns:
+        dict: Asset code to predictions in the convert_prices_to_time_format layout.
+    """
+    start_timestamp = from_iso_to_unix_time(start_time)
+    histories = load_histories(assets, start_timestamp - history_days * 86400, start_timestamp)
+    assets, covariance = estimate_covariance(histories, time_increment)
+    current_prices = np.array([histories[asset][1][-1] for asset in assets])
+
+    print(f"😊😊😊 Correlation matrix for {assets}:\n{covariance / np.sqrt(np.outer(np.diag(covariance), np.diag(covariance)))}")
+
+    simulations = simulate_correlated_gbm_paths(
+        current_prices, covariance, time_increment, time_length, num_simulations, dtype, sampling
+    )
+
+    predictions = {}
+    for i, asset in enumerate(assets):
+        predictions[asset] = convert_prices_to_time_format(simulations[i].tolist(), start_time, time_increment)
+        if not save:
+            continue
+
+        sim_dir = os.path.join("../../public", model_name(asset), str(start_timestamp))
+        os.makedirs(sim_dir, exist_ok=True)
+        filepath = os.path.join(sim_dir, "simulation.json")
+        with open(filepath, 'w') as f:
+            json.dump({
+                "variable": {
+                    "asset": asset,
+                    "assets": assets,
+                    "current_price": float(current_prices[i]),
+                    "time_increment": time_increment,
+                    "time_length": time_length,
+                    "num_simulations": num_simulations,
+                    "sigma": float(np.sqrt(covariance[i, i])),
+                    "covariance": covariance.tolist(),
+                    "start_time": start_time,
+                    "volatility_type": "step",
+                    "dtype": np.dtype(dtype).name,
+                    "sampling": sampling,
+                    "model": "multi-gbm"
+                },
+                "prediction": predictions[asset]
+            }, f, indent=2)
+        print(f"Results saved to: {filepath}")
+        record_file(filepath)
+        summarize_file(filepath)
+
+    return predictions
+
+def answer_requests(requests: list[dict], **kwargs) -> dict:
+    """
+    Answer several validator requests at once, one batched simulation per shared request shape.
+
+    Args:
+        requests: validator_requests-like dicts with asset, start_time, time_increment,
+            time_length and num_simulations.
+
+    Returns:
+        dict: (asset, start_time) to predictions.
+    """
+    groups = {}
+    for request in requests:
+        key = (request["start_time"], request["time_increment"], request["time_length"], request["num_simulations"])
+        groups.setdefault(key, []).append(request["asset"])
+
+    answers = {}
+    for (start_time, time_increment, time_length, num_simulations), assets in groups.items():
+        predictions = generate_simulations(
+            list(dict.fromkeys(assets)), start_time, time_increment, time_length, num_simulations, **kwargs
+        )
+        for asset, prediction in predictions.items():
+            answers[(asset, start_time)] = prediction
+
+    return answers
+
+def main():
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    start_time = (now - timedelta(hours=24, minutes=1)).isoformat()
+    generate_simulations(["BTC", "ETH", "SOL", "XAU"], start_time)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Small JSON cache for fitted model parameters and estimator state.
+
+Each entry is one file under param_cache/, written atomically so a model run
+never reads a half-written file.
+"""
+import json
+import os
+
+PARAM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "param_cache")
+
+
+def _param_path(name: str) -> str:
+    return os.path.join(PARAM_DIR, f"{name}.json")
+
+
+def load_params(name: str) -> dict | None:
+    """Returns the cached parameters stored under name, or None if there are none."""
+    path = _param_path(name)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_params(name: str, params: dict):
+    """Stores params under name, replacing any previous entry."""
+    os.makedirs(PARAM_DIR, exist_ok=True)
+    path = _param_path(name)
+    with open(path + ".tmp", "w") as f:
+        json.dump(params, f, indent=2)
+    os.replace(path + ".tmp", path)
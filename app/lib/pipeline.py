@@ -0,0 +1,206 @@
+"""
+Async pipeline that runs several models for one validator request with overlapped I/O and CPU.
+
+The history, current price and real price fetches run concurrently (the blocking
+`requests` helpers are moved to threads with asyncio.to_thread). Simulation,
+serialization and scoring run in a process pool: each model's simulation.json is
+written as soon as its own simulation finishes, while the other models are still
+simulating, and scoring starts as soon as both the paths and the real path are
+available. A compact summary.json (percentile bands, representative paths and
+the score) is written last. End-to-end latency is roughly the longest single chain of
+fetch -> simulate -> serialize/score instead of the sum of every step.
+
+"ensemble" can be listed with the models: it runs once the other models'
+simulation.json files are written and is scored the same way.
+
+Other assets than BTC are scored against their own real path and written to
+public/<model>-<asset>/ (artifacts.asset_model), next to the BTC outputs.
+
+Usage:
+    python pipeline.py 2025-02-26T07:38:00+00:00 gbm base ensemble
+    ASSET=ETH python pipeline.py 2025-02-26T07:38:00+00:00 gbm
+"""
+import asyncio
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+
+import numpy as np
+
+import base
+import ensemble
+import gbm
+from artifacts import asset_model
+from artifacts import write_artifact
+from helpers import calculate_crps_for_miner
+from helpers import convert_prices_to_time_format
+from helpers import from_iso_to_unix_time
+from helpers import load_real_price_path
+from history_store import load_history
+from innovation_bank import get_bank
+from summary import write_summary
+from volatility import get_sigma
+
+# Model name -> (simulator, volatility type its sigma is expressed in)
+MODELS = {
+    "gbm": (gbm.simulate_gbm_price_paths, "hourly"),
+    "base": (base.simulate_crypto_price_paths, "daily"),
+}
+
+# Models that draw from a pre-generated innovation bank when one is built for the request's shape
+BANK_MODELS = {"gbm"}
+
+
+def _simulate(model: str, current_price: float, sigma: float, time_increment: int, time_length: int, num_simulations: int, seed: int) -> np.ndarray:
+    # Forked workers inherit the parent's RNG state, so every task reseeds
+    np.random.seed(seed)
+    simulate, volatility_type = MODELS[model]
+    if model in BANK_MODELS:
+        bank = get_bank(num_simulations, int(time_length / time_increment))
+        if bank.exists():
+            return simulate(current_price, time_increment, time_length, num_simulations, sigma, volatility_type, bank=bank)
+    return simulate(current_price, time_increment, time_length, num_simulations, sigma, volatility_type)
+
+
+def _write_simulation(output: str, paths: np.ndarray, start_time: str, variable: dict) -> str:
+    predictions = convert_prices_to_time_format(paths.tolist(), start_time, variable["time_increment"])
+    return write_artifact(
+        output, from_iso_to_unix_time(start_time), "simulation.json", {"variable": variable, "prediction": predictions}
+    )
+
+
+def _write_score(output: str, paths: np.ndarray, start_time: str, time_increment: int, real_prices: list[dict]) -> dict:
+    # Both paths start at start_time on the same grid, so alignment is a lookup by offset
+    start_timestamp = from_iso_to_unix_time(start_time)
+    real_by_index = {}
+    for entry in real_prices:
+        offset = from_iso_to_unix_time(entry["time"]) - start_timestamp
+        if offset % time_increment == 0:
+            real_by_index[offset // time_increment] = entry["price"]
+    columns = [i for i in range(paths.shape[1]) if i in real_by_index]
+    real_price_path = np.array([real_by_index[i] for i in columns])
+    crps_score, detailed_crps_data = calculate_crps_for_miner(paths[:, columns], real_price_path, time_increment)
+
+    score_data = {"total_score": crps_score, "detailed_scores": detailed_crps_data}
+    write_artifact(output, start_timestamp, "score.json", score_data)
+    return score_data
+
+
+async def run_request(
+    start_time: str,
+    models: list[str],
+    asset="BTC",
+    time_increment=300,
+    time_length=86400,
+    num_simulations=100,
+    executor: ProcessPoolExecutor | None = None,
+) -> dict:
+    """
+    Run every model for one request and return each model's score (None if the real path is not complete yet).
+    """
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    executor = executor or ProcessPoolExecutor()
+    start_timestamp = from_iso_to_unix_time(start_time)
+
+    try:
+        # Network I/O: the 1-day 5-minute history (which also gives the current price) and,
+        # if the window has closed, the real path, fetched concurrently
+        history_task = asyncio.create_task(
+            asyncio.to_thread(load_history, asset, start_timestamp - 86400, start_timestamp)
+        )
+        real_task = None
+        if start_timestamp + time_length <= datetime.now(timezone.utc).timestamp():
+            real_task = asyncio.create_task(
+                asyncio.to_thread(load_real_price_path, start_time, duration=time_length, asset=asset)
+            )
+
+        times, prices = await history_task
+        current_price = float(prices[-1])
+
+        # The history is cached by now, so the estimator only reads it locally
+        volatility_types = sorted({MODELS[model][1] for model in models if model in MODELS})
+        sigma_by_type = await asyncio.to_thread(
+            lambda: {volatility_type: get_sigma(asset, start_timestamp, volatility_type) for volatility_type in volatility_types}
+        )
+
+        seeds = np.random.SeedSequence().generate_state(len(models))
+
+        async def run_model(model: str, seed: int):
+            volatility_type = MODELS[model][1]
+            sigma = sigma_by_type[volatility_type]
+            paths = await loop.run_in_executor(
+                executor, _simulate, model, current_price, sigma, time_increment, time_length, num_simulations, int(seed)
+            )
+            variable = {
+                "asset": asset,
+                "current_price": current_price,
+                "time_increment": time_increment,
+                "time_length": time_length,
+                "num_simulations": num_simulations,
+                "sigma": sigma,
+                "start_time": start_time,
+                "volatility_type": volatility_type,
+                "model": model,
+            }
+            output = asset_model(model, asset)
+            # Serialization of this model overlaps with the other models' simulations
+            write = loop.run_in_executor(executor, _write_simulation, output, paths, start_time, variable)
+            score_data = None
+            if real_task is not None:
+                real_prices = await real_task
+                score_data = await loop.run_in_executor(
+                    executor, _write_score, output, paths, start_time, time_increment, real_prices
+                )
+            filepath = await write
+            print(f"Results saved to: {filepath}")
+            # Written last so it carries the score when there is one
+            await loop.run_in_executor(
+                executor, partial(write_summary, output, paths, start_time, time_increment, score_data, variable=variable)
+            )
+            return model, score_data["total_score"] if score_data else None
+
+        simulated = [model for model in models if model != "ensemble"]
+        results = await asyncio.gather(*(run_model(model, seed) for model, seed in zip(simulated, seeds)))
+
+        if "ensemble" in models:
+            # Mixes the matrices just written, so it has to wait for the other models. Other
+            # assets mix only this run's models: the default list holds the BTC ones
+            mixed = None if asset == "BTC" else [asset_model(model, asset) for model in simulated]
+            paths, variable = await loop.run_in_executor(
+                executor, ensemble.build_ensemble, start_time, mixed, num_simulations
+            )
+            variable["asset"] = asset
+            output = asset_model("ensemble", asset)
+            write = loop.run_in_executor(executor, _write_simulation, output, paths, start_time, variable)
+            score_data = None
+            if real_task is not None:
+                real_prices = await real_task
+                score_data = await loop.run_in_executor(
+                    executor, _write_score, output, paths, start_time, time_increment, real_prices
+                )
+            print(f"Results saved to: {await write}")
+            await loop.run_in_executor(
+                executor, partial(write_summary, output, paths, start_time, time_increment, score_data, variable=variable)
+            )
+            results.append(("ensemble", score_data["total_score"] if score_data else None))
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    return dict(results)
+
+
+def main():
+    start_time = sys.argv[1] if len(sys.argv) > 1 else "2025-02-26T07:38:00+00:00"
+    models = sys.argv[2:] or list(MODELS)
+    started = datetime.now(timezone.utc)
+    scores = asyncio.run(run_request(start_time, models, os.environ.get("ASSET", "BTC")))
+    for model, score in scores.items():
+        print(f"😊😊😊 {model}: {score}")
+    print(f"😊😊😊 Time taken: {datetime.now(timezone.utc) - started}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import numpy as np
+from datetime import datetime, timezone
+import os
+import sys
+import json
+from artifacts import record_file
+from summary import summarize_file
+from helpers import from_iso_to_unix_time
+from helpers import convert_prices_to_time_format
+from helpers import calculate_crps_for_miner
+from helpers import align_prediction_and_real_prices
+from helpers import load_real_price_path
+from history_store import load_history
+from param_cache import load_params
+from param_cache import save_params
+from sampling import standard_normal_draws
+
+def _forward_backward(log_returns: np.ndarray, means: np.ndarray, stds: np.ndarray, transition: np.ndarray, initial: np.ndarray):
+    """Scaled forward-backward pass. Returns (state posteriors, summed pair posteriors, log-likelihood, last filtered state)."""
+    num_obs, num_states = len(log_returns), len(means)
+    emission = np.exp(-0.5 * ((log_returns[:, None] - means) / stds) ** 2) / (stds * np.sqrt(2 * np.pi))
+    emission = np.maximum(emission, 1e-300)
+
+    alpha = np.empty((num_obs, num_states))
+    scale = np.empty(num_obs)
+    alpha[0] = initial * emission[0]
+    scale[0] = alpha[0].sum()
+    alpha[0] /= scale[0]
+    for t in range(1, num_obs):
+        alpha[t] = (alpha[t - 1] @ transition) * emission[t]
+        scale[t] = alpha[t].sum()
+        alpha[t] /= scale[t]
+
+    beta = np.empty((num_obs, num_states))
+    beta[-1] = 1.0
+    for t in range(num_obs - 2, -1, -1):
+        beta[t] = (transition @ (emission[t + 1] * beta[t + 1])) / scale[t + 1]
+
+    posteriors = alpha * beta
+    # Pair posteriors summed over time: sum_t alpha_t(i) A(i,j) e_{t+1}(j) beta_{t+1}(j) / c_{t+1}
+    weighted = emission[1:] * beta[1:] / scale[1:, None]
+    pairs = transition * (alpha[:-1].T @ weighted)
+    return posteriors, pairs, float(np.log(scale).sum()), alpha[-1]
+
+def fit_regimes(prices: np.ndarray, num_states=2, step_seconds=300, max_iter=100, tol=1e-6) -> dict:
+    """
+    Fit a Gaussian hidden Markov model of volatility regimes to a price series with EM (Baum-Welch).
+
+    Args:
+        prices: Close prices spaced step_seconds apart.
+        num_states: Number of volatility regimes (2 or 3).
+        step_seconds: Spacing of the prices.
+        max_iter: Maximum EM iterations.
+        tol: Stop once the log-likelihood improves by less than this.
+
+    Returns:
+        dict: Per-step state means and stds (sorted from calmest to most volatile),
+            transition matrix, stationary distribution, filtered probabilities of the
+            state at the end of the history, and the fit's log-likelihood.
+    """
+    log_returns = np.diff(np.log(np.asarray(prices, dtype=np.float64)))
+    if len(log_returns) < 10 * num_states:
+        raise ValueError("Not enough history to fit the regime model")
+
+    # Start from states spread around the overall volatility, mostly persistent
+    means = np.full(num_states, log_returns.mean())
+    stds = np.std(log_returns) * np.linspace(0.5, 2.0, num_states)
+    transition = np.full((num_states, num_states), 0.05 / max(num_states - 1, 1))
+    np.fill_diagonal(transition, 0.95)
+    initial = np.full(num_states, 1 / num_states)
+
+    previous = -np.inf
+    for _ in range(max_iter):
+        posteriors, pairs, log_likelihood, last_state = _forward_backward(log_returns, means, stds, transition, initial)
+
+        weights = posteriors.sum(axis=0)
+        means = (posteriors * log_returns[:, None]).sum(axis=0) / weights
+        stds = np.sqrt((posteriors * (log_returns[:, None] - means) ** 2).sum(axis=0) / weights)
+        stds = np.maximum(stds, 1e-8)
+        transition = pairs / pairs.sum(axis=1, keepdims=True)
+        initial = posteriors[0]
+
+        if log_likelihood - previous < tol:
+            break
+        previous = log_likelihood
+
+    order = np.argsort(stds)
+    transition = transition[order][:, order]
+    eigenvalues, eigenvectors = np.linalg.eig(transition.T)
+    stationary = np.real(eigenvectors[:, np.argmin(np.abs(eigenvalues - 1))])
+    stationary = stationary / stationary.sum()
+
+    return {
+        "num_states": num_states,
+        "step_seconds": step_seconds,
+        "means": means[order].tolist(),
+        "stds": stds[order].tolist(),
+        "transition": transition.tolist(),
+        "stationary": stationary.tolist(),
+        "last_state": last_state[order].tolist(),
+        "log_likelihood": log_likelihood,
+    }
+
+def fit_regime_params(asset: str, as_of: int, num_states=2, history_days=7, step_seconds=300, refit_seconds=3600) -> dict:
+    """
+    Regime parameters of an asset from the cached history ending at as_of.
+
+    The fit is cached with the other model parameters and reused for requests up to
+    refit_seconds after it, so the request path only samples.
+    """
+    name = f"regime_{asset}_{num_states}_{history_days}d_{step_seconds}"
+    cached = load_params(name)
+    if cached is not None and 0 <= as_of - cached["as_of"] < refit_seconds:
+        return cached
+
+    times, prices = load_history(asset, as_of - history_days * 86400, as_of)
+    params = fit_regimes(prices[times % step_seconds == 0], num_states, step_seconds)
+    params["as_of"] = as_of
+    save_params(name, params)
+    return params
+
+def describe_regimes(params: dict) -> str:
+    """Readable summary of fitted regimes: hourly volatility, stationary share and expected duration of each state."""
+    steps_per_hour = 3600 / params["step_seconds"]
+    lines = []
+    for i, std in enumerate(params["stds"]):
+        stay = params["transition"][i][i]
+        duration_hours = 1 / max(1 - stay, 1e-12) / steps_per_hour
+        lines.append(
+            f"state {i}: hourly vol {std * np.sqrt(steps_per_hour):.5f}, "
+            f"share {params['stationary'][i]:.1%}, expected duration {duration_hours:.1f}h, "
+            f"now {params['last_state'][i]:.1%}"
+        )
+    return "\n".join(lines)
+
+def simulate_regime_price_paths(current_price, time_increment, time_length, num_simulations, params: dict, dtype=np.float64, sampling="pseudo"):
+    """
+    Simulates num_simulations price paths using a Markov regime-switching volatility model.
+
+    Every path starts from the filtered state probabilities at the end of the
+    history; the state chains of all paths advance together one step at a time,
+    and the returns are then drawn for all paths and steps at once.
+
+    Args:
+    current_price: The latest available price.
+    time_increment: The time increment in seconds (a multiple of the fit's step).
+    time_length: The time horizon in seconds.
+    num_simulations: The number of paths to simulate.
+    params: Fitted parameters from fit_regimes.
+    dtype: The float precision of the simulation (np.float64 or np.float32).
+    sampling: How the return innovations are drawn, see sampling.SAMPLING_MODES.
+    Returns:
+    np.array: A numpy array where each row corresponds to a simulated path.
+    """
+    num_steps = int(time_length / time_increment)
+    steps_per_increment = max(int(round(time_increment / params["step_seconds"])), 1)
+    stds = np.array(params["stds"])
+    transition = np.linalg.matrix_power(np.array(params["transition"]), steps_per_increment)
+    cumulative = np.cumsum(transition, axis=1)
+    cumulative[:, -1] = 1.0
+
+    states = np.empty((num_simulations, num_steps), dtype=np.int64)
+    uniforms = np.random.random((num_simulations, num_steps))
+    # The first simulated step is one transition after the last filtered state
+    initial = np.cumsum(np.array(params["last_state"]) @ transition)
+    initial[-1] = 1.0
+    states[:, 0] = np.searchsorted(initial, uniforms[:, 0], side="right")
+    for t in range(1, num_steps):
+        states[:, t] = (uniforms[:, t, None] >= cumulative[states[:, t - 1]]).sum(axis=1)
+
+    # Martingale drift per regime, as in the GBM engines
+    variance = stds[states] ** 2 * steps_per_increment
+    z = standard_normal_draws(num_simulations, num_steps, sampling, np.float64)
+    log_returns = -0.5 * variance + np.sqrt(variance) * z
+
+    simulated_prices = np.empty((num_simulations, num_steps + 1), dtype=dtype)
+    simulated_prices[:,0] = current_price
+    simulated_prices[:,1:] = current_price * np.exp(np.cumsum(log_returns, axis=1))
+    return simulated_prices
+
+def simulate_crypto_price_paths(
+    current_price, time_increment, time_length, num_simulations, params: dict, start_time: str, asset="BTC", dtype=np.float64, sampling="pseudo"
+):
+    """
+    Simulate multiple crypto asset price paths and save them to public/regime/<ts>/simulation.json.
+    """
+    simulations = simulate_regime_price_paths(current_price, time_increment, time_length, num_simulations, params, dtype, sampling)
+
+    predictions = convert_prices_to_time_format(
+        simulations.tolist(), str(start_time), time_increment
+    )
+    sim_dir = os.path.join("../../public/regime", str(from_iso_to_unix_time(start_time)))
+    os.makedirs(sim_dir, exist_ok=True)
+
+    filepath = os.path.join(sim_dir, "simulation.json")
+    with open(filepath, 'w') as f:
+        json.dump({
+            "variable": {
+                "asset": asset,
+                "current_price": float(current_price),
+                "time_increment": time_increment,
+                "time_length": time_length,
+                "num_simulations": num_simulations,
+                "regime_params": params,
+                "start_time": start_time,
+                "volatility_type": "step",
+                "dtype": np.dtype(dtype).name,
+                "sampling": sampling,
+                "model": "regime"
+            },
+            "prediction": predictions
+        }, f, indent=2)
+
+    print(f"Results saved to: {filepath}")
+    record_file(filepath)
+    summarize_file(filepath)
+
+    return predictions
+
+def main():
+
+    start_time = sys.argv[1] if len(sys.argv) > 1 else "2025-02-26T07:38:00+00:00"
+    num_states = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    start_timestamp = from_iso_to_unix_time(start_time)
+
+    params = fit_regime_params("BTC", start_timestamp, num_states)
+    print(f"😊😊😊 Fitted regimes:\n{describe_regimes(params)}")
+
+    times, prices = load_history("BTC", start_timestamp - 3600, start_timestamp)
+    current_price = float(prices[-1])
+
+    predictions = simulate_crypto_price_paths(
+        current_price=current_price,
+        time_increment=300,
+        time_length=86400,
+        num_simulations=100,
+        params=params,
+        start_time=start_time,
+    )
+
+    if start_timestamp + 86400 > datetime.now(timezone.utc).timestamp():
+        print("Real price path not complete yet, skipping the score")
+        return
+
+    real_price_path = load_real_price_path(start_time)
+    predictions_path, real_price_path = align_prediction_and_real_prices(predictions, real_price_path)
+
+    crps_score, detailed_crps_data = calculate_crps_for_miner(np.array(predictions_path), np.array(real_price_path), 300)
+
+    score_data = {
+        "total_score": float(crps_score),
+        "detailed_scores": detailed_crps_data
+    }
+    print(f"Total CRPS score: {crps_score}")
+    score_path = os.path.join("../../public/regime", str(start_timestamp), "score.json")
+    with open(score_path, 'w') as f:
+        json.dump(score_data, f, indent=2)
+
+    print(f"Score data saved to: {score_path}")
+    record_file(score_path)
+    summarize_file(score_path)
+
+if __name__ == "__main__":
+    main()
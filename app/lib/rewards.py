@@ -0,0 +1,192 @@
+"""
+Vectorized recomputation of smoothed scores and reward weights over score history.
+
+The miner_scores history is loaded as a (miners x prompts) matrix, smoothed
+along the prompt axis (EMA or moving average) and turned into softmax reward
+weights at every prompt at once, with the same masking and beta as
+helpers.compute_softmax. Because it is all array operations, what-if analyses
+over thousands of historical prompts (another window, another beta, or our own
+scores replaced by a candidate model's) take seconds.
+
+Usage:
+    python rewards.py --uid 42 --days 7 --window 50
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from scipy.signal import lfilter
+from sqlalchemy import select
+
+from db import get_engine
+from db import miner_predictions
+from db import miner_scores
+from db import validator_requests
+
+# helpers.compute_softmax: negative beta gives higher weight to lower CRPS
+SOFTMAX_BETA = -1 / 1000.0
+
+
+def load_score_matrix(since: datetime, until: datetime | None = None, engine=None) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Load miner_scores of the validator requests started in [since, until) as a matrix.
+
+    Each validator request is one prompt, even when several share a start time.
+
+    Returns:
+        tuple: (miner uids, validator_requests ids, their start times as epoch
+            seconds, (miners, prompts) prompt_score matrix with -1 for invalid
+            predictions and NaN where a miner has no score for a prompt), with
+            prompts ordered by start time
+    """
+    engine = engine or get_engine()
+    query = (
+        select(miner_scores.c.miner_uid, validator_requests.c.id, validator_requests.c.start_time, miner_scores.c.prompt_score)
+        .join(miner_predictions, miner_scores.c.miner_predictions_id == miner_predictions.c.id)
+        .join(validator_requests, miner_predictions.c.validator_requests_id == validator_requests.c.id)
+        .where(validator_requests.c.start_time >= since)
+    )
+    if until is not None:
+        query = query.where(validator_requests.c.start_time < until)
+
+    with engine.connect() as connection:
+        rows = connection.execute(query).fetchall()
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty((0, 0))
+
+    uids = np.array([row.miner_uid for row in rows], dtype=np.int64)
+    request_ids = np.array([row.id for row in rows], dtype=np.int64)
+    times = np.array([
+        int((row.start_time if row.start_time.tzinfo else row.start_time.replace(tzinfo=timezone.utc)).timestamp())
+        for row in rows
+    ], dtype=np.int64)
+    scores = np.array([row.prompt_score for row in rows], dtype=np.float64)
+
+    miner_uids, miner_index = np.unique(uids, return_inverse=True)
+    prompt_ids, first_row, prompt_index = np.unique(request_ids, return_index=True, return_inverse=True)
+    prompt_times = times[first_row]
+    matrix = np.full((len(miner_uids), len(prompt_ids)), np.nan)
+    matrix[miner_index, prompt_index] = scores
+
+    order = np.lexsort((prompt_ids, prompt_times))
+    return miner_uids, prompt_ids[order], prompt_times[order], matrix[:, order]
+
+
+def scored_prompts(matrix: np.ndarray) -> np.ndarray:
+    """Mask of the prompts (columns) with at least one valid score."""
+    return np.any(~np.isnan(matrix) & (matrix != -1), axis=0)
+
+
+def fill_missing_scores(matrix: np.ndarray) -> np.ndarray:
+    """
+    Replace invalid (-1) and missing scores with the worst valid score of the same prompt.
+
+    Prompts without any valid score stay NaN and must be dropped (see scored_prompts)
+    before smoothing, which would carry the NaN into every later prompt.
+    """
+    valid = np.where(matrix == -1, np.nan, matrix)
+    with np.errstate(all="ignore"):
+        worst = np.nanmax(np.where(np.isnan(valid), -np.inf, valid), axis=0)
+    worst[np.isinf(worst)] = np.nan
+    return np.where(np.isnan(valid), worst[None, :], valid)
+
+
+def smooth_scores(matrix: np.ndarray, window=50, method="ema") -> np.ndarray:
+    """
+    Smooth each miner's scores along the prompt axis.
+
+    Args:
+        matrix: (miners, prompts) scores without gaps, e.g. from fill_missing_scores.
+        window: EMA span (alpha = 2 / (window + 1)) or moving-average length.
+        method: "ema" or "sma".
+
+    Returns:
+        np.ndarray: (miners, prompts) smoothed scores; entry t only uses prompts up to t.
+    """
+    if matrix.shape[1] == 0:
+        return matrix.copy()
+    if method == "ema":
+        alpha = 2 / (window + 1)
+        # s_t = alpha * x_t + (1 - alpha) * s_{t-1}, seeded with the first score, as one filter pass
+        initial = (1 - alpha) * matrix[:, :1]
+        smoothed, _ = lfilter([alpha], [1, alpha - 1], matrix, axis=1, zi=initial)
+        return smoothed
+    if method == "sma":
+        cumulative = np.concatenate([np.zeros((matrix.shape[0], 1)), np.cumsum(matrix, axis=1)], axis=1)
+        counts = np.minimum(np.arange(1, matrix.shape[1] + 1), window)
+        ends = np.arange(1, matrix.shape[1] + 1)
+        return (cumulative[:, ends] - cumulative[:, ends - counts]) / counts
+    raise ValueError(f"Unknown smoothing method: {method}")
+
+
+def reward_weights(smoothed: np.ndarray, beta=SOFTMAX_BETA) -> np.ndarray:
+    """
+    Softmax reward weights across miners at every prompt, as helpers.compute_softmax per column.
+
+    NaN and -1 entries get weight 0.
+    """
+    mask = ~np.isnan(smoothed) & (smoothed != -1)
+    logits = np.where(mask, beta * smoothed, -np.inf)
+    # Subtracting the column max leaves the softmax unchanged and avoids overflow
+    column_max = np.max(logits, axis=0, keepdims=True)
+    column_max[~np.isfinite(column_max)] = 0.0
+    exp_scores = np.where(mask, np.exp(logits - column_max), 0.0)
+    totals = exp_scores.sum(axis=0, keepdims=True)
+    return np.divide(exp_scores, totals, out=np.zeros_like(exp_scores), where=totals > 0)
+
+
+def projected_incentive(weights: np.ndarray, miner_uids: np.ndarray, uid: int) -> dict:
+    """
+    Our share of the reward weight over the history.
+
+    Returns:
+        dict: per-prompt weights of uid, their mean, the latest weight and our rank at the latest prompt.
+    """
+    index = np.searchsorted(miner_uids, uid)
+    if index >= len(miner_uids) or miner_uids[index] != uid:
+        raise ValueError(f"Miner {uid} has no scores in this history")
+    ours = weights[index]
+    latest = weights[:, -1]
+    return {
+        "weights": ours,
+        "mean_weight": float(ours.mean()),
+        "latest_weight": float(ours[-1]),
+        "latest_rank": int((latest > latest[index]).sum() + 1),
+    }
+
+
+def simulate_rewards(matrix: np.ndarray, window=50, method="ema", beta=SOFTMAX_BETA) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Full pipeline on a raw score matrix: (smoothed scores, reward weights).
+
+    Prompts without any valid score are left out, so the outputs have the
+    columns of matrix[:, scored_prompts(matrix)].
+    """
+    smoothed = smooth_scores(fill_missing_scores(matrix[:, scored_prompts(matrix)]), window, method)
+    return smoothed, reward_weights(smoothed, beta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute smoothed scores and reward weights from miner_scores history.")
+    parser.add_argument("--uid", type=int, required=True, help="Miner uid to project the incentive of")
+    parser.add_argument("--days", type=float, default=7, help="History length in days")
+    parser.add_argument("--window", type=int, default=50, help="Smoothing window in prompts")
+    parser.add_argument("--method", choices=["ema", "sma"], default="ema")
+    parser.add_argument("--beta", type=float, default=SOFTMAX_BETA)
+    args = parser.parse_args()
+
+    since = datetime.now(timezone.utc) - timedelta(days=args.days)
+    miner_uids, _, _, matrix = load_score_matrix(since)
+    print(f"😊😊😊 Loaded {matrix.shape[0]} miners x {matrix.shape[1]} prompts")
+    if not scored_prompts(matrix).any():
+        return
+
+    started = datetime.now(timezone.utc)
+    smoothed, weights = simulate_rewards(matrix, args.window, args.method, args.beta)
+    projection = projected_incentive(weights, miner_uids, args.uid)
+    print(f"😊😊😊 Recomputed in {datetime.now(timezone.utc) - started}")
+    print(f"Miner {args.uid}: latest weight {projection['latest_weight']:.6f}, "
+          f"mean weight {projection['mean_weight']:.6f}, latest rank {projection['latest_rank']}")
+
+if __name__ == "__main__":
+    main()
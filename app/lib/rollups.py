@@ -0,0 +1,284 @@
+"""
+Per-miner score rollups for the dashboard.
+
+miner_score_rollups holds, per (miner_uid, bucket size, bucket start), the count,
+sum, min and max of the valid prompt scores, the number of invalid ones and the
+last prompt_score. refresh_rollups re-aggregates only the recent miner_scores
+rows: those scored since the high-water mark stored in job_state, minus
+REFRESH_OVERLAP, going back to the start of that day. Each day is aggregated
+whole and upserted over its buckets, replacing them, so a refresh costs about a
+day of rows rather than the whole history, and aggregating a bucket again is
+idempotent. leaderboard and score_time_series read the small rollup table
+instead of aggregating raw scores per request.
+
+bulk_score stamps all rows of a run with the time the run started and commits
+them at its end, so rows can become visible with a scored_time behind the
+high-water mark. The overlap picks them up as long as no scoring transaction
+runs longer than REFRESH_OVERLAP.
+
+Usage:
+    python rollups.py refresh
+    python rollups.py leaderboard [hours]
+"""
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
+
+from db import get_engine
+from db import job_state
+from db import miner_rewards
+from db import miner_score_rollups
+from db import miner_scores
+
+# Bucket sizes kept up to date: hourly and daily
+BUCKET_SIZES = (3600, 86400)
+
+JOB_NAME = "miner_score_rollups"
+
+# How far behind the high-water mark a refresh re-aggregates, for rows committed late
+REFRESH_OVERLAP = timedelta(hours=6)
+
+
+def _utc(value: datetime | None) -> datetime | None:
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def aggregate_scores(scores: pd.DataFrame, bucket_seconds: int) -> list[dict]:
+    """
+    Aggregate miner_scores rows (miner_uid, scored_time, prompt_score) into rollup rows of one bucket size.
+    """
+    epoch = scores["scored_time"].map(lambda t: int(_utc(t).timestamp()))
+    frame = pd.DataFrame({
+        "miner_uid": scores["miner_uid"].to_numpy(),
+        "bucket": (epoch // bucket_seconds * bucket_seconds).to_numpy(),
+        "epoch": epoch.to_numpy(),
+        "prompt_score": scores["prompt_score"].to_numpy(dtype=float),
+    })
+    frame["valid_score"] = frame["prompt_score"].where(frame["prompt_score"] != -1)
+
+    grouped = frame.sort_values("epoch").groupby(["miner_uid", "bucket"], sort=False)
+    aggregated = grouped.agg(
+        num_scores=("valid_score", "count"),
+        num_rows=("prompt_score", "size"),
+        sum_score=("valid_score", "sum"),
+        min_score=("valid_score", "min"),
+        max_score=("valid_score", "max"),
+        last_prompt_score=("prompt_score", "last"),
+        last_epoch=("epoch", "last"),
+    ).reset_index()
+
+    return [
+        {
+            "miner_uid": int(row.miner_uid),
+            "bucket_seconds": bucket_seconds,
+            "bucket_start": datetime.fromtimestamp(int(row.bucket), timezone.utc),
+            "num_scores": int(row.num_scores),
+            "num_invalid": int(row.num_rows - row.num_scores),
+            "sum_score": float(row.sum_score),
+            "min_score": None if pd.isna(row.min_score) else float(row.min_score),
+            "max_score": None if pd.isna(row.max_score) else float(row.max_score),
+            "last_prompt_score": float(row.last_prompt_score),
+            "last_scored_time": datetime.fromtimestamp(int(row.last_epoch), timezone.utc),
+        }
+        for row in aggregated.itertuples(index=False)
+    ]
+
+
+def _upsert_rollups(connection, rows: list[dict]):
+    """Insert new buckets and replace the ones that exist with their re-aggregated rows."""
+    if not rows:
+        return
+    insert = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    statement = insert(miner_score_rollups)
+    new = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=["miner_uid", "bucket_seconds", "bucket_start"],
+        set_={
+            column: getattr(new, column)
+            for column in (
+                "num_scores", "num_invalid", "sum_score", "min_score", "max_score", "last_prompt_score", "last_scored_time",
+            )
+        },
+    )
+    connection.execute(statement, rows)
+
+
+def _high_water_mark(connection) -> datetime | None:
+    return _utc(connection.execute(
+        select(job_state.c.high_water_mark).where(job_state.c.name == JOB_NAME)
+    ).scalar())
+
+
+def _set_high_water_mark(connection, high_water_mark: datetime):
+    dialect = connection.dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    values = {"name": JOB_NAME, "high_water_mark": high_water_mark, "updated_at": datetime.now(timezone.utc)}
+    statement = insert(job_state).values(**values)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"high_water_mark": statement.excluded.high_water_mark, "updated_at": statement.excluded.updated_at},
+    ))
+
+
+def refresh_rollups(engine=None, bucket_sizes=BUCKET_SIZES, overlap=REFRESH_OVERLAP) -> int:
+    """
+    Re-aggregate the buckets holding miner_scores rows scored since the last refresh, minus overlap.
+
+    Returns:
+        int: Number of miner_scores rows aggregated.
+    """
+    engine = engine or get_engine()
+    # Windows span whole buckets of every size, so each bucket is rebuilt from all its rows
+    window_seconds = max(bucket_sizes)
+    processed = 0
+    with engine.begin() as connection:
+        latest = _utc(connection.execute(select(func.max(miner_scores.c.scored_time))).scalar())
+        if latest is None:
+            print("No scores to roll up")
+            return 0
+        since = _high_water_mark(connection)
+        if since is None:
+            since = _utc(connection.execute(select(func.min(miner_scores.c.scored_time))).scalar())
+        else:
+            since -= overlap
+
+        window_start = int(since.timestamp()) // window_seconds * window_seconds
+        while window_start <= latest.timestamp():
+            window_end = window_start + window_seconds
+            scores = pd.DataFrame(connection.execute(
+                select(miner_scores.c.miner_uid, miner_scores.c.scored_time, miner_scores.c.prompt_score)
+                .where(miner_scores.c.scored_time >= datetime.fromtimestamp(window_start, timezone.utc))
+                .where(miner_scores.c.scored_time < datetime.fromtimestamp(window_end, timezone.utc))
+            ).fetchall(), columns=["miner_uid", "scored_time", "prompt_score"])
+            scores = scores.dropna(subset=["prompt_score"])
+            if not scores.empty:
+                for bucket_seconds in bucket_sizes:
+                    _upsert_rollups(connection, aggregate_scores(scores, bucket_seconds))
+                processed += len(scores)
+            window_start = window_end
+
+        _set_high_water_mark(connection, latest)
+
+    print(f"😊😊😊 Aggregated {processed} scores into the rollups, high-water mark {latest.isoformat()}")
+    return processed
+
+
+def latest_reward_weights(connection) -> dict[int, dict]:
+    """smoothed_score and reward_weight of every miner from the latest miner_rewards update."""
+    latest = select(func.max(miner_rewards.c.updated_at)).scalar_subquery()
+    rows = connection.execute(
+        select(miner_rewards.c.miner_uid, miner_rewards.c.smoothed_score, miner_rewards.c.reward_weight)
+        .where(miner_rewards.c.updated_at == latest)
+    ).fetchall()
+    return {row.miner_uid: {"smoothed_score": row.smoothed_score, "reward_weight": row.reward_weight} for row in rows}
+
+
+def leaderboard(since: datetime, until: datetime | None = None, bucket_seconds=3600, limit=None, engine=None) -> list[dict]:
+    """
+    Miners ranked by mean CRPS (lower is better) over the buckets starting in [since, until).
+
+    Returns:
+        list[dict]: rank, miner_uid, num_scores, num_invalid, mean_score, min_score,
+            max_score, last_prompt_score and the latest smoothed_score/reward_weight.
+    """
+    engine = engine or get_engine()
+    rollups = miner_score_rollups.c
+    query = (
+        select(
+            rollups.miner_uid,
+            func.sum(rollups.num_scores).label("num_scores"),
+            func.sum(rollups.num_invalid).label("num_invalid"),
+            func.sum(rollups.sum_score).label("sum_score"),
+            func.min(rollups.min_score).label("min_score"),
+            func.max(rollups.max_score).label("max_score"),
+        )
+        .where(rollups.bucket_seconds == bucket_seconds)
+        .where(rollups.bucket_start >= since)
+        .group_by(rollups.miner_uid)
+    )
+    if until is not None:
+        query = query.where(rollups.bucket_start < until)
+    last_query = select(rollups.miner_uid, rollups.last_prompt_score, rollups.last_scored_time).where(
+        rollups.bucket_seconds == bucket_seconds
+    ).where(rollups.bucket_start >= since)
+    if until is not None:
+        last_query = last_query.where(rollups.bucket_start < until)
+
+    with engine.connect() as connection:
+        rows = connection.execute(query).fetchall()
+        last_scores = {}
+        for row in connection.execute(last_query):
+            if row.miner_uid not in last_scores or _utc(row.last_scored_time) > last_scores[row.miner_uid][1]:
+                last_scores[row.miner_uid] = (row.last_prompt_score, _utc(row.last_scored_time))
+        rewards = latest_reward_weights(connection)
+
+    board = [
+        {
+            "miner_uid": row.miner_uid,
+            "num_scores": int(row.num_scores),
+            "num_invalid": int(row.num_invalid),
+            "mean_score": row.sum_score / row.num_scores if row.num_scores else None,
+            "min_score": row.min_score,
+            "max_score": row.max_score,
+            "last_prompt_score": last_scores.get(row.miner_uid, (None,))[0],
+            **rewards.get(row.miner_uid, {"smoothed_score": None, "reward_weight": None}),
+        }
+        for row in rows
+    ]
+    board.sort(key=lambda entry: (entry["mean_score"] is None, entry["mean_score"]))
+    for rank, entry in enumerate(board, start=1):
+        entry["rank"] = rank
+    return board[:limit] if limit is not None else board
+
+
+def score_time_series(miner_uid: int, since: datetime, until: datetime | None = None, bucket_seconds=3600, engine=None) -> list[dict]:
+    """Per-bucket score stats of one miner, oldest first."""
+    engine = engine or get_engine()
+    rollups = miner_score_rollups.c
+    query = (
+        select(miner_score_rollups)
+        .where(rollups.miner_uid == miner_uid)
+        .where(rollups.bucket_seconds == bucket_seconds)
+        .where(rollups.bucket_start >= since)
+        .order_by(rollups.bucket_start)
+    )
+    if until is not None:
+        query = query.where(rollups.bucket_start < until)
+    with engine.connect() as connection:
+        rows = connection.execute(query).fetchall()
+    return [
+        {
+            "bucket_start": _utc(row.bucket_start).isoformat(),
+            "num_scores": row.num_scores,
+            "num_invalid": row.num_invalid,
+            "mean_score": row.sum_score / row.num_scores if row.num_scores else None,
+            "min_score": row.min_score,
+            "max_score": row.max_score,
+            "last_prompt_score": row.last_prompt_score,
+        }
+        for row in rows
+    ]
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else "refresh"
+    if command == "refresh":
+        refresh_rollups()
+    elif command == "leaderboard":
+        hours = int(sys.argv[2]) if len(sys.argv) > 2 else 24
+        for entry in leaderboard(datetime.now(timezone.utc) - timedelta(hours=hours), limit=20):
+            print(f"{entry['rank']:3d}  miner {entry['miner_uid']:4d}  mean CRPS {entry['mean_score']}  "
+                  f"scores {entry['num_scores']}  reward {entry['reward_weight']}")
+    else:
+        raise SystemExit(f"Unknown command: {command}")
+
+if __name__ == "__main__":
+    main()
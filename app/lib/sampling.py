@@ -0,0 +1,78 @@
+import warnings
+
+import numpy as np
+from scipy.stats import norm
+from scipy.stats import qmc
+
+SAMPLING_MODES = ("pseudo", "antithetic", "sobol", "moment_matching")
+
+def _normals(shape, dtype=np.float64) -> np.ndarray:
+    """
+    Pseudo-random standard normals of the given dtype.
+
+    float64 draws come from the global numpy RNG stream as before. The legacy RNG
+    can only draw float64, so other precisions use a Generator, which draws
+    float32 directly; it is seeded from the global RNG so np.random.seed still
+    makes runs reproducible.
+    """
+    if np.dtype(dtype) == np.float64:
+        return np.random.standard_normal(shape)
+    rng = np.random.default_rng(np.random.randint(0, 2**31 - 1))
+    return rng.standard_normal(shape, dtype=np.dtype(dtype))
+
+
+def standard_normal_draws(num_simulations: int, num_steps: int, sampling="pseudo", dtype=np.float64, seed=None) -> np.ndarray:
+    """
+    Draw standard normal innovations for the GBM-family engines.
+
+    Args:
+        num_simulations: Number of paths (rows).
+        num_steps: Number of time steps (columns).
+        sampling: One of SAMPLING_MODES.
+            "pseudo": plain pseudo-random normals from the global numpy RNG
+                (see _normals for float32).
+            "antithetic": half the paths use Z, the other half -Z.
+            "sobol": scrambled Sobol points (one dimension per step) mapped
+                through the inverse normal CDF. The balance properties only
+                hold for a power-of-two num_simulations; other counts get the
+                first num_simulations points of the sequence, which are still
+                low-discrepancy but not balanced.
+            "moment_matching": pseudo-random normals rescaled so that every
+                step has exactly zero mean and unit variance across paths.
+        dtype: Float precision of the returned matrix.
+        seed: Seed for the Sobol scrambling. Defaults to a draw from the
+            global numpy RNG so np.random.seed keeps runs reproducible.
+
+    Returns:
+        np.ndarray: (num_simulations, num_steps) matrix of innovations.
+    """
+    if sampling == "pseudo":
+        draws = _normals((num_simulations, num_steps), dtype)
+
+    elif sampling == "antithetic":
+        half = _normals(((num_simulations + 1) // 2, num_steps), dtype)
+        draws = np.concatenate([half, -half])[:num_simulations]
+
+    elif sampling == "sobol":
+        if seed is None:
+            seed = np.random.randint(0, 2**31 - 1)
+        sobol = qmc.Sobol(d=num_steps, scramble=True, seed=seed)
+        if num_simulations & (num_simulations - 1) == 0:
+            points = sobol.random_base2(m=num_simulations.bit_length() - 1)
+        else:
+            # Not a power of two: a prefix of the sequence, without the balance guarantee
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                points = sobol.random(num_simulations)
+        eps = np.finfo(np.float64).eps
+        draws = norm.ppf(np.clip(points, eps, 1 - eps))
+
+    elif sampling == "moment_matching":
+        draws = _normals((num_simulations, num_steps), dtype)
+        if num_simulations > 1:
+            draws = (draws - draws.mean(axis=0)) / draws.std(axis=0)
+
+    else:
+        raise ValueError(f"Unknown sampling mode: {sampling}. Expected one of {SAMPLING_MODES}")
+
+    return draws.astype(dtype, copy=False)
@@ -0,0 +1,100 @@
+"""
+Benchmark the CRPS run-to-run variance of each sampling mode.
+
+For every stored base/gbm run with a sigma in its simulation.json variables
+and a matching public/real/<timestamp>/real.json, the GBM engine is re-run
+`repeats` times per sampling mode and path count, starting from the first
+real price. The spread of the total CRPS across repeats is the noise a
+single submission would see; a mode that gives the same spread with fewer
+paths saves compute.
+"""
+import glob
+import json
+import os
+
+import numpy as np
+
+from gbm import simulate_gbm_price_paths
+from helpers import calculate_crps_for_miner
+from sampling import SAMPLING_MODES
+
+PATH_COUNTS = (25, 50, 100)
+
+
+def load_cases(public_dir="../../public", models=("base", "gbm")):
+    """
+    Returns:
+        list[dict]: Stored runs with their sigma, volatility type and real price path.
+    """
+    cases = []
+    for model in models:
+        for simulation_path in sorted(glob.glob(os.path.join(public_dir, model, "*", "simulation.json"))):
+            timestamp = os.path.basename(os.path.dirname(simulation_path))
+            real_path = os.path.join(public_dir, "real", timestamp, "real.json")
+            if not os.path.exists(real_path):
+                continue
+            with open(simulation_path, "r") as f:
+                variable = json.load(f).get("variable", {})
+            if "sigma" not in variable:
+                continue
+            with open(real_path, "r") as f:
+                real_prices = np.array([entry["price"] for entry in json.load(f)])
+            cases.append({
+                "model": model,
+                "timestamp": timestamp,
+                "sigma": float(variable["sigma"]),
+                "volatility_type": variable.get("volatility_type", "hourly"),
+                "real_prices": real_prices,
+            })
+    return cases
+
+
+def crps_spread(case, sampling, num_simulations, repeats, time_increment=300):
+    """Mean and standard deviation of the total CRPS over `repeats` independent runs."""
+    real_prices = case["real_prices"]
+    time_length = (len(real_prices) - 1) * time_increment
+    scores = np.empty(repeats)
+    for i in range(repeats):
+        paths = simulate_gbm_price_paths(
+            real_prices[0], time_increment, time_length, num_simulations,
+            case["sigma"], case["volatility_type"], sampling=sampling
+        )
+        scores[i], _ = calculate_crps_for_miner(paths, real_prices, time_increment)
+    return float(scores.mean()), float(scores.std(ddof=1))
+
+
+def main(repeats=20, seed=0):
+    np.random.seed(seed)
+    cases = load_cases()
+    print(f"😊😊😊 {len(cases)} stored cases, {repeats} repeats per mode and path count")
+
+    results = []
+    for case in cases:
+        print(f"\n{case['model']} {case['timestamp']} sigma={case['sigma']:.6f} ({case['volatility_type']})")
+        print(f"{'paths':>6}" + "".join(f"{mode:>24}" for mode in SAMPLING_MODES))
+        for num_simulations in PATH_COUNTS:
+            row = {}
+            for mode in SAMPLING_MODES:
+                row[mode] = crps_spread(case, mode, num_simulations, repeats)
+            print(f"{num_simulations:>6}" + "".join(f"{mean:>14.1f} ±{std:>8.1f}" for mean, std in row.values()))
+            results.append({
+                "model": case["model"],
+                "timestamp": case["timestamp"],
+                "num_simulations": num_simulations,
+                "scores": {mode: {"mean": mean, "std": std} for mode, (mean, std) in row.items()},
+            })
+
+    # Variance of each mode relative to plain pseudo-random sampling, averaged over cases
+    print("\nCRPS variance relative to pseudo (lower is better):")
+    for num_simulations in PATH_COUNTS:
+        rows = [r for r in results if r["num_simulations"] == num_simulations]
+        ratios = {
+            mode: np.mean([r["scores"][mode]["std"] ** 2 / r["scores"]["pseudo"]["std"] ** 2 for r in rows])
+            for mode in SAMPLING_MODES
+        }
+        print(f"{num_simulations:>6}" + "".join(f"{mode:>18}: {ratio:.2f}" for mode, ratio in ratios.items()))
+
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from helpers import calculate_crps_for_miner, get_real_price_path, align_prediction_and_real_prices, from_iso_to_unix_time, convert_prices_to_time_format
 import json
-from db import create_database_engine
+from db import get_engine
 from db import my_predictions
 from sqlalchemy import select
 import numpy as np
@@ -8,7 +8,7 @@ import os
 
 def main():
     prediction_id = 25959
-    engine = create_database_engine() 
+    engine = get_engine()
     with engine.connect() as connection:
         # Fetch prediction by ID
         # query = select(my_predictions).where(my_predictions.c.id == prediction_id)
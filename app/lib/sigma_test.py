@@ -1,9 +1,123 @@
 from base import generate_simulations, _calc_params, get_real_price_path, align_prediction_and_real_prices, calculate_crps_for_miner
+from base import simulate_crypto_price_paths
+from artifacts import record_file
 from datetime import datetime, timedelta, timezone
 import os
+import sys
 import json
-from helpers import from_iso_to_unix_time
+from helpers import from_iso_to_unix_time, convert_prices_to_time_format, load_real_price_path
 import numpy as np
+from scipy import stats
+from scipy.optimize import minimize_scalar
+
+def optimize_sigma(
+    start_time: str,
+    initial_price: float,
+    sigma: float,
+    real_prices: list[dict],
+    volatility_type="hourly",
+    num_simulations=100,
+    time_increment=300,
+    time_length=86400,
+    replicates=5,
+    xatol=0.01,
+    sampling="pseudo",
+    seed=0,
+):
+    """
+    Minimize CRPS over sigma with bounded Brent search on common random numbers.
+
+    Each replicate fixes one RNG seed, so every sigma it evaluates reuses the same
+    innovations and CRPS(sigma) becomes a smooth deterministic function that Brent's
+    method can minimize in ~10-15 evaluations. Independent replicates give the spread
+    of the optimum, reported as a t-based 95% confidence interval.
+
+    Args:
+        sigma: Initial sigma estimate; the search runs over [sigma / 2, 1.5 * sigma].
+        real_prices: Real price path for the simulated window ({"time","price"} entries).
+        replicates: Number of independent common-random-number searches.
+        xatol: Search tolerance as a fraction of the initial sigma.
+
+    Returns:
+        dict: Optimum, confidence interval and every evaluated (sigma, crps_score) point.
+    """
+    # Align the simulation time grid with the real path once; every evaluation reuses it
+    template = convert_prices_to_time_format([[0.0] * (time_length // time_increment + 1)], start_time, time_increment)
+    real_by_time = {entry["time"]: entry["price"] for entry in real_prices}
+    columns = [i for i, entry in enumerate(template[0]) if entry["time"] in real_by_time]
+    real_price_path = np.array([real_by_time[template[0][i]["time"]] for i in columns])
+
+    bounds = (sigma / 2, sigma * 1.5)
+    results = []
+    for replicate in range(replicates):
+        replicate_seed = seed + replicate
+        evaluations = []
+
+        def objective(candidate_sigma):
+            np.random.seed(replicate_seed)
+            paths = simulate_crypto_price_paths(
+                initial_price, time_increment, time_length, num_simulations,
+                candidate_sigma, volatility_type, sampling=sampling
+            )
+            crps_score, _ = calculate_crps_for_miner(paths[:, columns], real_price_path, time_increment)
+            evaluations.append({"sigma": float(candidate_sigma), "crps_score": crps_score})
+            return crps_score
+
+        result = minimize_scalar(objective, bounds=bounds, method="bounded", options={"xatol": xatol * sigma})
+        results.append({
+            "seed": replicate_seed,
+            "sigma": float(result.x),
+            "crps_score": float(result.fun),
+            "evaluations": sorted(evaluations, key=lambda x: x["sigma"]),
+        })
+
+    optima = np.array([r["sigma"] for r in results])
+    best_sigma = float(optima.mean())
+    if replicates > 1:
+        half_width = float(stats.t.ppf(0.975, replicates - 1) * optima.std(ddof=1) / np.sqrt(replicates))
+    else:
+        half_width = float("nan")
+
+    return {
+        "start_time": start_time,
+        "initial_sigma": float(sigma),
+        "volatility_type": volatility_type,
+        "num_simulations": num_simulations,
+        "sampling": sampling,
+        "bounds": [float(b) for b in bounds],
+        "best_sigma": best_sigma,
+        "confidence_interval": [best_sigma - half_width, best_sigma + half_width],
+        "num_evaluations": sum(len(r["evaluations"]) for r in results),
+        "replicates": results,
+    }
+
+def main_optimize():
+    now = datetime.now(timezone.utc)
+    now = now.replace(second=0, microsecond=0)
+    start_time = (now - timedelta(hours=24, minutes=1)).isoformat()
+    print(f"😊😊😊 Start time: {start_time}")
+
+    start_time_parsed = datetime.fromisoformat(start_time) - timedelta(days=1)
+    history_data = get_real_price_path(duration=86400, time_increment=5, resolution=1, start_time=start_time_parsed.isoformat())
+    initial_price = history_data[-1]["price"]
+    volatility_type = "hourly"
+    sigma = _calc_params(history_data=history_data, volatility_type=volatility_type)
+
+    result = optimize_sigma(start_time, initial_price, sigma, load_real_price_path(start_time), volatility_type)
+
+    end_time = datetime.now(timezone.utc)
+    low, high = result["confidence_interval"]
+    print(f"😊😊😊 Best sigma: {result['best_sigma']} (95% CI {low} - {high})")
+    print(f"😊😊😊 Evaluations: {result['num_evaluations']}")
+    print(f"😊😊😊 Time taken: {end_time - now}")
+
+    # Save the optimum and the whole CRPS-vs-sigma curve to a JSON file
+    optimize_file = os.path.join("../../public/base", str(from_iso_to_unix_time(start_time)), "sigma_optimize.json")
+    os.makedirs(os.path.dirname(optimize_file), exist_ok=True)
+    with open(optimize_file, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"Sigma optimization saved to: {optimize_file}")
+    record_file(optimize_file)
 
 def main():
     now = datetime.now(timezone.utc)
@@ -44,26 +158,7 @@ def main():
                 current_price=initial_price
             )
 
-            # Generate real price if not exists
-            real_path_file = os.path.join("../../public/real", str(from_iso_to_unix_time(start_time)), "real.json")
-            if not os.path.exists(real_path_file):
-
-                transformed_data = get_real_price_path(start_time=start_time)
-
-                # Create simulations directory in project root's public folder
-                sim_dir = os.path.join("../../public/real", str(from_iso_to_unix_time(start_time)))
-                os.makedirs(sim_dir, exist_ok=True)
-
-                # Save the transformed data directly to real.json
-                filepath = os.path.join(sim_dir, "real.json")
-                with open(filepath, 'w') as f:
-                    json.dump(transformed_data, f, indent=2)
-                
-                print(f"Real price path saved to: {filepath}")
-            
-            real_prices = []
-            with open(real_path_file, 'r') as f:
-                real_prices = json.load(f)
+            real_prices = load_real_price_path(start_time)
             predictions_path, real_price_path = align_prediction_and_real_prices(predictions, real_prices)
 
             crps_score, detailed_crps_data = calculate_crps_for_miner(np.array(predictions_path), np.array(real_price_path), 300)
@@ -93,7 +188,11 @@ def main():
     with open(crps_scores_file, 'w') as f:
         json.dump(sigma_test_results, f, indent=2)
     print(f"CRPS scores saved to: {crps_scores_file}")
+    record_file(crps_scores_file)
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "optimize":
+        main_optimize()
+    else:
+        main()
 
@@ -0,0 +1,140 @@
+"""
+Compact summary.json next to each simulation.json, for the dashboard charts.
+
+A simulation.json holds every path as {"time","price"} entries (about 2.8 MB for
+100 paths of 289 points), while the charts mostly draw fan bands. summary.json
+holds the per-step percentiles of the paths, a few representative paths (the
+ones ending at the percentiles of the final price), the model parameters and,
+once the request is scored, the total and per-interval CRPS, in a few tens of
+kilobytes. It is computed with one np.percentile over the path matrix when the
+paths are written. The dashboard's request pages chart it instead of
+simulation.json, which lets old simulation.json files be archived.
+
+Usage:
+    python summary.py gbm                 # every timestamp of a model
+    python summary.py gbm 1742137560
+"""
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from artifacts import PUBLIC_DIR
+from artifacts import interval_totals
+from artifacts import simulation_params
+from artifacts import write_artifact
+from bulk_score import prediction_to_matrix
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Prices are shown to the cent
+DECIMALS = 2
+
+
+def representative_paths(paths: np.ndarray, percentiles=PERCENTILES) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The paths whose final price is closest to each percentile of the final prices.
+
+    Returns:
+        tuple: (indices of the paths in the matrix, (len(percentiles), num_points) paths)
+    """
+    final = paths[:, -1]
+    targets = np.percentile(final, percentiles)
+    order = np.argsort(final)
+    positions = np.clip(np.searchsorted(final[order], targets), 0, len(final) - 1)
+    # searchsorted gives the first final price >= target; the one just below may be closer
+    below = np.clip(positions - 1, 0, len(final) - 1)
+    closer_below = np.abs(final[order][below] - targets) < np.abs(final[order][positions] - targets)
+    indices = order[np.where(closer_below, below, positions)]
+    return indices, paths[indices]
+
+
+def build_summary(paths: np.ndarray, start_time: str, time_increment: int, score_data: dict | None = None, variable: dict | None = None, percentiles=PERCENTILES) -> dict:
+    """
+    Summary of a (num_simulations, num_points) path matrix.
+
+    Args:
+        score_data: The request's score.json content, if it has been scored.
+        variable: The model parameters of the request's simulation.json (artifacts.simulation_params).
+    """
+    bands = np.percentile(paths, percentiles, axis=0)
+    indices, representative = representative_paths(paths, percentiles)
+    start = datetime.fromisoformat(start_time)
+    summary = {
+        "start_time": start_time,
+        "time_increment": time_increment,
+        "num_simulations": int(paths.shape[0]),
+        "variable": variable or {},
+        "times": [(start + timedelta(seconds=i * time_increment)).isoformat() for i in range(paths.shape[1])],
+        "percentiles": {str(p): np.round(band, DECIMALS).tolist() for p, band in zip(percentiles, bands)},
+        "representative_paths": [
+            {"percentile": p, "index": int(i), "prices": np.round(path, DECIMALS).tolist()}
+            for p, i, path in zip(percentiles, indices, representative)
+        ],
+        "total_score": None,
+        "interval_totals": {},
+    }
+    if score_data is not None:
+        summary["total_score"] = score_data["total_score"]
+        summary["interval_totals"] = interval_totals(score_data["detailed_scores"])
+    return summary
+
+
+def write_summary(model: str, paths: np.ndarray, start_time: str, time_increment: int, score_data: dict | None = None, public_dir=PUBLIC_DIR, variable: dict | None = None) -> str:
+    summary = build_summary(paths, start_time, time_increment, score_data, variable)
+    timestamp = int(datetime.fromisoformat(start_time).timestamp())
+    # No indentation: the point of the file is its size
+    return write_artifact(model, timestamp, "summary.json", summary, public_dir, indent=None)
+
+
+def summarize_directory(model: str, timestamp: int, public_dir=PUBLIC_DIR) -> str | None:
+    """(Re)build summary.json of a stored request from its simulation.json and score.json."""
+    sim_dir = os.path.join(public_dir, model, str(timestamp))
+    with open(os.path.join(sim_dir, "simulation.json"), "r") as f:
+        data = json.load(f)
+    prediction = data["prediction"]
+    if not prediction:
+        return None
+    paths = prediction_to_matrix(prediction, timestamp, len(prediction), len(prediction[0]))
+    if paths is None:
+        return None
+    start_time = prediction[0][0]["time"]
+    time_increment = simulation_params(data).get("time_increment", 300)
+
+    score_data = None
+    score_path = os.path.join(sim_dir, "score.json")
+    if os.path.exists(score_path):
+        with open(score_path, "r") as f:
+            score_data = json.load(f)
+    return write_summary(model, paths, start_time, time_increment, score_data, public_dir, simulation_params(data))
+
+
+def summarize_file(path: str) -> str | None:
+    """
+    summarize_directory for a path of the form <public dir>/<model>/<timestamp>/<name>.
+
+    The model scripts call it after writing simulation.json and again after score.json.
+    """
+    timestamp_dir = os.path.dirname(os.path.normpath(path))
+    model_dir, timestamp = os.path.split(timestamp_dir)
+    public_dir, model = os.path.split(model_dir)
+    return summarize_directory(model, int(timestamp), public_dir)
+
+
+def main():
+    if len(sys.argv) < 2:
+        raise SystemExit("Usage: python summary.py <model> [timestamp ...]")
+    model = sys.argv[1]
+    model_dir = os.path.join(PUBLIC_DIR, model)
+    timestamps = sys.argv[2:] or sorted(entry for entry in os.listdir(model_dir) if entry.isdigit())
+    for timestamp in timestamps:
+        if not os.path.exists(os.path.join(model_dir, str(timestamp), "simulation.json")):
+            continue
+        filepath = summarize_directory(model, int(timestamp))
+        if filepath is not None:
+            print(f"Summary saved to: {filepath} ({os.path.getsize(filepath):,} bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from artifacts import record_file
+from summary import summarize_file
 from helpers import get_real_price_path, from_iso_to_unix_time, align_prediction_and_real_prices, calculate_crps_for_miner, get_published_asset_price
 import json
 import pandas as pd
@@ -68,6 +70,8 @@ def main():
     filepath = os.path.join(sim_dir, "simulation.json")
     with open(filepath, "w") as f:
         json.dump({"start_time": start_time, "prediction": predictions}, f, indent=2)
+    record_file(filepath)
+    summarize_file(filepath)
 
 
     real_path_file = os.path.join("../../public/real", str(from_iso_to_unix_time(start_time)), "real.json")
@@ -109,6 +113,8 @@ def main():
         json.dump(score_data, f, indent=2)
 
     print(f"Score data saved to: {score_path}")
+    record_file(score_path)
+    summarize_file(score_path)
 if __name__ == "__main__":
     main()
 
@@ -5,7 +5,7 @@ import json
 from scipy.ndimage import gaussian_filter1d
 from helpers import get_real_price_path
 from db import analytics as analytics_model
-from db import create_database_engine
+from db import get_engine
 
 class DetailedTAPredictor:
     def __init__(self, ta_data):
@@ -247,7 +247,7 @@ def format_prediction_summary(price_array):
 
 def analytics_simulation(initial_price: float, time_increment: int, time_length: int, num_simulations: int):
     # Your detailed technical analysis data
-    engine = create_database_engine() 
+    engine = get_engine()
     with engine.connect() as connection:
         query = analytics_model.select().order_by(analytics_model.c.created_at.desc()).limit(1)
         result = connection.execute(query).fetchone()
@@ -0,0 +1,182 @@
+"""
+Streaming volatility estimators shared by the GBM-family models.
+
+RollingVolatility updates in O(1) per new bar and keeps its state small enough
+to persist in param_cache, so get_sigma only feeds the bars that arrived since
+the last run instead of recomputing over days of history.
+"""
+from collections import deque
+
+import numpy as np
+
+from history_store import load_history
+from param_cache import load_params
+from param_cache import save_params
+
+# Seconds per volatility scale
+SCALES = {"hourly": 3600, "daily": 86400}
+
+
+class RollingVolatility:
+    def __init__(self, kind="std", window=288, lam=0.94, returns="log", step_seconds=300):
+        """
+        Args:
+            kind: "std" (rolling population std, like np.std), "ewma" (RiskMetrics-style
+                exponentially weighted variance) or "realized" (rolling root mean square).
+            window: Number of returns in the rolling window ("std" and "realized").
+            lam: Decay factor for "ewma".
+            returns: "log" or "simple" returns.
+            step_seconds: Spacing of the bars fed to update(), used for scaling.
+        """
+        if kind not in ("std", "ewma", "realized"):
+            raise ValueError(f"Unknown volatility kind: {kind}")
+        self.kind = kind
+        self.window = window
+        self.lam = lam
+        self.returns = returns
+        self.step_seconds = step_seconds
+
+        self.last_price = None
+        self.last_timestamp = None
+        self.values = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.ewma_var = None
+
+    def update(self, price: float, timestamp: int | None = None):
+        """Add one bar in O(1)."""
+        price = float(price)
+        if self.last_price is not None:
+            if self.returns == "log":
+                r = float(np.log(price / self.last_price))
+            else:
+                r = (price - self.last_price) / self.last_price
+
+            if self.kind == "ewma":
+                self.ewma_var = r * r if self.ewma_var is None else self.lam * self.ewma_var + (1 - self.lam) * r * r
+            else:
+                self.values.append(r)
+                self.total += r
+                self.total_sq += r * r
+                if len(self.values) > self.window:
+                    old = self.values.popleft()
+                    self.total -= old
+                    self.total_sq -= old * old
+
+        self.last_price = price
+        if timestamp is not None:
+            self.last_timestamp = int(timestamp)
+
+    def update_many(self, prices, timestamps=None):
+        for i, price in enumerate(prices):
+            self.update(price, None if timestamps is None else timestamps[i])
+
+    @property
+    def count(self) -> int:
+        return len(self.values)
+
+    def mean(self) -> float:
+        """Mean return over the window ("std" and "realized")."""
+        return self.total / len(self.values) if self.values else 0.0
+
+    def std(self) -> float:
+        """Per-step volatility."""
+        if self.kind == "ewma":
+            return float(np.sqrt(self.ewma_var)) if self.ewma_var is not None else 0.0
+        n = len(self.values)
+        if n == 0:
+            return 0.0
+        if self.kind == "realized":
+            return float(np.sqrt(self.total_sq / n))
+        mean = self.total / n
+        return float(np.sqrt(max(self.total_sq / n - mean * mean, 0.0)))
+
+    def sigma(self, volatility_type="step") -> float:
+        """
+        Volatility scaled to a period: "step" (per bar), "hourly" or "daily".
+        """
+        if volatility_type == "step":
+            return self.std()
+        return self.std() * float(np.sqrt(SCALES[volatility_type] / self.step_seconds))
+
+    def state(self) -> dict:
+        return {
+            "kind": self.kind,
+            "window": self.window,
+            "lam": self.lam,
+            "returns": self.returns,
+            "step_seconds": self.step_seconds,
+            "last_price": self.last_price,
+            "last_timestamp": self.last_timestamp,
+            "values": list(self.values),
+            "ewma_var": self.ewma_var,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "RollingVolatility":
+        estimator = cls(state["kind"], state["window"], state["lam"], state["returns"], state["step_seconds"])
+        estimator.last_price = state["last_price"]
+        estimator.last_timestamp = state["last_timestamp"]
+        estimator.values = deque(state["values"])
+        # Re-summing once on load keeps the running sums free of accumulated drift
+        estimator.total = float(sum(estimator.values))
+        estimator.total_sq = float(sum(v * v for v in estimator.values))
+        estimator.ewma_var = state["ewma_var"]
+        return estimator
+
+
+def rolling_std(values: np.ndarray, window: int, ddof=1) -> np.ndarray:
+    """
+    Rolling standard deviation with cumulative sums, the NumPy equivalent of
+    pd.Series(values).rolling(window).std(ddof).dropna().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < window:
+        return np.empty(0)
+    # Center first so the sum-of-squares difference does not lose precision
+    centered = values - values.mean()
+    csum = np.concatenate([[0.0], np.cumsum(centered)])
+    csum_sq = np.concatenate([[0.0], np.cumsum(centered * centered)])
+    window_sum = csum[window:] - csum[:-window]
+    window_sum_sq = csum_sq[window:] - csum_sq[:-window]
+    variance = (window_sum_sq - window_sum * window_sum / window) / (window - ddof)
+    return np.sqrt(np.maximum(variance, 0.0))
+
+
+def get_sigma(asset: str, as_of: int, volatility_type="hourly", kind="std", window=288, step_seconds=300, lam=0.94) -> float:
+    """
+    Volatility of an asset as of a time, from the persisted estimator and the local history store.
+
+    The estimator state is cached per (asset, kind, window, step, lam); a run at a later
+    as_of only feeds the bars since the cached state. Asking for an as_of before the
+    cached state (e.g. a backtest) rebuilds the estimator from that window without
+    touching the cache.
+    """
+    name = f"volatility_{asset}_{kind}_{window}_{step_seconds}_{lam}"
+    cached = load_params(name)
+    estimator = None
+    if cached is not None and cached["last_timestamp"] is not None and cached["last_timestamp"] <= as_of:
+        estimator = RollingVolatility.from_state(cached)
+        start = estimator.last_timestamp + step_seconds
+        persist = True
+    else:
+        persist = cached is None or cached["last_timestamp"] is None
+        estimator = RollingVolatility(kind, window, lam, "log", step_seconds)
+        start = as_of - (window + 1) * step_seconds
+
+    # A state older than the window is worth nothing: start over from the window
+    if as_of - start > (window + 1) * step_seconds:
+        estimator = RollingVolatility(kind, window, lam, "log", step_seconds)
+        start = as_of - (window + 1) * step_seconds
+
+    if start <= as_of:
+        times, prices = load_history(asset, start, as_of)
+        on_grid = times % step_seconds == 0
+        estimator.update_many(prices[on_grid], times[on_grid])
+
+    if persist:
+        save_params(name, estimator.state())
+
+    sigma = estimator.sigma(volatility_type)
+    print(f"😊😊😊 {volatility_type} volatility (sigma) calculated: {sigma}")
+    return sigma
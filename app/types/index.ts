@@ -2,6 +2,10 @@ export interface SimulationData {
   id?: number;
   request_time?: string;
   prediction: Price[][];
+  // Drawn as the highlighted real price line, when given
+  real?: Price[];
+  // Drawn as percentile bands, with prediction holding its representative paths
+  summary?: SummaryData;
   variable?: {
     start_time: string;
     mean?: number;
@@ -14,6 +18,23 @@ export interface SimulationData {
   };
 }
 
+// summary.json written next to each simulation.json by app/lib/summary.py
+export interface SummaryData {
+  start_time: string;
+  time_increment: number;
+  num_simulations: number;
+  variable: SimulationData["variable"];
+  times: string[];
+  percentiles: { [percentile: string]: number[] };
+  representative_paths: {
+    percentile: number;
+    index: number;
+    prices: number[];
+  }[];
+  total_score: number | null;
+  interval_totals: { [interval: string]: number };
+}
+
 export interface Price {
   time: string;
   price: number;
@@ -8,6 +8,7 @@ import {
   Title,
   Tooltip,
   Legend,
+  Filler,
 } from "chart.js";
 import { SimulationData } from "@/app/types";
 import { useEffect } from "react";
@@ -21,14 +22,21 @@ ChartJS.register(
   LineElement,
   Title,
   Tooltip,
-  Legend
+  Legend,
+  Filler
 );
 
+// Percentile pairs of a summary drawn as filled bands, outermost first
+const BANDS: [string, string, string][] = [
+  ["5", "95", "rgba(75, 192, 192, 0.15)"],
+  ["25", "75", "rgba(75, 192, 192, 0.3)"],
+];
+
 export default function SimulationChart({ data }: { data: SimulationData }) {
   // Create time labels for each data point
   const timeLabels = Array.from(
     {
-      length: data.prediction?.[0]?.length,
+      length: data.summary?.times.length ?? data.prediction?.[0]?.length,
     },
     (_, i) => {
       // Each point represents time_increment seconds
@@ -47,7 +55,8 @@ export default function SimulationChart({ data }: { data: SimulationData }) {
     responsive: true,
     plugins: {
       legend: {
-        display: false,
+        // Only a summary has few enough, labelled, series to list
+        display: !!data.summary,
       },
       title: {
         display: true,
@@ -82,18 +91,75 @@ export default function SimulationChart({ data }: { data: SimulationData }) {
     },
   };
 
-  // Create datasets for each simulation
-  const datasets = data.prediction.map((simulation, index) => ({
-    label: `Simulation ${index + 1}`,
-    data: simulation.map((price) => price.price),
-    borderColor:
-      data.prediction.length > 100 && index === 0
-        ? "rgb(75, 192, 192)"
-        : `rgba(75, 192, 192, 0.1)`,
-    borderWidth: data.prediction.length > 100 && index === 0 ? 2 : 1,
-    tension: 0.1,
-    pointRadius: 0,
-  }));
+  const summary = data.summary;
+
+  // A summary is drawn as its percentile bands, median and labelled
+  // representative paths; raw simulations as every path, the first one
+  // highlighted in large sets
+  const simulationDatasets = summary
+    ? [
+        ...BANDS.flatMap(([lower, upper, color]) => [
+          {
+            label: `P${lower}`,
+            data: summary.percentiles[lower],
+            borderColor: "transparent",
+            pointRadius: 0,
+            fill: false,
+          },
+          {
+            label: `P${lower}-P${upper}`,
+            data: summary.percentiles[upper],
+            borderColor: "transparent",
+            backgroundColor: color,
+            pointRadius: 0,
+            // Fill down to the lower percentile drawn just before
+            fill: "-1",
+          },
+        ]),
+        {
+          label: "Median",
+          data: summary.percentiles["50"],
+          borderColor: "rgb(75, 192, 192)",
+          borderWidth: 2,
+          tension: 0.1,
+          pointRadius: 0,
+        },
+        ...summary.representative_paths.map((path) => ({
+          label: `P${path.percentile} path (#${path.index})`,
+          data: path.prices,
+          borderColor: "rgba(75, 192, 192, 0.6)",
+          borderWidth: 1,
+          borderDash: [4, 4],
+          tension: 0.1,
+          pointRadius: 0,
+        })),
+      ]
+    : data.prediction.map((simulation, index) => ({
+        label: `Simulation ${index + 1}`,
+        data: simulation.map((price) => price.price),
+        borderColor:
+          data.prediction.length > 100 && index === 0
+            ? "rgb(75, 192, 192)"
+            : `rgba(75, 192, 192, 0.1)`,
+        borderWidth: data.prediction.length > 100 && index === 0 ? 2 : 1,
+        tension: 0.1,
+        pointRadius: 0,
+      }));
+
+  // The real price always stands out, drawn last so it sits over the bands
+  const datasets = data.real
+    ? [
+        ...simulationDatasets,
+        {
+          label: "Real price",
+          data: data.real.map((price) => price.price),
+          borderColor: "rgb(255, 99, 132)",
+          borderWidth: 2,
+          tension: 0.1,
+          pointRadius: 0,
+        },
+      ]
+    : simulationDatasets;
 
   const chartData = {
     labels: timeLabels,
@@ -109,7 +175,7 @@ export default function SimulationChart({ data }: { data: SimulationData }) {
       />
       <div className="flex justify-between">
         <p>
-          Start Time: {data.variable?.start_time || data.prediction[0][0].time}
+          Start Time: {data.variable?.start_time || data.prediction[0]?.[0]?.time}
         </p>
         <p>Sigma: {data.variable?.sigma}</p>
         <p>Volatility Type: {data.variable?.volatility_type}</p>